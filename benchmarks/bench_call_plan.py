@@ -0,0 +1,68 @@
+"""Per-call Python overhead of a cache hit, with and without the per-function :class:`.CallPlan`.
+
+The Lua ``get`` script is replaced by a stub returning a serialized value, so no Redis server is needed,
+and only the Python side of the hot path is measured.
+
+"before" re-implements what ``RedisFuncCache.exec`` did on every call before call plans existed:
+validating the scripts, ``calc_keys``, ``calc_hash`` (including ``inspect.getsource``) and ``calc_ext_args``.
+"after" calls the decorated function, which uses the plan built by ``decorate()``.
+
+Usage::
+
+    python benchmarks/bench_call_plan.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+from timeit import repeat
+from unittest.mock import patch
+
+import redis.commands.core
+from redis import Redis
+
+from redis_func_cache import LruTMultiplePolicy, LruTPolicy, RedisFuncCache
+
+
+def echo(x, y=None):
+    return x
+
+
+def legacy_exec(cache: RedisFuncCache, user_function, user_args, user_kwds, **options):
+    script_0, script_1 = cache.policy.lua_scripts
+    if not (isinstance(script_0, redis.commands.core.Script) and isinstance(script_1, redis.commands.core.Script)):
+        raise RuntimeError()
+    keys = cache.policy.calc_keys(user_function, user_args, user_kwds)
+    hash = cache.policy.calc_hash(user_function, user_args, user_kwds)
+    ext_args = cache.policy.calc_ext_args(user_function, user_args, user_kwds) or ()
+    cached = cache.get(script_0, keys, hash, cache.ttl, options, ext_args)
+    if cached is not None:
+        return cache.deserialize_return_value(cached)
+    raise RuntimeError("the benchmark only measures hits")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", "-n", type=int, default=20_000, help="calls per measurement")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="measurements, the best one is reported")
+    args = parser.parse_args()
+
+    print(f"{'policy':<22}{'before (us/call)':>18}{'after (us/call)':>18}{'speedup':>10}")
+    for policy in (LruTPolicy, LruTMultiplePolicy):
+        cache = RedisFuncCache(__name__, policy, client=Redis())
+        cached_echo = cache(echo)
+        with patch.object(cache, "get", return_value=cache.serialize_return_value(1)):
+            before = min(
+                repeat(
+                    lambda cache=cache: legacy_exec(cache, echo, (1,), {"y": 2}),
+                    number=args.number,
+                    repeat=args.repeat,
+                )
+            )
+            after = min(repeat(lambda f=cached_echo: f(1, y=2), number=args.number, repeat=args.repeat))
+        before_us, after_us = before / args.number * 1e6, after / args.number * 1e6
+        print(f"{policy.__name__:<22}{before_us:>18.2f}{after_us:>18.2f}{before_us / after_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compression ratio and CPU cost of the :class:`.Compressor` codecs on representative payloads.
+
+Payloads are lists of 40, 400 and 4000 records serialized by JSON (about 5 KB, 50 KB and 500 KB) and pickle, and random bytes.
+Codecs whose optional package is not installed are skipped.
+
+Usage::
+
+    python benchmarks/bench_compression.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pickle
+import random
+from timeit import repeat
+
+from redis_func_cache import Compressor
+from redis_func_cache.compression import CODECS
+
+
+def make_records(n: int):
+    rng = random.Random(n)
+    return [
+        {
+            "id": i,
+            "name": f"user-{rng.randrange(1_000_000)}",
+            "score": rng.random(),
+            "tags": rng.sample(["red", "green", "blue", "cyan", "magenta", "yellow"], 3),
+            "active": rng.random() > 0.5,
+        }
+        for i in range(n)
+    ]
+
+
+def make_payloads():
+    payloads = {}
+    for n in (40, 400, 4000):
+        records = make_records(n)
+        payloads[f"json {n} records"] = json.dumps(records, ensure_ascii=False).encode()
+        payloads[f"pickle {n} records"] = pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+    payloads["random bytes"] = os.urandom(50_000)
+    return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", "-n", type=int, default=20, help="calls per measurement")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="measurements, the best one is reported")
+    args = parser.parse_args()
+
+    compressors = []
+    for codec in CODECS:
+        try:
+            compressors.append(Compressor(codec, threshold=0))
+        except ImportError:
+            print(f"skip {codec}: its package is not installed")
+
+    print(f"{'payload':<22}{'size (KB)':>10}{'codec':>7}{'ratio':>8}{'compress (MB/s)':>17}{'decompress (MB/s)':>19}")
+    for name, payload in make_payloads().items():
+        for compressor in compressors:
+            data = compressor.compress(payload)
+            t_compress = min(
+                repeat(lambda c=compressor, p=payload: c.compress(p), number=args.number, repeat=args.repeat)
+            )
+            t_decompress = min(
+                repeat(lambda c=compressor, d=data: c.decompress(d), number=args.number, repeat=args.repeat)
+            )
+            mb = len(payload) * args.number / 1e6
+            print(
+                f"{name:<22}{len(payload) / 1e3:>10.1f}{compressor.codec:>7}{len(payload) / len(data):>8.2f}"
+                f"{mb / t_compress:>17.1f}{mb / t_decompress:>19.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
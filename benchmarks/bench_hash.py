@@ -0,0 +1,61 @@
+"""Time of :meth:`.AbstractHashMixin.calc_hash` for every hash mixin, on a few typical argument shapes.
+
+The hasher is pre-seeded with the function's name and source, as decorated functions do with their call plan,
+so that only the serialization of the arguments and the digest are measured.
+
+Usage::
+
+    python benchmarks/bench_hash.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+from timeit import repeat
+
+from redis_func_cache.mixins import hash as hash_mixins
+
+ARGUMENTS = {
+    "scalars": ((1, 2.5, "hello"), {"flag": True}),
+    "kwargs": ((), {"user_id": 12345, "lang": "en", "page": 3, "size": 50}),
+    "nested": (([{"id": i, "tags": ["a", "b"]} for i in range(10)],), {}),
+    "bytes 4KiB": ((b"\0" * 4096,), {}),
+}
+
+
+def echo(*args, **kwds):
+    return args
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", "-n", type=int, default=20_000, help="calls per measurement")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="measurements, the best one is reported")
+    args = parser.parse_args()
+
+    mixins = [getattr(hash_mixins, name) for name in hash_mixins.__all__ if name != "AbstractHashMixin"]
+    print(f"{'mixin':<34}" + "".join(f"{name:>14}" for name in ARGUMENTS) + "   (us/call)")
+    for mixin in mixins:
+        hasher = mixin()
+        seed = hasher.seed_hash(echo)
+        row = []
+        for call_args, call_kwds in ARGUMENTS.values():
+            try:
+                t = min(
+                    repeat(
+                        lambda hasher=hasher, seed=seed, a=call_args, k=call_kwds: hasher.calc_hash_with_seed(
+                            seed, a, k
+                        ),
+                        number=args.number,
+                        repeat=args.repeat,
+                    )
+                )
+            except TypeError:  # e.g. JSON can not serialize bytes
+                row.append(f"{'n/a':>14}")
+            else:
+                row.append(f"{t / args.number * 1e6:>14.2f}")
+        print(f"{mixin.__name__:<34}" + "".join(row))
+
+
+if __name__ == "__main__":
+    main()
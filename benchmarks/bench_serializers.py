@@ -0,0 +1,74 @@
+"""Speed and size of the :data:`.SERIALIZERS` on representative return values.
+
+Serializers whose optional package is not installed, or which can not round trip a value, are skipped.
+The last column is what :func:`.fastest_serializer` picks for each value.
+
+Usage::
+
+    python benchmarks/bench_serializers.py [--number N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from timeit import repeat
+
+from redis_func_cache import TaggedSerializer, fastest_serializer
+from redis_func_cache.serialization import SERIALIZERS
+
+
+def make_records(n: int):
+    rng = random.Random(n)
+    return [
+        {
+            "id": i,
+            "name": f"user-{rng.randrange(1_000_000)}",
+            "score": rng.random(),
+            "tags": rng.sample(["red", "green", "blue", "cyan", "magenta", "yellow"], 3),
+            "active": rng.random() > 0.5,
+        }
+        for i in range(n)
+    ]
+
+
+def make_values():
+    values = {"int": 42, "short str": "hello, world", "floats 1000": [random.Random(0).random() for _ in range(1000)]}
+    for n in (10, 1000):
+        values[f"records {n}"] = make_records(n)
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", "-n", type=int, default=200, help="calls per measurement")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="measurements, the best one is reported")
+    args = parser.parse_args()
+
+    serializers = []
+    for name in SERIALIZERS:
+        try:
+            serializers.append(TaggedSerializer(name))
+        except ImportError:
+            print(f"skip {name}: its package is not installed")
+
+    print(f"{'value':<14}{'serializer':>11}{'size (B)':>10}{'dumps (us)':>12}{'loads (us)':>12}{'fastest':>10}")
+    for name, value in make_values().items():
+        fastest = fastest_serializer(value, [s.name for s in serializers])
+        for serializer in serializers:
+            try:
+                data = serializer.dumps(value)
+                if serializer.loads(data) != value:
+                    continue
+            except (TypeError, ValueError):
+                continue
+            t_dumps = min(repeat(lambda s=serializer, v=value: s.dumps(v), number=args.number, repeat=args.repeat))
+            t_loads = min(repeat(lambda s=serializer, d=data: s.loads(d), number=args.number, repeat=args.repeat))
+            print(
+                f"{name:<14}{serializer.name:>11}{len(data):>10}{t_dumps / args.number * 1e6:>12.2f}"
+                f"{t_loads / args.number * 1e6:>12.2f}{'*' if serializer.name == fastest else '':>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Micro-benchmark suite of the Python side of the hit and miss hot paths, with machine-readable results.
+
+Each stage is measured separately:
+
+- ``calc_keys``: :meth:`.AbstractPolicy.calc_keys` of every policy
+- ``calc_hash``: :meth:`.AbstractHashMixin.calc_hash_with_seed` of every hash mixin, on a few typical argument shapes
+- ``serializer``: ``dumps`` and ``loads`` of the default (JSON) and ``pickle`` serializers
+- ``dispatch``: :meth:`.RedisFuncCache.get` and :meth:`.RedisFuncCache.put` of every policy, down to the Redis command
+- ``wrapper`` / ``awrapper``: a hit and a miss through the decorated function (sync and async) of every policy
+
+These stages use an in-memory stub client, whose ``EVALSHA`` commands return a canned response without any I/O,
+so that only the overhead of this package and redis-py is measured.
+With ``--redis-url``, the ``redis`` stage also measures a hit and a miss of every policy against a real Redis server,
+e.g. a local ``redis-server``.
+
+Results are written as JSON with ``--output``, and ``--compare`` reports the ratio of each result to a previous file,
+exiting with status 1 if any is slower than ``--threshold``, so that releases can be compared::
+
+    python benchmarks/bench_suite.py --output before.json
+    git checkout <new version>
+    python benchmarks/bench_suite.py --output after.json --compare before.json
+
+Usage::
+
+    python benchmarks/bench_suite.py [--stage STAGE ...] [--number N] [--redis-url URL] [--output FILE] [--compare FILE]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from functools import partial
+from itertools import count
+from time import perf_counter
+from timeit import repeat
+from typing import Any, Callable, Dict, List, Optional
+
+import redis.asyncio
+from redis import Redis
+
+import redis_func_cache
+from redis_func_cache import RedisFuncCache
+from redis_func_cache.mixins import hash as hash_mixins
+from redis_func_cache.policies.abstract import AbstractPolicy
+
+STAGES = ("calc_keys", "calc_hash", "serializer", "dispatch", "wrapper", "awrapper", "redis")
+
+POLICIES = [
+    getattr(redis_func_cache, name)
+    for name in dir(redis_func_cache)
+    if isinstance(getattr(redis_func_cache, name), type) and issubclass(getattr(redis_func_cache, name), AbstractPolicy)
+]
+
+ARGUMENTS = {
+    "scalars": ((1, 2.5, "hello"), {"flag": True}),
+    "kwargs": ((), {"user_id": 12345, "lang": "en", "page": 3, "size": 50}),
+    "nested": (([{"id": i, "tags": ["a", "b"]} for i in range(10)],), {}),
+    "bytes 4KiB": ((b"\0" * 4096,), {}),
+}
+
+RETURN_VALUES = {
+    "int": 42,
+    "str": "hello, world",
+    "records 100": [{"id": i, "name": f"user-{i}", "score": i / 7, "active": i % 2 == 0} for i in range(100)],
+}
+
+
+class StubRedis(Redis):
+    """A client answering ``EVALSHA`` commands from :attr:`responses` (script SHA1 to response), without any I/O."""
+
+    def __init__(self):
+        super().__init__()
+        self.responses: Dict[str, Any] = {}
+
+    def execute_command(self, *args, **options):
+        if args[0] != "EVALSHA":
+            raise NotImplementedError(args[0])
+        return self.responses[args[1]]
+
+
+class AsyncStubRedis(redis.asyncio.Redis):
+    """Async version of :class:`StubRedis`."""
+
+    def __init__(self):
+        super().__init__()
+        self.responses: Dict[str, Any] = {}
+
+    async def execute_command(self, *args, **options):
+        if args[0] != "EVALSHA":
+            raise NotImplementedError(args[0])
+        return self.responses[args[1]]
+
+
+def echo(x, y=None):
+    return x
+
+
+async def aecho(x, y=None):
+    return x
+
+
+class Suite:
+    def __init__(self, number: int, repeat: int):
+        self.number = number
+        self.repeat = repeat
+        self.results: List[Dict[str, Any]] = []
+
+    def record(self, stage: str, name: str, case: str, seconds: Optional[float], number: int):
+        us = None if seconds is None else seconds / number * 1e6
+        self.results.append({"stage": stage, "name": name, "case": case, "us_per_call": us})
+        print(f"{stage:<11}{name:<34}{case:<14}{'n/a' if us is None else f'{us:.2f}':>12}")
+
+    def time(self, stage: str, name: str, case: str, func: Callable[[], Any], number: Optional[int] = None):
+        number = number or self.number
+        self.record(stage, name, case, min(repeat(func, number=number, repeat=self.repeat)), number)
+
+    def atime(self, stage: str, name: str, case: str, afunc: Callable[[], Any], number: Optional[int] = None):
+        number = number or self.number
+
+        async def measure():
+            best = float("inf")
+            for _ in range(self.repeat):
+                started = perf_counter()
+                for _ in range(number):
+                    await afunc()
+                best = min(best, perf_counter() - started)
+            return best
+
+        self.record(stage, name, case, asyncio.run(measure()), number)
+
+    def calc_keys(self):
+        for policy in POLICIES:
+            cache = RedisFuncCache(__name__, policy, client=StubRedis())
+            self.time("calc_keys", policy.__name__, "", partial(cache.policy.calc_keys, echo))
+
+    def calc_hash(self):
+        for name in hash_mixins.__all__:
+            if name == "AbstractHashMixin":
+                continue
+            hasher = getattr(hash_mixins, name)()
+            seed = hasher.seed_hash(echo)
+            for case, (call_args, call_kwds) in ARGUMENTS.items():
+                try:
+                    hasher.calc_hash_with_seed(seed, call_args, call_kwds)
+                except TypeError:  # e.g. JSON can not serialize bytes
+                    self.record("calc_hash", name, case, None, 1)
+                    continue
+                self.time("calc_hash", name, case, partial(hasher.calc_hash_with_seed, seed, call_args, call_kwds))
+
+    def serializer(self):
+        for name, cache in (
+            ("default", RedisFuncCache(__name__, POLICIES[0], client=StubRedis())),
+            ("pickle", RedisFuncCache(__name__, POLICIES[0], client=StubRedis(), serializer="pickle")),
+        ):
+            for case, value in RETURN_VALUES.items():
+                data = cache.serialize_return_value(value)
+                self.time("serializer", f"{name} dumps", case, partial(cache.serialize_return_value, value))
+                self.time("serializer", f"{name} loads", case, partial(cache.deserialize_return_value, data))
+
+    def dispatch(self):
+        for policy in POLICIES:
+            client = StubRedis()
+            cache = RedisFuncCache(__name__, policy, client=client)
+            get_script, put_script = cache.policy.lua_scripts
+            client.responses = {get_script.sha: None, put_script.sha: 0}
+            keys = cache.policy.calc_keys(echo)
+            hash = cache.policy.calc_hash(echo, (1,), {})
+            options = json.dumps({}).encode()
+            self.time(
+                "dispatch", policy.__name__, "get", partial(cache.get, get_script, keys, hash, cache.ttl, options)
+            )
+            self.time(
+                "dispatch",
+                policy.__name__,
+                "put",
+                partial(cache.put, put_script, keys, hash, b"42", cache.maxsize, cache.ttl, options),
+            )
+
+    def wrapper(self):
+        for policy in POLICIES:
+            client = StubRedis()
+            cache = RedisFuncCache(__name__, policy, client=client)
+            cached_echo = cache(echo)
+            get_script, put_script = cache.policy.lua_scripts
+            client.responses = {get_script.sha: cache.serialize_return_value(1), put_script.sha: 0}
+            self.time("wrapper", policy.__name__, "hit", partial(cached_echo, 1, y=2))
+            client.responses[get_script.sha] = None
+            self.time("wrapper", policy.__name__, "miss", partial(cached_echo, 1, y=2))
+
+    def awrapper(self):
+        for policy in POLICIES:
+            client = AsyncStubRedis()
+            cache = RedisFuncCache(__name__, policy, client=client)
+            cached_aecho = cache(aecho)
+            get_script, put_script = cache.policy.lua_scripts
+            client.responses = {get_script.sha: cache.serialize_return_value(1), put_script.sha: 0}
+            self.atime("awrapper", policy.__name__, "hit", partial(cached_aecho, 1, y=2))
+            client.responses[get_script.sha] = None
+            self.atime("awrapper", policy.__name__, "miss", partial(cached_aecho, 1, y=2))
+
+    def redis(self, url: str, number: int):
+        client = Redis.from_url(url)
+        for policy in POLICIES:
+            cache = RedisFuncCache(f"{__name__}-{policy.__key__}", policy, client=client, maxsize=number)
+            cached_echo = cache(echo)
+            cache.policy.purge()
+            cached_echo(0)
+            self.time("redis", policy.__name__, "hit", partial(cached_echo, 0), number)
+            misses = count(1)
+            self.time("redis", policy.__name__, "miss", lambda f=cached_echo, misses=misses: f(next(misses)), number)
+            cache.policy.purge()
+
+
+def compare(results: List[Dict[str, Any]], baseline_file: str, threshold: float) -> bool:
+    """Print the ratio of each result to the same one in ``baseline_file``, and return whether none exceeds ``threshold``."""
+    with open(baseline_file, encoding="utf-8") as fp:
+        baseline = {(r["stage"], r["name"], r["case"]): r["us_per_call"] for r in json.load(fp)["results"]}
+    ok = True
+    print(f"\n{'stage':<11}{'name':<34}{'case':<14}{'before':>10}{'after':>10}{'ratio':>8}")
+    for r in results:
+        before, after = baseline.get((r["stage"], r["name"], r["case"])), r["us_per_call"]
+        if not before or after is None:
+            continue
+        ratio = after / before
+        slower = ratio > 1 + threshold
+        ok = ok and not slower
+        print(
+            f"{r['stage']:<11}{r['name']:<34}{r['case']:<14}{before:>10.2f}{after:>10.2f}{ratio:>7.2f}x"
+            f"{'  SLOWER' if slower else ''}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stage", "-s", action="append", choices=STAGES, help="stages to run, all by default")
+    parser.add_argument("--number", "-n", type=int, default=10_000, help="calls per measurement")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="measurements, the best one is reported")
+    parser.add_argument("--redis-url", help="URL of a Redis server for the redis stage, which is skipped if not given")
+    parser.add_argument("--redis-number", type=int, default=1_000, help="calls per measurement of the redis stage")
+    parser.add_argument("--output", "-o", help="write the results to this JSON file")
+    parser.add_argument("--compare", "-c", help="compare the results to this JSON file, written by --output")
+    parser.add_argument(
+        "--threshold", "-t", type=float, default=0.1, help="relative slowdown reported as a regression by --compare"
+    )
+    args = parser.parse_args()
+
+    suite = Suite(args.number, args.repeat)
+    stages = args.stage or STAGES
+    print(f"{'stage':<11}{'name':<34}{'case':<14}{'us/call':>12}")
+    for stage in stages:
+        if stage == "redis":
+            if args.redis_url:
+                suite.redis(args.redis_url, args.redis_number)
+        else:
+            getattr(suite, stage)()
+
+    if args.output:
+        meta = {
+            "redis_func_cache": redis_func_cache.__version__,
+            "redis_py": redis.__version__,
+            "redis_server": Redis.from_url(args.redis_url).info("server")["redis_version"]
+            if args.redis_url and "redis" in stages
+            else None,
+            "python": sys.version,
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "number": args.number,
+            "repeat": args.repeat,
+        }
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump({"meta": meta, "results": suite.results}, fp, indent=2)
+    if args.compare and not compare(suite.results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
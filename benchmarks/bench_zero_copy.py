@@ -0,0 +1,66 @@
+"""Latency and peak memory of serializing a large return value with ``pickle`` versus ``pickle_buffers``.
+
+The value is a NumPy array of ``--size`` MB of floats, or a :class:`bytes` of that size if NumPy is not installed.
+Each round trip serializes the value, turns it into :class:`bytes` as a Redis response would be,
+and deserializes it; no Redis server is needed.
+Peak memory is traced during each step, not counting the Redis response itself.
+
+Usage::
+
+    python benchmarks/bench_zero_copy.py [--size MB]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tracemalloc
+from time import perf_counter
+
+from redis_func_cache import TaggedSerializer
+
+
+def make_value(size: int):
+    try:
+        import numpy as np
+    except ImportError:
+        print("numpy is not installed, using bytes")
+        return os.urandom(size)
+    return np.random.default_rng(0).random(size // 8)
+
+
+def measure(serializer: TaggedSerializer, value):
+    tracemalloc.start()
+    t0 = perf_counter()
+    data = serializer.dumps(value)
+    t1 = perf_counter()
+    _, dumps_peak = tracemalloc.get_traced_memory()
+    response = bytes(data)  # what the client reads from Redis
+    del data
+    tracemalloc.reset_peak()
+    t2 = perf_counter()
+    loaded = serializer.loads(response)
+    t3 = perf_counter()
+    current, loads_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loaded
+    return t1 - t0, t3 - t2, dumps_peak, loads_peak - len(response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", "-s", type=int, default=100, help="size of the value in MB")
+    args = parser.parse_args()
+
+    value = make_value(args.size << 20)
+    print(f"{'serializer':<16}{'dumps (ms)':>12}{'loads (ms)':>12}{'dumps peak (MB)':>17}{'loads peak (MB)':>17}")
+    for name in ("pickle", "pickle_buffers"):
+        t_dumps, t_loads, dumps_peak, loads_peak = measure(TaggedSerializer(name), value)
+        print(
+            f"{name:<16}{t_dumps * 1e3:>12.1f}{t_loads * 1e3:>12.1f}"
+            f"{dumps_peak / (1 << 20):>17.1f}{loads_peak / (1 << 20):>17.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 from . import _version as version
 from ._version import __version__, __version_tuple__
+from .batch import Batch, Deferred
 from .cache import RedisFuncCache
+from .compression import Compressor
+from .config import LeaseConfig, StaleConfig, StorageConfig
+from .local_cache import LocalCache
 from .policies.fifo import FifoClusterMultiplePolicy, FifoClusterPolicy, FifoMultiplePolicy, FifoPolicy
 from .policies.fifo_t import FifoTClusterMultiplePolicy, FifoTClusterPolicy, FifoTMultiplePolicy, FifoTPolicy
 from .policies.lfu import LfuClusterMultiplePolicy, LfuClusterPolicy, LfuMultiplePolicy, LfuPolicy
@@ -8,3 +12,7 @@ from .policies.lru import LruClusterMultiplePolicy, LruClusterPolicy, LruMultipl
 from .policies.lru_t import LruTClusterMultiplePolicy, LruTClusterPolicy, LruTMultiplePolicy, LruTPolicy
 from .policies.mru import MruClusterMultiplePolicy, MruClusterPolicy, MruMultiplePolicy, MruPolicy
 from .policies.rr import RrClusterMultiplePolicy, RrClusterPolicy, RrMultiplePolicy, RrPolicy
+from .serialization import SERIALIZERS, TaggedSerializer, fastest_serializer, register_serializer
+from .stats import CacheInfo, CacheStats, prometheus_text
+from .tracing import CallTrace, OpenTelemetryTracer, SlowCallLogger, Tracer
+from .write_behind import WriteBehind
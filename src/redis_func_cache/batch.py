@@ -0,0 +1,302 @@
+"""Deferred execution of cached calls, pipelined in batches."""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Mapping, Optional, Sequence, Tuple
+
+from .pipeline import arun_script_calls, run_script_calls
+from .utils import script_keys
+
+if TYPE_CHECKING:  # pragma: no cover
+    from redis.typing import KeyT
+
+    from .cache import RedisFuncCache
+    from .plan import CallPlan
+
+__all__ = ("Batch", "Deferred", "current_batch")
+
+_MISSING = object()
+
+_current_batch: ContextVar[Optional[Batch]] = ContextVar("redis_func_cache_batch", default=None)
+
+
+def current_batch() -> Optional[Batch]:
+    """The :class:`Batch` whose context is active, or :data:`None`."""
+    return _current_batch.get()
+
+
+class Deferred:
+    """Lazy placeholder of the return value of a cached call made inside a :class:`Batch` context.
+
+    Accessing the value with :meth:`result` (or awaiting it in an asynchronous batch) executes the batch, if it has not yet been.
+    """
+
+    __slots__ = ("_batch", "_value", "_error")
+
+    def __init__(self, batch: Batch):
+        self._batch = batch
+        self._value: Any = _MISSING
+        self._error: Optional[BaseException] = None
+
+    def done(self) -> bool:
+        """Whether the call has been executed."""
+        return self._value is not _MISSING or self._error is not None
+
+    def _set_result(self, value: Any):
+        self._value = value
+
+    def _set_error(self, error: BaseException):
+        self._error = error
+
+    def _get(self) -> Any:
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def result(self) -> Any:
+        """Return value of the call, or raise its exception."""
+        if not self.done():
+            self._batch.flush()
+        return self._get()
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        if not self.done():
+            yield from self._batch.aflush().__await__()
+        return self._get()
+
+    def __repr__(self) -> str:
+        state = "done" if self.done() else "pending"
+        return f"<{type(self).__qualname__} {state}>"
+
+
+class _Call:
+    __slots__ = (
+        "cache",
+        "plan",
+        "args",
+        "kwds",
+        "deferred",
+        "duplicates",
+        "scripts",
+        "hash",
+        "ext_args",
+        "local_epoch",
+    )
+
+    def __init__(
+        self, cache: RedisFuncCache, plan: CallPlan, args: Sequence, kwds: Mapping[str, Any], deferred: Deferred
+    ):
+        self.cache = cache
+        self.plan = plan
+        self.args = args
+        self.kwds = kwds
+        self.deferred = deferred
+        self.duplicates: List[Deferred] = []  # of identical calls in the batch, executed by this one
+        self.scripts: Tuple[Any, Any] = (None, None)  # the plan's scripts or ascripts, as the batch is sync or async
+        self.hash: KeyT = b""
+        self.ext_args: Sequence = ()
+        self.local_epoch = 0
+
+    def lookup_local(self) -> bool:
+        """Hash the call and look it up in the local tier of its cache, return whether it was found."""
+        plan, cache = self.plan, self.cache
+        self.hash = plan.calc_hash(self.args, self.kwds)
+        local_cache = cache.local_cache
+        if local_cache is not None:
+            value = local_cache.get((plan.keys[1], self.hash), _MISSING)
+            if value is not _MISSING:
+                plan.stats.record_local_hit()
+                self.deferred._set_result(value)
+                return True
+            self.local_epoch = local_cache.epoch
+        self.ext_args = tuple(cache.policy.calc_ext_args(plan.function, self.args, self.kwds) or ())
+        return False
+
+    def get_call(self):
+        plan, cache = self.plan, self.cache
+        return (
+            self.scripts[0],
+            script_keys(plan.keys, self.hash),
+            (cache.ttl, self.hash, plan.encoded_options, *self.ext_args),
+        )
+
+    def put_call(self, value: Any):
+        plan, cache = self.plan, self.cache
+        args = (cache.maxsize, cache.ttl, self.hash, value, plan.encoded_options, *self.ext_args)
+        return self.scripts[1], script_keys(plan.keys, self.hash), args
+
+    def resolve(self, value: Any):
+        self.deferred._set_result(value)
+        for deferred in self.duplicates:
+            deferred._set_result(value)
+
+    def fail(self, error: BaseException):
+        self.deferred._set_error(error)
+        for deferred in self.duplicates:
+            deferred._set_error(error)
+
+    def stored(self, value: Any, serialized: Any, evicted: Any):
+        self.plan.stats.record_put(len(serialized), evicted)
+        local_cache = self.cache.local_cache
+        if local_cache is not None:
+            local_cache.put((self.plan.keys[1], self.hash), value, len(serialized), self.local_epoch)
+        self.resolve(value)
+
+
+class Batch:
+    """Context in which calls of decorated functions are deferred, and executed together in about two round trips.
+
+    Create it with :meth:`.RedisFuncCache.batch`. Inside the context, decorated functions return :class:`Deferred` placeholders.
+    When the context exits, or the first placeholder is accessed, the batch is executed:
+
+    1. the get scripts of all deferred calls are sent in one pipeline (one for each Redis client),
+    2. the misses are computed, one after another, and their put scripts are sent in a second pipeline.
+
+    Identical calls in a batch are executed once, and share the result.
+
+    Calls of functions decorated by different :class:`.RedisFuncCache` objects, with different key pairs, may be deferred in the same batch.
+    Calls deferred after an execution are executed on the next access, or when the context exits.
+
+    Use ``with`` for regular functions and a synchronous client, ``async with`` for coroutine functions and an asynchronous client.
+    Calls of the other kind are not deferred inside the context.
+    """
+
+    def __init__(self):
+        self._calls: List[_Call] = []
+        self._is_async = False
+        self._token = None
+
+    @property
+    def is_async(self) -> bool:
+        """Whether the batch is entered with ``async with``."""
+        return self._is_async
+
+    def __len__(self) -> int:
+        """Number of deferred calls not yet executed."""
+        return len(self._calls)
+
+    def defer(self, cache: RedisFuncCache, plan: CallPlan, args: Sequence, kwds: Mapping[str, Any]) -> Deferred:
+        """Add a call to the batch, and return its placeholder."""
+        deferred = Deferred(self)
+        self._calls.append(_Call(cache, plan, args, kwds, deferred))
+        return deferred
+
+    def __enter__(self) -> Batch:
+        self._token = _current_batch.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current_batch.reset(self._token)  # type: ignore[arg-type]
+        if exc_type is None:
+            self.flush()
+        else:
+            self._abort(exc_value)
+
+    async def __aenter__(self) -> Batch:
+        self._is_async = True
+        self._token = _current_batch.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        _current_batch.reset(self._token)  # type: ignore[arg-type]
+        if exc_type is None:
+            await self.aflush()
+        else:
+            self._abort(exc_value)
+
+    def _abort(self, error: BaseException):
+        calls, self._calls = self._calls, []
+        for call in calls:
+            call.deferred._set_error(RuntimeError(f"The batch was aborted by {error!r}"))
+
+    def _prepare(self) -> List[_Call]:
+        """Take the deferred calls, and return those not found in the local tiers.
+
+        Identical calls, with the same key pair and hash, are looked up once: the first one executes the others.
+        """
+        calls, self._calls = self._calls, []
+        lookups: Dict[Tuple[Tuple[KeyT, KeyT], KeyT], _Call] = {}
+        for call in calls:
+            try:
+                if self._is_async:
+                    call.scripts = call.plan.ascripts or call.cache._abind_scripts(call.plan)
+                else:
+                    call.scripts = call.plan.scripts or call.cache._bind_scripts(call.plan)
+                if not call.lookup_local():
+                    first = lookups.setdefault((call.plan.keys, call.hash), call)
+                    if first is not call:
+                        first.duplicates.append(call.deferred)
+            except Exception as err:
+                call.deferred._set_error(err)
+        return list(lookups.values())
+
+    def flush(self):
+        """Execute the deferred calls."""
+        if self._is_async:
+            raise RuntimeError("An asynchronous batch must be executed by aflush()")
+        token = _current_batch.set(None)  # user functions called below are not deferred
+        try:
+            lookups = self._prepare()
+            if not lookups:
+                return
+            misses = []
+            for call, cached in zip(lookups, run_script_calls([call.get_call() for call in lookups], False)):
+                try:
+                    if isinstance(cached, Exception):
+                        raise cached
+                    value = call.cache._resolve_lookup(
+                        call.plan, call.scripts[0], call.hash, call.ext_args, cached, call.local_epoch
+                    )
+                    if value is not _MISSING:
+                        call.resolve(value)
+                        continue
+                    misses.append((call, *call.cache._compute_value(call.plan, call.hash, call.args, call.kwds)))
+                except Exception as err:
+                    call.fail(err)
+            for call, _, _, _ in misses:
+                if call.cache.local_cache is not None:
+                    call.local_epoch = call.cache.local_cache.epoch
+            put_calls = [call.put_call(stored) for call, _, _, stored in misses]
+            for (call, value, serialized, _), result in zip(misses, run_script_calls(put_calls, False)):
+                if isinstance(result, Exception):
+                    call.fail(result)
+                else:
+                    call.stored(value, serialized, result)
+        finally:
+            _current_batch.reset(token)
+
+    async def aflush(self):
+        """Async version of :meth:`flush`"""
+        if not self._is_async:
+            raise RuntimeError("A synchronous batch must be executed by flush()")
+        token = _current_batch.set(None)
+        try:
+            lookups = self._prepare()
+            if not lookups:
+                return
+            misses = []
+            for call, cached in zip(lookups, await arun_script_calls([call.get_call() for call in lookups], False)):
+                try:
+                    if isinstance(cached, Exception):
+                        raise cached
+                    value = await call.cache._aresolve_lookup(
+                        call.plan, call.scripts[0], call.hash, call.ext_args, cached, call.local_epoch
+                    )
+                    if value is not _MISSING:
+                        call.resolve(value)
+                        continue
+                    misses.append((call, *await call.cache._acompute_value(call.plan, call.hash, call.args, call.kwds)))
+                except Exception as err:
+                    call.fail(err)
+            for call, _, _, _ in misses:
+                if call.cache.local_cache is not None:
+                    call.local_epoch = call.cache.local_cache.epoch
+            put_calls = [call.put_call(stored) for call, _, _, stored in misses]
+            for (call, value, serialized, _), result in zip(misses, await arun_script_calls(put_calls, False)):
+                if isinstance(result, Exception):
+                    call.fail(result)
+                else:
+                    call.stored(value, serialized, result)
+        finally:
+            _current_batch.reset(token)
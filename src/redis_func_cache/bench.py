@@ -0,0 +1,351 @@
+"""End-to-end load generator, driving a decorated function against a Redis server.
+
+Run it as a module, for example::
+
+    python -m redis_func_cache.bench --redis-url redis://localhost --mode threads --concurrency 8 --distribution zipf
+
+For each policy, the cache is purged, then ``--concurrency`` threads, processes or asyncio tasks call a decorated function
+for ``--duration`` seconds, with keys drawn from a Zipf, uniform or scan distribution over ``--keys`` distinct arguments.
+A miss runs the function, which returns ``--payload`` bytes after ``--delay`` seconds.
+
+The report has, for each policy, the throughput, the hit ratio, the p50 / p99 / p99.9 latencies of hits and misses,
+and the number of Redis commands per call, from the difference of ``INFO commandstats`` before and after the run,
+including those run by the Lua scripts.
+``--output`` also writes it as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from bisect import bisect
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from itertools import accumulate
+from time import perf_counter, perf_counter_ns, sleep
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import redis.asyncio
+from redis import Redis
+from redis.exceptions import ResponseError
+
+from .cache import RedisFuncCache
+from .policies.abstract import AbstractPolicy
+from .policies.fifo import FifoPolicy
+from .policies.fifo_t import FifoTPolicy
+from .policies.lfu import LfuPolicy
+from .policies.lru import LruPolicy
+from .policies.lru_t import LruTPolicy
+from .policies.mru import MruPolicy
+from .policies.rr import RrPolicy
+
+__all__ = ("POLICIES", "LoadConfig", "LoadResult", "KeySampler", "run_load", "main")
+
+POLICIES: Dict[str, Type[AbstractPolicy]] = {
+    policy.__key__: policy
+    for policy in (LruPolicy, LruTPolicy, LfuPolicy, FifoPolicy, FifoTPolicy, RrPolicy, MruPolicy)
+}
+"""Policies the load generator can run, by their key."""
+
+MODES = ("threads", "processes", "asyncio")
+DISTRIBUTIONS = ("zipf", "uniform", "scan")
+
+_missed: ContextVar[bool] = ContextVar("redis_func_cache_bench_missed", default=False)
+
+
+def load_function(key: int, size: int, delay: float) -> bytes:
+    """The decorated function: it returns ``size`` bytes after ``delay`` seconds."""
+    _missed.set(True)
+    if delay > 0:
+        sleep(delay)
+    return key.to_bytes(8, "big") * (size // 8) + bytes(size % 8)
+
+
+async def aload_function(key: int, size: int, delay: float) -> bytes:
+    """Async version of :func:`load_function`."""
+    _missed.set(True)
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return key.to_bytes(8, "big") * (size // 8) + bytes(size % 8)
+
+
+@dataclass(frozen=True)
+class LoadConfig:
+    """What to run, for one policy."""
+
+    policy: str
+    """Key of the policy in :data:`POLICIES`."""
+    redis_url: str = "redis://"
+    mode: str = "threads"
+    """One of ``threads``, ``processes`` or ``asyncio``."""
+    concurrency: int = 4
+    """Number of threads, processes or asyncio tasks calling the function."""
+    duration: float = 10.0
+    """Seconds each of them calls the function for."""
+    distribution: str = "zipf"
+    """One of ``zipf``, ``uniform`` or ``scan`` (each caller walks through the keys in order, from its own offset)."""
+    keys: int = 10_000
+    """Number of distinct arguments."""
+    zipf_s: float = 1.0
+    """Exponent of the Zipf distribution, the higher the more skewed."""
+    payload: int = 1024
+    """Size in bytes of the return value."""
+    delay: float = 0.0
+    """Seconds the function takes on a miss."""
+    maxsize: int = 1_000
+    """Maximum size of the cache."""
+    ttl: int = 600
+    """Time-to-live of the cache, in seconds."""
+    serializer: str = "pickle"
+    """Name of the return value serializer, see :data:`.SERIALIZERS`."""
+    seed: Optional[int] = None
+    """Seed of the key distributions, for reproducible runs."""
+
+
+@dataclass
+class LoadResult:
+    """Report of a run of :func:`run_load`, latencies are in microseconds."""
+
+    policy: str
+    calls: int
+    seconds: float
+    throughput: float
+    """Calls per second, for all the callers together."""
+    hit_ratio: float
+    hit_latency: Dict[str, Optional[float]]
+    """``p50``, ``p99`` and ``p999`` latencies of hits, :data:`None` if there was no hit."""
+    miss_latency: Dict[str, Optional[float]]
+    """Same as :attr:`hit_latency`, for misses."""
+    commands_per_call: Optional[float]
+    """Redis commands per call, :data:`None` if the server does not support ``INFO commandstats``."""
+
+
+class KeySampler:
+    """Callable returning the argument of the next call, according to a distribution of :class:`LoadConfig`."""
+
+    def __init__(self, distribution: str, keys: int, zipf_s: float = 1.0, seed: Optional[int] = None, offset: int = 0):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}, but got {distribution!r}")
+        if keys < 1:
+            raise ValueError(f"keys must be positive, but got {keys!r}")
+        self._distribution = distribution
+        self._keys = keys
+        self._rng = random.Random(seed)
+        self._next = offset % keys
+        if distribution == "zipf":
+            self._cum_weights = list(accumulate(1 / (k**zipf_s) for k in range(1, keys + 1)))
+
+    def __call__(self) -> int:
+        if self._distribution == "zipf":
+            return bisect(self._cum_weights, self._rng.random() * self._cum_weights[-1])
+        if self._distribution == "uniform":
+            return self._rng.randrange(self._keys)
+        key = self._next
+        self._next = (key + 1) % self._keys
+        return key
+
+
+def _make_cache(config: LoadConfig, client) -> RedisFuncCache:
+    return RedisFuncCache(
+        f"bench-{config.policy}",
+        POLICIES[config.policy],
+        client=client,
+        maxsize=config.maxsize,
+        ttl=config.ttl,
+        serializer=config.serializer,
+    )
+
+
+def _make_sampler(config: LoadConfig, worker: int) -> KeySampler:
+    seed = None if config.seed is None else config.seed + worker
+    offset = worker * config.keys // config.concurrency
+    return KeySampler(config.distribution, config.keys, config.zipf_s, seed, offset)
+
+
+def _call_loop(config: LoadConfig, cached: Callable, sampler: KeySampler) -> Tuple[List[int], List[int]]:
+    hits: List[int] = []
+    misses: List[int] = []
+    size, delay = config.payload, config.delay
+    deadline = perf_counter() + config.duration
+    while perf_counter() < deadline:
+        key = sampler()
+        _missed.set(False)
+        started = perf_counter_ns()
+        cached(key, size, delay)
+        elapsed = perf_counter_ns() - started
+        (misses if _missed.get() else hits).append(elapsed)
+    return hits, misses
+
+
+async def _acall_loop(config: LoadConfig, cached: Callable, sampler: KeySampler) -> Tuple[List[int], List[int]]:
+    hits: List[int] = []
+    misses: List[int] = []
+    size, delay = config.payload, config.delay
+    deadline = perf_counter() + config.duration
+    while perf_counter() < deadline:
+        key = sampler()
+        _missed.set(False)
+        started = perf_counter_ns()
+        await cached(key, size, delay)
+        elapsed = perf_counter_ns() - started
+        (misses if _missed.get() else hits).append(elapsed)
+    return hits, misses
+
+
+def _process_worker(config: LoadConfig, worker: int) -> Tuple[List[int], List[int]]:
+    client = Redis.from_url(config.redis_url)
+    try:
+        return _call_loop(config, _make_cache(config, client)(load_function), _make_sampler(config, worker))
+    finally:
+        client.close()
+
+
+async def _arun(config: LoadConfig) -> List[Tuple[List[int], List[int]]]:
+    client = redis.asyncio.Redis.from_url(config.redis_url)
+    try:
+        cached = _make_cache(config, client)(aload_function)
+        return await asyncio.gather(
+            *(_acall_loop(config, cached, _make_sampler(config, i)) for i in range(config.concurrency))
+        )
+    finally:
+        aclose = getattr(client, "aclose", None)  # redis-py 5.0.1+, the older versions have the close() coroutine
+        await (client.close() if aclose is None else aclose())
+
+
+def _command_calls(client: Redis) -> Optional[int]:
+    try:
+        stats = client.info("commandstats")
+    except ResponseError:
+        return None
+    return sum(v["calls"] for k, v in stats.items() if k != "cmdstat_info")
+
+
+def _percentiles(latencies: List[int]) -> Dict[str, Optional[float]]:
+    latencies = sorted(latencies)
+    n = len(latencies)
+    return {
+        name: latencies[min(n - 1, int(q * n))] / 1000 if n else None
+        for name, q in (("p50", 0.5), ("p99", 0.99), ("p999", 0.999))
+    }
+
+
+def run_load(config: LoadConfig) -> LoadResult:
+    """Purge the cache of ``config.policy``, run the load of ``config`` on it, and report what was measured."""
+    if config.policy not in POLICIES:
+        raise ValueError(f"policy must be one of {', '.join(POLICIES)}, but got {config.policy!r}")
+    if config.mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}, but got {config.mode!r}")
+    client = Redis.from_url(config.redis_url)
+    try:
+        cache = _make_cache(config, client)
+        cache.policy.purge()
+        calls_before = _command_calls(client)
+        started = perf_counter()
+        if config.mode == "threads":
+            cached = cache(load_function)
+            with ThreadPoolExecutor(config.concurrency) as executor:
+                results: Sequence[Tuple[List[int], List[int]]] = list(
+                    executor.map(
+                        lambda i: _call_loop(config, cached, _make_sampler(config, i)), range(config.concurrency)
+                    )
+                )
+        elif config.mode == "processes":
+            with ProcessPoolExecutor(config.concurrency) as executor:
+                results = list(executor.map(_process_worker, [config] * config.concurrency, range(config.concurrency)))
+        else:
+            results = asyncio.run(_arun(config))
+        seconds = perf_counter() - started
+        calls_after = _command_calls(client)
+    finally:
+        client.close()
+    hits = [t for worker_hits, _ in results for t in worker_hits]
+    misses = [t for _, worker_misses in results for t in worker_misses]
+    calls = len(hits) + len(misses)
+    commands_per_call = None
+    if calls and calls_before is not None and calls_after is not None:
+        commands_per_call = (calls_after - calls_before) / calls
+    return LoadResult(
+        policy=config.policy,
+        calls=calls,
+        seconds=seconds,
+        throughput=calls / seconds,
+        hit_ratio=len(hits) / calls if calls else 0.0,
+        hit_latency=_percentiles(hits),
+        miss_latency=_percentiles(misses),
+        commands_per_call=commands_per_call,
+    )
+
+
+def _format_us(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.0f}"
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Command line entry of ``python -m redis_func_cache.bench``."""
+    parser = argparse.ArgumentParser(
+        prog="python -m redis_func_cache.bench", description=__doc__.splitlines()[0] if __doc__ else None
+    )
+    parser.add_argument("--redis-url", "-u", default="redis://", help="URL of the Redis server (default: %(default)s)")
+    parser.add_argument(
+        "--policy", "-p", action="append", choices=list(POLICIES), help="policies to run, repeatable (default: all)"
+    )
+    parser.add_argument("--mode", "-m", choices=MODES, default="threads", help="how calls run concurrently")
+    parser.add_argument("--concurrency", "-c", type=int, default=4, help="number of threads, processes or tasks")
+    parser.add_argument("--duration", "-d", type=float, default=10.0, help="seconds of load for each policy")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="zipf", help="distribution of the keys")
+    parser.add_argument("--keys", "-k", type=int, default=10_000, help="number of distinct arguments")
+    parser.add_argument("--zipf-s", type=float, default=1.0, help="exponent of the Zipf distribution")
+    parser.add_argument("--payload", type=int, default=1024, help="size in bytes of the return value")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds the function takes on a miss")
+    parser.add_argument("--maxsize", type=int, default=1_000, help="maximum size of the cache")
+    parser.add_argument("--ttl", type=int, default=600, help="time-to-live of the cache in seconds")
+    parser.add_argument("--serializer", default="pickle", help="name of the return value serializer")
+    parser.add_argument("--seed", type=int, help="seed of the key distributions")
+    parser.add_argument("--output", "-o", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    configs = [
+        LoadConfig(
+            policy=policy,
+            redis_url=args.redis_url,
+            mode=args.mode,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            distribution=args.distribution,
+            keys=args.keys,
+            zipf_s=args.zipf_s,
+            payload=args.payload,
+            delay=args.delay,
+            maxsize=args.maxsize,
+            ttl=args.ttl,
+            serializer=args.serializer,
+            seed=args.seed,
+        )
+        for policy in args.policy or POLICIES
+    ]
+    print(
+        f"{'policy':<8}{'calls/s':>10}{'hit ratio':>10}"
+        f"{'hit p50':>9}{'p99':>8}{'p999':>8}{'miss p50':>10}{'p99':>8}{'p999':>8}{'cmds/call':>11}   (latencies in us)"
+    )
+    results: List[Dict[str, Any]] = []
+    for config in configs:
+        result = run_load(config)
+        results.append({"config": asdict(config), "result": asdict(result)})
+        hit, miss = result.hit_latency, result.miss_latency
+        cmds = "n/a" if result.commands_per_call is None else f"{result.commands_per_call:.2f}"
+        print(
+            f"{result.policy:<8}{result.throughput:>10.0f}{result.hit_ratio:>10.1%}"
+            f"{_format_us(hit['p50']):>9}{_format_us(hit['p99']):>8}{_format_us(hit['p999']):>8}"
+            f"{_format_us(miss['p50']):>10}{_format_us(miss['p99']):>8}{_format_us(miss['p999']):>8}{cmds:>11}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
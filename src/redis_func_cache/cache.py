@@ -1,23 +1,37 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 import weakref
-from functools import wraps
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial, wraps
+from hashlib import blake2b
 from inspect import iscoroutine, iscoroutinefunction
 from itertools import chain
+from math import log
+from random import random
+from threading import Lock
+from time import perf_counter, sleep
 from typing import (
     TYPE_CHECKING,
     Any,
+    Awaitable,
     Callable,
+    Dict,
     Generic,
     Iterable,
+    List,
     Mapping,
     Optional,
+    Protocol,
     Sequence,
+    Set,
     Tuple,
     Type,
     TypeVar,
     Union,
+    cast,
 )
 
 import redis.asyncio.client
@@ -26,12 +40,37 @@ import redis.client
 import redis.cluster
 import redis.commands.core
 
-from .constants import DEFAULT_MAXSIZE, DEFAULT_PREFIX, DEFAULT_TTL
+from .batch import _MISSING, Batch, current_batch
+from .chunking import aread_chunks, awrite_chunks, chunks_key, is_chunk_ref, read_chunks, split_chunks, write_chunks
+from .coalescing import AsyncCallCoalescer, CallCoalescer
+from .compression import Compressor
+from .config import LeaseConfig, StaleConfig, StorageConfig
+from .constants import (
+    DEDUP_DIGEST_SIZE,
+    DEFAULT_MAXSIZE,
+    DEFAULT_PREFIX,
+    DEFAULT_TTL,
+    LEASE_MAX_BACKOFF,
+    LEASE_MIN_BACKOFF,
+    STALE_REFRESH_TIMEOUT,
+)
+from .dispatcher import AsyncLookupDispatcher, LookupDispatcher
+from .invalidation import InvalidationListener
+from .local_cache import LocalCache
+from .pipeline import arun_script_calls, run_script_calls
+from .plan import CallPlan, make_args_normalizer
 from .policies.abstract import AbstractPolicy
+from .serialization import TaggedSerializer, tagged_loads
+from .stats import CacheInfo, CacheStats
+from .tracing import CallTrace, Tracer
+from .utils import get_fullname, lease_key, script_keys
+from .write_behind import WriteBehind
 
 if TYPE_CHECKING:  # pragma: no cover
     from redis.typing import EncodableT, EncodedT, KeyT
 
+    from .chunking import ChunksT
+
     FT = TypeVar("FT", bound=Callable)
     SerializerT = Callable[[Any], EncodedT]
     DeserializerT = Callable[[EncodedT], Any]
@@ -39,6 +78,80 @@ if TYPE_CHECKING:  # pragma: no cover
 
 __all__ = ("RedisFuncCache",)
 
+_logger = logging.getLogger(__name__)
+
+
+def _encode_options(options: Union[Mapping[str, Any], bytes, None]) -> bytes:
+    if isinstance(options, bytes):
+        return options
+    return json.dumps(options or {}, ensure_ascii=False).encode()
+
+
+def _with_compression(
+    serialize: SerializerT, deserialize: DeserializerT, compressor: Compressor
+) -> Tuple[SerializerT, DeserializerT]:
+    """Chain a serializer pair with the compressor."""
+    compress, decompress = compressor.compress, compressor.decompress
+
+    def compressed_serialize(value: Any) -> EncodedT:
+        return compress(serialize(value))  # type: ignore[arg-type]
+
+    def decompressed_deserialize(data: EncodedT) -> Any:
+        return deserialize(decompress(data))  # type: ignore[arg-type]
+
+    return compressed_serialize, decompressed_deserialize
+
+
+async def _as_awaitable(value: Any) -> Any:
+    if iscoroutine(value):
+        return await value
+    return value
+
+
+def _split_elementwise(elements: Sequence, ret_val: Any, returns: Type[Union[list, dict]]) -> List[Any]:
+    """Results of a batch-native function, in the order of ``elements``; :data:`_MISSING` for elements absent from a dict."""
+    if returns is dict:
+        if not isinstance(ret_val, Mapping):
+            raise TypeError(f"An elementwise function returning dict returned {type(ret_val)}")
+        return [ret_val.get(element, _MISSING) for element in elements]
+    ret_val = list(ret_val)
+    if len(ret_val) != len(elements):
+        raise ValueError(
+            f"An elementwise function called with {len(elements)} elements returned {len(ret_val)} results"
+        )
+    return ret_val
+
+
+def _stitch_elementwise(elements: Sequence, results: List[Any], returns: Type[Union[list, dict]]) -> Union[list, dict]:
+    if returns is dict:
+        return {element: result for element, result in zip(elements, results) if result is not _MISSING}
+    return results
+
+
+class _CachedFunction(Protocol):
+    """The wrapper of a decorated function, with the attributes set by :meth:`RedisFuncCache.decorate`."""
+
+    __call_plan__: CallPlan
+    cache_info: Callable[[], CacheInfo]
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any: ...
+
+
+def _run_original(function: Callable, args: Sequence, kwds: Mapping[str, Any]) -> Any:
+    """Run the original function of a decorated one, in an executor.
+
+    The decorated function is submitted rather than the original one,
+    because a process pool can only pickle the decorated one, by reference.
+    """
+    plan: Optional[CallPlan] = getattr(function, "__call_plan__", None)
+    if plan is not None:
+        function = plan.function
+    ret_val = function(*args, **kwds)
+    if iscoroutine(ret_val):
+        return asyncio.run(ret_val)
+    return ret_val
+
+
 RedisClientT = TypeVar(
     "RedisClientT",
     bound=Union[
@@ -56,7 +169,19 @@ class RedisFuncCache(Generic[RedisClientT]):
         maxsize: Optional[int] = None,
         ttl: Optional[int] = None,
         prefix: Optional[str] = None,
-        serializer: Union[Tuple[SerializerT, DeserializerT], None] = None,
+        serializer: Union[str, Tuple[SerializerT, DeserializerT], None] = None,
+        local_cache: Optional[LocalCache] = None,
+        invalidation_channel: Optional[str] = None,
+        lease: Optional[LeaseConfig] = None,
+        coalesce: bool = False,
+        micro_batch_window: Optional[float] = None,
+        write_behind: Optional[WriteBehind] = None,
+        stale: Optional[StaleConfig] = None,
+        entry_ttl: Optional[float] = None,
+        ttl_jitter: Optional[float] = None,
+        compressor: Optional[Compressor] = None,
+        storage: Optional[StorageConfig] = None,
+        tracer: Optional[Tracer] = None,
     ):
         """Initializes the Cache instance with the given parameters.
 
@@ -103,7 +228,8 @@ class RedisFuncCache(Generic[RedisClientT]):
 
             serializer: Optional serialize/deserialize function pair for return value of what decorated.
 
-                If not provided, the cache will use :func:`json.dumps` and :func:`json.loads`.
+                If not provided, the cache will use :func:`json.dumps`, and :func:`.tagged_loads` to deserialize,
+                which also reads values written by any named serializer below.
 
                 ``serializer`` is a pair of callbacks, the first one is used to serialize return value, the second one is used to deserialize return value.
 
@@ -119,7 +245,122 @@ class RedisFuncCache(Generic[RedisClientT]):
 
                 We can then pass the two callbacks to ``serializer`` parameter::
 
-                    my_cache = RedisFuncCache(__name__, MyPolicy, redis_client, serializer=(my_serializer, my_deserializer))
+                    my_cache = RedisFuncCache(
+                        __name__, MyPolicy, redis_client, serializer=(my_serializer, my_deserializer)
+                    )
+
+                It can also be the name of a serializer in :data:`.SERIALIZERS`, such as ``"pickle"``, ``"orjson"`` or ``"msgpack"``.
+                Values are then prefixed with a tag byte of their serializer, see :class:`.TaggedSerializer`,
+                so that changing the serializer later does not break the values already cached.
+                :func:`.fastest_serializer` tells which one is the fastest for a sample return value.
+
+            local_cache: Optional in-process near-cache tier in front of Redis.
+
+                If provided, it is consulted before :meth:`.get`, and filled on both hits and :meth:`.put`.
+                It stores already deserialized return values, so a local hit skips Redis, the Lua script and :meth:`.deserialize_return_value` entirely.
+                Staleness of a local hit is bounded by :attr:`.LocalCache.ttl`.
+
+                Assigned to property :meth:`.local_cache`.
+
+            invalidation_channel: Optional name of a Redis Pub/Sub channel to keep local tiers coherent.
+
+                If provided, the put Lua scripts publish every written or evicted hash on the channel,
+                and :meth:`.AbstractPolicy.purge` publishes every deleted key.
+                When ``local_cache`` is also provided, a background subscriber drops the changed entries from the local tier as soon as the message arrives,
+                so a local hit is not served after the entry changed in Redis.
+
+                All caches sharing the same Redis key pairs **SHOULD** use the same channel.
+                Expiration of the whole key pair by ``ttl`` is not published, the local tier's own ttl still bounds it.
+
+                Call :meth:`.close` or :meth:`.aclose` to stop the subscriber.
+
+            lease: Optional compute lease, to prevent cache stampedes, see :class:`.LeaseConfig`.
+
+                If provided, on a miss only the caller taking the lease for the hash runs the user function,
+                and the other callers, in any process, wait for the value it puts.
+
+                Assigned to property :meth:`.lease`.
+
+            coalesce: Whether to coalesce concurrent identical calls in the process.
+
+                If :data:`True`, while a call is looking up Redis or running the user function,
+                other threads (or tasks of the same event loop) calling the decorated function with the same key pair and hash wait for it,
+                instead of issuing their own lookup, execution and put.
+                All of them get the same return value object, or the same exception.
+
+                Assigned to property :meth:`.coalesce`.
+
+            micro_batch_window: Optional time window (in seconds) to automatically batch concurrent lookups, e.g. ``200e-6``.
+
+                If provided, the get scripts of concurrent calls are not sent one by one, but collected and sent in a single pipeline,
+                and each result is routed back to its caller:
+
+                - with an asynchronous client, lookups issued by tasks within one iteration of the event loop are batched, the window is not used;
+                - with a synchronous client, the first thread looking up waits for the window, and then sends the lookups of all threads issued meanwhile.
+
+                So the throughput scales with concurrency, instead of being capped by per-command round trips,
+                at the cost of the window added to the latency of a lookup from a thread.
+
+                Assigned to property :meth:`.micro_batch_window`.
+
+            write_behind: Optional queue to write the puts after misses in the background.
+
+                If provided, a call missing the cache returns as soon as the user function's value is serialized,
+                and its put is queued to a background thread or task, which writes the queued puts in pipelined batches.
+                Until the put is written, concurrent calls in other processes may miss and compute again,
+                and a pending put may be lost if the process crashes.
+
+                Bulk and batched calls, such as :meth:`.exec_plan_many` and :meth:`.batch`, still write their puts before returning.
+
+                Call :meth:`.close` or :meth:`.aclose` to write the pending puts.
+                Assigned to property :meth:`.write_behind`.
+
+            stale: Optional stale-while-revalidate, and probabilistic early recomputation, see :class:`.StaleConfig`.
+
+                If provided, entries older than :attr:`.StaleConfig.after` are still returned, marked as stale,
+                while exactly one caller refreshes them.
+
+                Assigned to property :meth:`.stale`.
+
+            entry_ttl: Optional time-to-live (in seconds) of each entry, counted from its put.
+
+                Unlike ``ttl``, which expires the whole key pair once no get or put happened for that long,
+                it expires entries one by one, so busy caches do not keep serving old entries, and idle caches do not vanish at once.
+                On [Redis][] 7.4 and later, the put Lua scripts expire the hash field with ``HPEXPIRE``.
+                Before, they record the expiry time in a sorted set next to the hash map,
+                which the get Lua scripts check lazily, and the put Lua scripts evict expired entries first when the cache is full.
+
+                It may be combined with ``ttl`` to also drop abandoned key pairs, or ``ttl`` may be disabled with ``0``.
+                Assigned to property :meth:`.entry_ttl`.
+
+            ttl_jitter: Optional fraction, from ``0`` to ``1``, by which each entry's ``entry_ttl`` is randomly shortened,
+                so that entries put at the same time, e.g. after a deploy, do not all expire together.
+
+                Requires ``entry_ttl``.
+                Assigned to property :meth:`.ttl_jitter`.
+
+            compressor: Optional compression of serialized return values.
+
+                If provided, values are compressed after :meth:`.serialize_return_value` and before the put Lua script,
+                and decompressed after the get Lua script and before :meth:`.deserialize_return_value`.
+                Each value has a one-byte header telling its codec, so values compressed by any codec,
+                or not compressed at all, coexist in the cache.
+
+                Assigned to property :meth:`.compressor`.
+
+            storage: Optional chunked and deduplicated storage of serialized return values, see :class:`.StorageConfig`.
+
+                Assigned to property :meth:`.storage`.
+
+            tracer: Optional observer of the latency of each stage of the calls, e.g. :class:`.SlowCallLogger` or :class:`.OpenTelemetryTracer`.
+
+                If provided, the calls it samples record the time spent hashing the arguments, in the get Lua script,
+                deserializing, in the user function, serializing and in the put Lua script,
+                and the resulting :class:`.CallTrace` is passed to :meth:`.Tracer.on_call` when the call returns or raises.
+                Calls not sampled, and all calls without a tracer, only pay for a check.
+                Bulk, batched and element-wise calls, and background refreshes, are not traced.
+
+                Assigned to property :meth:`.tracer`.
 
         """
         self._name = name
@@ -135,8 +376,83 @@ class RedisFuncCache(Generic[RedisClientT]):
             self._redis_instance = client
         self._maxsize = DEFAULT_MAXSIZE if maxsize is None else int(maxsize)
         self._ttl = DEFAULT_TTL if ttl is None else int(ttl)
-        self._user_return_value_serializer: Optional[SerializerT] = serializer[0] if serializer else None
-        self._user_return_value_deserializer: Optional[DeserializerT] = serializer[1] if serializer else None
+        serializers: Optional[Tuple[SerializerT, DeserializerT]]
+        if isinstance(serializer, str):
+            tagged = TaggedSerializer(serializer)
+            serializers = tagged.dumps, tagged.loads
+        else:
+            serializers = serializer
+        self._user_return_value_serializer: Optional[SerializerT] = serializers[0] if serializers else None
+        self._user_return_value_deserializer: Optional[DeserializerT] = serializers[1] if serializers else None
+        self._local_cache = local_cache
+        self._invalidation_channel = invalidation_channel
+        self._invalidation_listener: Optional[InvalidationListener] = None
+        self._script_options: Mapping[str, Any] = {}
+        if invalidation_channel:
+            if local_cache is not None:
+                self._invalidation_listener = InvalidationListener(local_cache, invalidation_channel)
+                self._script_options = self._invalidation_listener.script_options
+            else:
+                self._script_options = {"invalidation_channel": invalidation_channel}
+        self._lease = lease
+        self._lease_timeout = None if lease is None else float(lease.timeout)
+        if self._lease_timeout is not None:
+            self._script_options = {**self._script_options, "lease": max(1, int(self._lease_timeout * 1000))}
+        self._coalescer: Optional[CallCoalescer] = CallCoalescer() if coalesce else None
+        self._acoalescer: Optional[AsyncCallCoalescer] = AsyncCallCoalescer() if coalesce else None
+        self._micro_batch_window = None if micro_batch_window is None else float(micro_batch_window)
+        self._dispatcher: Optional[LookupDispatcher] = None
+        self._adispatcher: Optional[AsyncLookupDispatcher] = None
+        if self._micro_batch_window is not None:
+            if self._micro_batch_window < 0:
+                raise ValueError(f"micro_batch_window must not be negative, but got {micro_batch_window!r}")
+            self._dispatcher = LookupDispatcher(self._micro_batch_window)
+            self._adispatcher = AsyncLookupDispatcher()
+        self._write_behind = write_behind
+        self._stale = stale
+        self._background_refresh = stale is not None and bool(stale.background_refresh)
+        self._refresh_executor: Optional[Executor] = None
+        self._owns_refresh_executor = True
+        self._refresh_lock = Lock()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self._early_recompute: Optional[float] = None
+        self._fresh_ms = self._refresh_ms = 0
+        if stale is not None:
+            self._fresh_ms = max(1, int(stale.after * 1000))
+            self._refresh_ms = max(1, int((self._lease_timeout or STALE_REFRESH_TIMEOUT) * 1000))
+            swr = {
+                "fresh": self._fresh_ms,
+                "stale": 0 if stale.ttl is None else max(1, int(stale.ttl * 1000)),
+                "refresh": self._refresh_ms,
+            }
+            self._script_options = {**self._script_options, "swr": swr}
+            if isinstance(stale.background_refresh, Executor):
+                self._refresh_executor = stale.background_refresh
+                self._owns_refresh_executor = False
+            self._early_recompute = None if stale.early_recompute is None else float(stale.early_recompute)
+        self._uses_leases = lease is not None or stale is not None
+        self._compressor = compressor
+        self._entry_ttl = None if entry_ttl is None else float(entry_ttl)
+        self._ttl_jitter = None if ttl_jitter is None else float(ttl_jitter)
+        if self._entry_ttl is not None:
+            if self._entry_ttl <= 0:
+                raise ValueError(f"entry_ttl must be positive, but got {entry_ttl!r}")
+            self._script_options = {**self._script_options, "entry_ttl": max(1, int(self._entry_ttl * 1000))}
+            if self._ttl_jitter is not None:
+                if not 0 <= self._ttl_jitter < 1:
+                    raise ValueError(f"ttl_jitter must be in [0, 1), but got {ttl_jitter!r}")
+                self._script_options = {**self._script_options, "ttl_jitter": self._ttl_jitter}
+        elif self._ttl_jitter is not None:
+            raise ValueError("ttl_jitter requires entry_ttl")
+        self._storage = storage
+        self._chunk_size = None if storage is None or storage.chunk_size is None else int(storage.chunk_size)
+        if self._chunk_size is not None:
+            self._script_options = {**self._script_options, "chunks": True}
+        self._dedup = storage is not None and storage.dedup
+        if self._dedup:
+            self._script_options = {**self._script_options, "dedup": True}
+        self._function_stats: Dict[str, CacheStats] = {}
+        self._tracer = tracer
 
     @property
     def name(self) -> str:
@@ -180,6 +496,112 @@ class RedisFuncCache(Generic[RedisClientT]):
         """time-to-live (in seconds) for the cache"""
         return self._ttl
 
+    @property
+    def lease(self) -> Optional[LeaseConfig]:
+        """The compute lease, or :data:`None` if stampede protection is not used."""
+        return self._lease
+
+    @property
+    def coalesce(self) -> bool:
+        """Whether concurrent identical calls in the process are coalesced."""
+        return self._coalescer is not None
+
+    @property
+    def micro_batch_window(self) -> Optional[float]:
+        """Time window (in seconds) of automatic batching of concurrent lookups, or :data:`None` if not used."""
+        return self._micro_batch_window
+
+    @property
+    def stale(self) -> Optional[StaleConfig]:
+        """Stale-while-revalidate, or :data:`None` if stale values are not served."""
+        return self._stale
+
+    @property
+    def compressor(self) -> Optional[Compressor]:
+        """Compression of serialized return values, or :data:`None` if not used."""
+        return self._compressor
+
+    @property
+    def storage(self) -> Optional[StorageConfig]:
+        """Chunked and deduplicated storage of serialized return values, or :data:`None` if not used."""
+        return self._storage
+
+    @property
+    def tracer(self) -> Optional[Tracer]:
+        """Observer of the latency of each stage of the calls, or :data:`None` if calls are not traced."""
+        return self._tracer
+
+    @property
+    def entry_ttl(self) -> Optional[float]:
+        """Time-to-live (in seconds) of each entry, or :data:`None` if entries only expire with their key pair."""
+        return self._entry_ttl
+
+    @property
+    def ttl_jitter(self) -> Optional[float]:
+        """Maximum fraction by which each entry's :attr:`entry_ttl` is randomly shortened, or :data:`None` if not used."""
+        return self._ttl_jitter
+
+    @property
+    def write_behind(self) -> Optional[WriteBehind]:
+        """The queue of puts written in the background, or :data:`None` if puts are written before returning."""
+        return self._write_behind
+
+    @property
+    def local_cache(self) -> Optional[LocalCache]:
+        """The in-process near-cache tier, or :data:`None` if not used."""
+        return self._local_cache
+
+    @property
+    def invalidation_channel(self) -> Optional[str]:
+        """Name of the Pub/Sub channel on which changes are published, or :data:`None` if not used."""
+        return self._invalidation_channel
+
+    @property
+    def invalidation_listener(self) -> Optional[InvalidationListener]:
+        """The subscriber keeping :attr:`local_cache` coherent, or :data:`None` if not used."""
+        return self._invalidation_listener
+
+    def stats(self) -> CacheInfo:
+        """Counters of hits, misses, puts, evictions and bytes, summed over all the functions of the cache.
+
+        See :meth:`.function_stats` for the counters of each function.
+        """
+        return CacheInfo.total(stats.info() for stats in list(self._function_stats.values()))
+
+    def function_stats(self) -> Dict[str, CacheInfo]:
+        """Counters of each function called through the cache, by full name (``module:qualname``).
+
+        They are also returned by the ``cache_info()`` method of each decorated function.
+        """
+        return {name: stats.info() for name, stats in list(self._function_stats.items())}
+
+    def reset_stats(self):
+        """Set the counters of all the functions of the cache to zero."""
+        for stats in list(self._function_stats.values()):
+            stats.reset()
+
+    def close(self):
+        """Stop background workers of the cache, such as the invalidation subscriber,
+        and wait for the pending puts of write-behind and background refreshes."""
+        if self._owns_refresh_executor:
+            with self._refresh_lock:
+                executor, self._refresh_executor = self._refresh_executor, None
+            if executor is not None:
+                executor.shutdown()
+        if self._write_behind is not None:
+            self._write_behind.close()
+        if self._invalidation_listener is not None:
+            self._invalidation_listener.stop()
+
+    async def aclose(self):
+        """Async version of :meth:`.close`"""
+        if self._refresh_tasks:
+            await asyncio.gather(*self._refresh_tasks, return_exceptions=True)
+        if self._write_behind is not None:
+            await self._write_behind.aclose()
+        if self._invalidation_listener is not None:
+            await self._invalidation_listener.astop()
+
     def serialize_return_value(self, value: Any) -> EncodedT:
         """Serialize return value of what decorated."""
         if self._user_return_value_serializer:
@@ -190,7 +612,7 @@ class RedisFuncCache(Generic[RedisClientT]):
         """Deserialize return value of what decorated."""
         if self._user_return_value_deserializer:
             return self._user_return_value_deserializer(data)
-        return json.loads(data)
+        return tagged_loads(data)
 
     @classmethod
     def get(
@@ -199,19 +621,28 @@ class RedisFuncCache(Generic[RedisClientT]):
         key_pair: Tuple[KeyT, KeyT],
         hash: KeyT,
         ttl: int,
-        options: Optional[Mapping[str, Any]] = None,
+        options: Union[Mapping[str, Any], bytes, None] = None,
         ext_args: Optional[Iterable[EncodableT]] = None,
     ) -> Optional[EncodedT]:
         """Execute the given redis lua script with given arguments.
 
         The script shall try get the return value from cache with given keys and hash.
 
+        ``options`` is passed to the script as JSON, it may also be given as already encoded JSON bytes.
+
         Returns:
             The hit return value, or :data:`None` if missing.
+
+            When ``options`` has a ``lease`` (milliseconds), :data:`None` also means the caller now holds the compute lease,
+            and ``0`` means the lease is held by another caller.
+
+            When ``options`` has ``swr`` (set by ``stale``), a hit is a ``[value, state]`` list,
+            where ``state`` is ``0`` for a fresh value, ``1`` for a stale value whose refresh lease the caller now holds,
+            and ``2`` for a stale value being refreshed by another caller.
         """
-        encoded_options = json.dumps(options or {}, ensure_ascii=False).encode()
+        encoded_options = _encode_options(options)
         ext_args = ext_args or ()
-        return script(keys=key_pair, args=chain((ttl, hash, encoded_options), ext_args))
+        return script(keys=script_keys(key_pair, hash), args=chain((ttl, hash, encoded_options), ext_args))
 
     @classmethod
     async def aget(
@@ -220,13 +651,13 @@ class RedisFuncCache(Generic[RedisClientT]):
         key_pair: Tuple[KeyT, KeyT],
         hash: KeyT,
         ttl: int,
-        options: Optional[Mapping[str, Any]] = None,
+        options: Union[Mapping[str, Any], bytes, None] = None,
         ext_args: Optional[Iterable[EncodableT]] = None,
     ) -> Optional[EncodedT]:
         """Async version of :meth:`.get`"""
-        encoded_options = json.dumps(options or {}, ensure_ascii=False).encode()
+        encoded_options = _encode_options(options)
         ext_args = ext_args or ()
-        return await script(keys=key_pair, args=chain((ttl, hash, encoded_options), ext_args))
+        return await script(keys=script_keys(key_pair, hash), args=chain((ttl, hash, encoded_options), ext_args))
 
     @classmethod
     def put(
@@ -237,17 +668,22 @@ class RedisFuncCache(Generic[RedisClientT]):
         value: EncodableT,
         maxsize: int,
         ttl: int,
-        options: Optional[Mapping[str, Any]] = None,
+        options: Union[Mapping[str, Any], bytes, None] = None,
         ext_args: Optional[Iterable[EncodableT]] = None,
     ):
         """Execute the given redis lua script with given arguments.
 
         The script shall put the return value into cache with given keys and hash.
         If the cache reached its :meth:`maxsize`, it shall remove one item according to its :meth:`policy`, before insert.
+
+        Returns:
+            The number of entries evicted by the script.
         """
-        encoded_options = json.dumps(options or {}, ensure_ascii=False).encode()
+        encoded_options = _encode_options(options)
         ext_args = ext_args or ()
-        script(keys=key_pair, args=chain((maxsize, ttl, hash, value, encoded_options), ext_args))
+        return script(
+            keys=script_keys(key_pair, hash), args=chain((maxsize, ttl, hash, value, encoded_options), ext_args)
+        )
 
     @classmethod
     async def aput(
@@ -258,37 +694,173 @@ class RedisFuncCache(Generic[RedisClientT]):
         value: EncodableT,
         maxsize: int,
         ttl: int,
-        options: Optional[Mapping[str, Any]] = None,
+        options: Union[Mapping[str, Any], bytes, None] = None,
         ext_args: Optional[Iterable[EncodableT]] = None,
     ):
         """Same as :meth:`.put` but async."""
-        encoded_options = json.dumps(options or {}, ensure_ascii=False).encode()
+        encoded_options = _encode_options(options)
         ext_args = ext_args or ()
-        await script(keys=key_pair, args=chain((maxsize, ttl, hash, value, encoded_options), ext_args))
+        return await script(
+            keys=script_keys(key_pair, hash), args=chain((maxsize, ttl, hash, value, encoded_options), ext_args)
+        )
 
-    def exec(self, user_function: Callable, user_args: Sequence, user_kwds: Mapping[str, Any], **options):
-        """Execute the given user function with given arguments.
+    @classmethod
+    def get_many(
+        cls,
+        script: redis.commands.core.Script,
+        key_pair: Tuple[KeyT, KeyT],
+        hashes: Sequence[KeyT],
+        ttl: int,
+        options: Union[Mapping[str, Any], bytes, None] = None,
+        ext_args: Optional[Sequence[Optional[Iterable[EncodableT]]]] = None,
+    ) -> List[Optional[EncodedT]]:
+        """Bulk version of :meth:`.get`, running the script for each of ``hashes`` in one pipeline.
 
-        In this method, :meth:`.get` is called before the ``user_function``, and :meth:`.put` is called afterward.
+        ``ext_args``, if provided, holds the extended arguments of each hash.
+
+        Returns:
+            The results of :meth:`.get`, in the order of ``hashes``.
+        """
+        encoded_options = _encode_options(options)
+        ext_args = ext_args or [()] * len(hashes)
+        return run_script_calls(
+            [
+                (script, script_keys(key_pair, hash), (ttl, hash, encoded_options, *(ext or ())))
+                for hash, ext in zip(hashes, ext_args)
+            ]
+        )
+
+    @classmethod
+    async def aget_many(
+        cls,
+        script: redis.commands.core.AsyncScript,
+        key_pair: Tuple[KeyT, KeyT],
+        hashes: Sequence[KeyT],
+        ttl: int,
+        options: Union[Mapping[str, Any], bytes, None] = None,
+        ext_args: Optional[Sequence[Optional[Iterable[EncodableT]]]] = None,
+    ) -> List[Optional[EncodedT]]:
+        """Async version of :meth:`.get_many`"""
+        encoded_options = _encode_options(options)
+        ext_args = ext_args or [()] * len(hashes)
+        return await arun_script_calls(
+            [
+                (script, script_keys(key_pair, hash), (ttl, hash, encoded_options, *(ext or ())))
+                for hash, ext in zip(hashes, ext_args)
+            ]
+        )
+
+    @classmethod
+    def put_many(
+        cls,
+        script: redis.commands.core.Script,
+        key_pair: Tuple[KeyT, KeyT],
+        hashes: Sequence[KeyT],
+        values: Sequence[EncodableT],
+        maxsize: int,
+        ttl: int,
+        options: Union[Mapping[str, Any], bytes, None] = None,
+        ext_args: Optional[Sequence[Optional[Iterable[EncodableT]]]] = None,
+    ):
+        """Bulk version of :meth:`.put`, running the script for each pair of ``hashes`` and ``values`` in one pipeline.
+
+        Every put still applies the eviction of the policy, in order.
+
+        Returns:
+            The numbers of entries evicted by each put, in the order of ``hashes``.
+        """
+        encoded_options = _encode_options(options)
+        ext_args = ext_args or [()] * len(hashes)
+        return run_script_calls(
+            [
+                (script, script_keys(key_pair, hash), (maxsize, ttl, hash, value, encoded_options, *(ext or ())))
+                for hash, value, ext in zip(hashes, values, ext_args)
+            ]
+        )
+
+    @classmethod
+    async def aput_many(
+        cls,
+        script: redis.commands.core.AsyncScript,
+        key_pair: Tuple[KeyT, KeyT],
+        hashes: Sequence[KeyT],
+        values: Sequence[EncodableT],
+        maxsize: int,
+        ttl: int,
+        options: Union[Mapping[str, Any], bytes, None] = None,
+        ext_args: Optional[Sequence[Optional[Iterable[EncodableT]]]] = None,
+    ):
+        """Async version of :meth:`.put_many`"""
+        encoded_options = _encode_options(options)
+        ext_args = ext_args or [()] * len(hashes)
+        return await arun_script_calls(
+            [
+                (script, script_keys(key_pair, hash), (maxsize, ttl, hash, value, encoded_options, *(ext or ())))
+                for hash, value, ext in zip(hashes, values, ext_args)
+            ]
+        )
+
+    def batch(self) -> Batch:
+        """Create a :class:`.Batch` context, in which calls of decorated functions are deferred and pipelined.
+
+        Example::
+
+            with cache.batch():
+                user = get_user(user_id)
+                orders = get_orders(user_id)  # may be decorated by another cache
+            print(user.result(), orders.result())
+
+        In an ``async with cache.batch()`` context, awaiting a decorated coroutine function returns the placeholder,
+        which is awaited again for the value.
         """
+        return Batch()
+
+    def make_plan(
+        self,
+        user_function: Callable,
+        *,
+        normalize: bool = False,
+        ignore: Optional[Iterable[str]] = None,
+        key: Optional[Callable[..., Any]] = None,
+        **options,
+    ) -> CallPlan:
+        """Build the :class:`.CallPlan` of ``user_function``.
+
+        Args:
+            user_function: The function to be cached.
+            normalize: Hash the arguments bound to the signature of ``user_function``, with defaults applied,
+                so that ``f(1, 2)``, ``f(1, b=2)`` and ``f(a=1, b=2)`` share one cache entry.
+            ignore: Names of parameters not hashed, such as loggers, database sessions or request objects. It implies ``normalize``.
+            key: A function called with the arguments of ``user_function``, whose return value is hashed instead of the arguments.
+            options: Options passed to the Lua scripts, as JSON.
+
+        See :func:`.make_args_normalizer` for details of ``normalize``, ``ignore`` and ``key``.
+        """
+        encoded_options = _encode_options({**options, **self._script_options})
+        serialize: SerializerT = self.serialize_return_value
+        deserialize: DeserializerT = self.deserialize_return_value
+        if self._compressor is not None:
+            serialize, deserialize = _with_compression(serialize, deserialize, self._compressor)
+        return CallPlan(
+            user_function,
+            self.policy,
+            encoded_options,
+            serialize,
+            deserialize,
+            make_args_normalizer(user_function, normalize, ignore, key),
+            self._function_stats.setdefault(get_fullname(user_function), CacheStats()),
+        )
+
+    def _bind_scripts(self, plan: CallPlan) -> Tuple[redis.commands.core.Script, redis.commands.core.Script]:
         script_0, script_1 = self.policy.lua_scripts
         if not (isinstance(script_0, redis.commands.core.Script) and isinstance(script_1, redis.commands.core.Script)):
             raise RuntimeError(
                 f"A tuple of two {redis.commands.core.Script} objects is required for execution, but actually got ({script_0!r}, {script_1!r})."
             )
-        keys = self.policy.calc_keys(user_function, user_args, user_kwds)
-        hash = self.policy.calc_hash(user_function, user_args, user_kwds)
-        ext_args = self.policy.calc_ext_args(user_function, user_args, user_kwds) or ()
-        cached = self.get(script_0, keys, hash, self.ttl, options, ext_args)
-        if cached is not None:
-            return self.deserialize_return_value(cached)
-        user_return_value = user_function(*user_args, **user_kwds)
-        user_retval_serialized = self.serialize_return_value(user_return_value)
-        self.put(script_1, keys, hash, user_retval_serialized, self.maxsize, self.ttl, options, ext_args)
-        return user_return_value
+        plan.scripts = script_0, script_1
+        return script_0, script_1
 
-    async def aexec(self, user_function: Callable, user_args: Sequence, user_kwds: Mapping[str, Any], **options):
-        """Async version of :meth:`.exec`"""
+    def _abind_scripts(self, plan: CallPlan) -> Tuple[redis.commands.core.AsyncScript, redis.commands.core.AsyncScript]:
         script_0, script_1 = self.policy.lua_scripts
         if not (
             isinstance(script_0, redis.commands.core.AsyncScript)
@@ -297,37 +869,952 @@ class RedisFuncCache(Generic[RedisClientT]):
             raise RuntimeError(
                 f"A tuple of two {redis.commands.core.AsyncScript} objects is required for async execution, but actually got ({script_0!r}, {script_1!r})."
             )
-        keys = self.policy.calc_keys(user_function, user_args, user_kwds)
-        hash = self.policy.calc_hash(user_function, user_args, user_kwds)
-        ext_args = self.policy.calc_ext_args(user_function, user_args, user_kwds) or ()
-        cached = await self.aget(script_0, keys, hash, self.ttl, options, ext_args)
+        if self._redis_factory is None:  # otherwise the scripts are registered with a client of each event loop
+            plan.ascripts = script_0, script_1
+        return script_0, script_1
+
+    def _release_leases(self, keys: Tuple[KeyT, KeyT], hashes: Iterable[KeyT]):
+        """Release the compute leases of ``hashes`` held by this caller, after the user function failed."""
+        self.client.delete(*(lease_key(keys[1], hash) for hash in hashes))
+
+    async def _arelease_leases(self, keys: Tuple[KeyT, KeyT], hashes: Iterable[KeyT]):
+        """Async version of :meth:`._release_leases`"""
+        await self.client.delete(*(lease_key(keys[1], hash) for hash in hashes))  # type: ignore[misc]
+
+    def _wait_lease(
+        self,
+        script: redis.commands.core.Script,
+        keys: Tuple[KeyT, KeyT],
+        hash: KeyT,
+        encoded_options: bytes,
+        ext_args: Iterable[EncodableT],
+        cached: Any,
+    ) -> Optional[EncodedT]:
+        """Look up again with backoff while another caller holds the compute lease.
+
+        Returns:
+            The value stored by the lease holder, or :data:`None` if the lease was taken over by this caller.
+        """
+        delay = LEASE_MIN_BACKOFF
+        while isinstance(cached, int):
+            sleep(delay)
+            delay = min(2 * delay, LEASE_MAX_BACKOFF)
+            cached = self.get(script, keys, hash, self.ttl, encoded_options, ext_args)
+        return cached
+
+    async def _await_lease(
+        self,
+        script: redis.commands.core.AsyncScript,
+        keys: Tuple[KeyT, KeyT],
+        hash: KeyT,
+        encoded_options: bytes,
+        ext_args: Iterable[EncodableT],
+        cached: Any,
+    ) -> Optional[EncodedT]:
+        """Async version of :meth:`._wait_lease`"""
+        delay = LEASE_MIN_BACKOFF
+        while isinstance(cached, int):
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, LEASE_MAX_BACKOFF)
+            cached = await self.aget(script, keys, hash, self.ttl, encoded_options, ext_args)
+        return cached
+
+    def _encode_duration(self, serialized: EncodedT, duration: float) -> EncodedT:
+        """Prefix a serialized return value with the compute ``duration`` (in seconds), when early recomputation is used."""
+        if self._early_recompute is None:
+            return serialized
+        data = serialized.encode() if isinstance(serialized, str) else bytes(serialized)  # type: ignore[arg-type]
+        return b"%d:" % int(duration * 1e6) + data
+
+    def _unwrap_envelope(self, cached: List[Any]) -> Tuple[Optional[EncodedT], int]:
+        """Unwrap the ``[value, state, age]`` hit of a get Lua script with stale-while-revalidate.
+
+        Returns:
+            The value and the state, see :meth:`.get`.
+        """
+        value, state = cached[0], cached[1]
+        if self._early_recompute is None:
+            return value, state
+        return value[value.index(b":") + 1 :], state
+
+    def _is_early(self, cached: Any) -> bool:
+        """Whether a fresh hit of a get Lua script is picked for early recomputation (XFetch)."""
+        if self._early_recompute is None or not isinstance(cached, list) or cached[1] != 0:
+            return False
+        # recompute when now - duration * beta * log(rand()) >= expiry, all in milliseconds
+        duration = int(cached[0][: cached[0].index(b":")]) / 1000
+        return duration * self._early_recompute * -log(1.0 - random()) >= self._fresh_ms - cached[2]
+
+    def _pick_early(self, keys: Tuple[KeyT, KeyT], hash: KeyT, cached: Any) -> Any:
+        """Turn a fresh hit picked for early recomputation into a stale one, if this caller takes its refresh lease.
+
+        The entry is then refreshed like a stale one, by this caller only.
+        If another caller holds the lease, e.g. because it is computing the same entry, the fresh hit is returned as is.
+        """
+        if not self._is_early(cached):
+            return cached
+        if self.client.set(lease_key(keys[1], hash), 1, nx=True, px=self._refresh_ms):
+            return [cached[0], 1]
+        return cached
+
+    async def _apick_early(self, keys: Tuple[KeyT, KeyT], hash: KeyT, cached: Any) -> Any:
+        """Async version of :meth:`._pick_early`"""
+        if not self._is_early(cached):
+            return cached
+        if await self.client.set(lease_key(keys[1], hash), 1, nx=True, px=self._refresh_ms):  # type: ignore[misc]
+            return [cached[0], 1]
+        return cached
+
+    def _unwrap_stale(self, cached: Any) -> Tuple[Any, bool]:
+        """Unwrap the result of a get Lua script, for callers refreshing stale entries inline.
+
+        Returns:
+            The value, or :data:`None` for a miss, including a stale value whose refresh lease this caller holds;
+            and whether the value is fresh.
+        """
+        if isinstance(cached, list):
+            value, state = self._unwrap_envelope(cached)
+            return (None if state == 1 else value), state == 0
+        return cached, True
+
+    def _split_value(
+        self, keys: Tuple[KeyT, KeyT], hash: KeyT, serialized: EncodedT
+    ) -> Tuple[EncodedT, Optional[Tuple[bytes, ChunksT, int]]]:
+        """Turn a serialized return value into what the put Lua script receives.
+
+        A value larger than :attr:`.StorageConfig.chunk_size` is split in chunks, and the reference to them is returned instead,
+        with the ``(key, chunks, ttl)`` arguments of :func:`.write_chunks` to store them before the put.
+        Otherwise, with :attr:`.StorageConfig.dedup`, the value is prefixed with the digest of its content.
+        """
+        if self._chunk_size is not None and len(serialized) > self._chunk_size:  # type: ignore[arg-type]
+            ref, chunks = split_chunks(hash, serialized, self._chunk_size)  # type: ignore[arg-type]
+            return ref, (chunks_key(keys[1]), chunks, self.ttl)
+        return self._add_digest(serialized), None
+
+    def _prepare_value(self, keys: Tuple[KeyT, KeyT], hash: KeyT, serialized: EncodedT) -> EncodedT:
+        """Turn a serialized return value into what the put Lua script receives, storing its chunks if it is chunked."""
+        stored, chunks = self._split_value(keys, hash, serialized)
+        if chunks is not None:
+            write_chunks(self.client, *chunks)
+        return stored
+
+    async def _aprepare_value(self, keys: Tuple[KeyT, KeyT], hash: KeyT, serialized: EncodedT) -> EncodedT:
+        """Async version of :meth:`._prepare_value`"""
+        stored, chunks = self._split_value(keys, hash, serialized)
+        if chunks is not None:
+            await awrite_chunks(self.client, *chunks)
+        return stored
+
+    def _add_digest(self, serialized: EncodedT) -> EncodedT:
+        """Prefix a serialized return value with the digest of its content, when it is deduplicated."""
+        if not self._dedup:
+            return serialized
+        data = serialized.encode() if isinstance(serialized, str) else serialized
+        digest = blake2b(data, digest_size=DEDUP_DIGEST_SIZE).hexdigest().encode()  # type: ignore[arg-type]
+        return b"\x0f%s:%s" % (digest, data)
+
+    def _read_chunked(self, keys: Tuple[KeyT, KeyT], hash: KeyT, cached: Any) -> Any:
+        """Replace the reference to a chunked value in the result of a get Lua script by the value read from its chunks.
+
+        A value whose chunks are gone is a miss.
+        """
+        if self._chunk_size is None:
+            return cached
+        ref = cached[0] if isinstance(cached, list) else cached
+        if not is_chunk_ref(ref):
+            return cached
+        data = read_chunks(self.client, chunks_key(keys[1]), hash, ref)
+        if data is None or not isinstance(cached, list):
+            return data
+        return [data, *cached[1:]]
+
+    async def _aread_chunked(self, keys: Tuple[KeyT, KeyT], hash: KeyT, cached: Any) -> Any:
+        """Async version of :meth:`._read_chunked`"""
+        if self._chunk_size is None:
+            return cached
+        ref = cached[0] if isinstance(cached, list) else cached
+        if not is_chunk_ref(ref):
+            return cached
+        data = await aread_chunks(self.client, chunks_key(keys[1]), hash, ref)
+        if data is None or not isinstance(cached, list):
+            return data
+        return [data, *cached[1:]]
+
+    def exec(self, user_function: Callable, user_args: Sequence, user_kwds: Mapping[str, Any], **options):
+        """Execute the given user function with given arguments.
+
+        In this method, :meth:`.get` is called before the ``user_function``, and :meth:`.put` is called afterward.
+
+        .. note::
+            It builds a new :class:`.CallPlan` on every invocation.
+            Functions decorated by :meth:`.decorate` build their plan only once and call :meth:`.exec_plan` instead.
+        """
+        return self.exec_plan(self.make_plan(user_function, **options), user_args, user_kwds)
+
+    async def aexec(self, user_function: Callable, user_args: Sequence, user_kwds: Mapping[str, Any], **options):
+        """Async version of :meth:`.exec`"""
+        return await self.aexec_plan(self.make_plan(user_function, **options), user_args, user_kwds)
+
+    def exec_plan(self, plan: CallPlan, user_args: Sequence, user_kwds: Mapping[str, Any]):
+        """Execute the function of a :class:`.CallPlan` with given arguments.
+
+        Only the hash of the arguments and the extended arguments are calculated here, everything else comes from the plan.
+
+        Inside a synchronous :meth:`.batch` context, the call is deferred, and a :class:`.Deferred` placeholder is returned.
+
+        If a :attr:`.tracer` is set and samples the call, its :class:`.CallTrace` is passed to the tracer when it ends.
+        """
+        batch = current_batch()
+        if batch is not None and not batch.is_async:
+            return batch.defer(self, plan, user_args, user_kwds)
+        tracer = self._tracer
+        if tracer is None or not tracer.sample():
+            return self._exec_plan(plan, user_args, user_kwds, None)
+        trace = CallTrace(self._name, plan.function)
+        try:
+            return self._exec_plan(plan, user_args, user_kwds, trace)
+        except BaseException as err:
+            trace.error = err
+            raise
+        finally:
+            self._end_trace(tracer, trace)
+
+    def _exec_plan(self, plan: CallPlan, user_args: Sequence, user_kwds: Mapping[str, Any], trace: Optional[CallTrace]):
+        """Look up the local tier, then Redis, coalescing identical calls if enabled."""
+        keys = plan.keys
+        hash = plan.calc_hash(user_args, user_kwds)
+        if trace is not None:
+            trace.mark("hash")
+        local_cache = self._local_cache
+        local_epoch = 0
+        if local_cache is not None:
+            listener = self._invalidation_listener
+            if listener is not None and not listener.started:
+                listener.start(self.client)  # type: ignore[arg-type]
+            local_value = local_cache.get((keys[1], hash), _MISSING)
+            if local_value is not _MISSING:
+                plan.stats.record_local_hit()
+                if trace is not None:
+                    trace.outcome = "local_hit"
+                return local_value
+            local_epoch = local_cache.epoch
+        if self._coalescer is not None:
+            return self._coalescer.run(
+                (keys, hash), lambda: self._exec_remote(plan, user_args, user_kwds, hash, local_epoch, trace)
+            )
+        return self._exec_remote(plan, user_args, user_kwds, hash, local_epoch, trace)
+
+    def _end_trace(self, tracer: Tracer, trace: CallTrace):
+        """Pass a finished trace to the tracer, logging its errors."""
+        trace.finish()
+        if trace.outcome is None and trace.error is None:
+            trace.outcome = "coalesced"  # a concurrent identical call computed the value
+        try:
+            tracer.on_call(trace)
+        except Exception:  # a failing tracer must not fail the call it traces
+            _logger.exception("%r failed on the trace of %s", tracer, get_fullname(trace.function))
+
+    def _exec_remote(
+        self,
+        plan: CallPlan,
+        user_args: Sequence,
+        user_kwds: Mapping[str, Any],
+        hash: KeyT,
+        local_epoch: int,
+        trace: Optional[CallTrace],
+    ):
+        """Look up Redis, and on a miss run the user function and put its return value."""
+        script_0, script_1 = plan.scripts or self._bind_scripts(plan)
+        keys = plan.keys
+        local_cache = self._local_cache
+        ext_args = self.policy.calc_ext_args(plan.function, user_args, user_kwds) or ()
+        if trace is not None:
+            trace.mark("keys")
+        if self._dispatcher is None:
+            cached = self.get(script_0, keys, hash, self.ttl, plan.encoded_options, ext_args)
+        else:
+            cached = self._dispatcher.submit(
+                script_0, script_keys(keys, hash), (self.ttl, hash, plan.encoded_options, *ext_args)
+            )
+        if self._lease_timeout is not None:
+            cached = self._wait_lease(script_0, keys, hash, plan.encoded_options, ext_args, cached)
+        cached = self._pick_early(keys, hash, self._read_chunked(keys, hash, cached))
+        if trace is not None:
+            trace.mark("get")
+        stale = 0
+        if isinstance(cached, list):
+            cached, stale = self._unwrap_envelope(cached)
+            if stale == 1 and not self._background_refresh:
+                cached = None  # this caller holds the refresh lease, and refreshes inline
         if cached is not None:
-            return self.deserialize_return_value(cached)
-        ret_val = user_function(*user_args, **user_kwds)
-        if iscoroutine(ret_val):
-            user_return_value = await ret_val
+            plan.stats.record_hit(len(cached))
+            user_return_value = plan.deserialize(cached)
+            if trace is not None:
+                trace.mark("deserialize")
+                trace.outcome = "stale" if stale else "hit"
+            if stale == 1:
+                with self._refresh_lock:
+                    if self._refresh_executor is None:
+                        self._refresh_executor = ThreadPoolExecutor(thread_name_prefix=f"{type(self).__name__}-refresh")
+                    executor = self._refresh_executor
+                executor.submit(self._compute_and_put, plan, script_1, user_args, user_kwds, hash, ext_args)
+            elif local_cache is not None and not stale:
+                local_cache.put((keys[1], hash), user_return_value, len(cached), local_epoch)
+            return user_return_value
+        plan.stats.record_miss()
+        if trace is not None:
+            trace.outcome = "miss"
+        return self._compute_and_put(plan, script_1, user_args, user_kwds, hash, ext_args, trace)
+
+    def _compute_and_put(
+        self,
+        plan: CallPlan,
+        script: redis.commands.core.Script,
+        user_args: Sequence,
+        user_kwds: Mapping[str, Any],
+        hash: KeyT,
+        ext_args: Iterable[EncodableT],
+        trace: Optional[CallTrace] = None,
+    ):
+        """Run the user function and put its return value, releasing the lease of the hash if it fails."""
+        keys = plan.keys
+        local_cache = self._local_cache
+        try:
+            started = perf_counter()
+            user_return_value = plan.function(*user_args, **user_kwds)
+            duration = perf_counter() - started
+            if trace is not None:
+                trace.mark("function")
+            user_retval_serialized = self._encode_duration(plan.serialize(user_return_value), duration)
+            if trace is not None:
+                trace.mark("serialize")
+        except BaseException:
+            if self._uses_leases:
+                self._release_leases(keys, [hash])
+            raise
+        local_epoch = 0 if local_cache is None else local_cache.epoch
+        if self._write_behind is None:
+            stored = self._prepare_value(keys, hash, user_retval_serialized)
+            evicted = self.put(script, keys, hash, stored, self.maxsize, self.ttl, plan.encoded_options, ext_args)
+            plan.stats.record_put(len(user_retval_serialized), evicted)
+        else:  # the chunks are written with the put, so that a dropped put leaves none
+            stored, chunks = self._split_value(keys, hash, user_retval_serialized)
+            self._write_behind.submit(
+                script,
+                script_keys(keys, hash),
+                (self.maxsize, self.ttl, hash, stored, plan.encoded_options, *ext_args),
+                partial(plan.stats.record_put, len(user_retval_serialized)),
+                chunks,
+            )
+        if trace is not None:
+            trace.mark("put")
+        if local_cache is not None:
+            local_cache.put((keys[1], hash), user_return_value, len(user_retval_serialized), local_epoch)
+        return user_return_value
+
+    async def aexec_plan(self, plan: CallPlan, user_args: Sequence, user_kwds: Mapping[str, Any]):
+        """Async version of :meth:`.exec_plan`"""
+        batch = current_batch()
+        if batch is not None and batch.is_async:
+            return batch.defer(self, plan, user_args, user_kwds)
+        tracer = self._tracer
+        if tracer is None or not tracer.sample():
+            return await self._aexec_plan(plan, user_args, user_kwds, None)
+        trace = CallTrace(self._name, plan.function)
+        try:
+            return await self._aexec_plan(plan, user_args, user_kwds, trace)
+        except BaseException as err:
+            trace.error = err
+            raise
+        finally:
+            self._end_trace(tracer, trace)
+
+    async def _aexec_plan(
+        self, plan: CallPlan, user_args: Sequence, user_kwds: Mapping[str, Any], trace: Optional[CallTrace]
+    ):
+        """Async version of :meth:`._exec_plan`"""
+        keys = plan.keys
+        hash = plan.calc_hash(user_args, user_kwds)
+        if trace is not None:
+            trace.mark("hash")
+        local_cache = self._local_cache
+        local_epoch = 0
+        if local_cache is not None:
+            listener = self._invalidation_listener
+            if listener is not None and not listener.started:
+                await listener.astart(self.client)  # type: ignore[arg-type]
+            local_value = local_cache.get((keys[1], hash), _MISSING)
+            if local_value is not _MISSING:
+                plan.stats.record_local_hit()
+                if trace is not None:
+                    trace.outcome = "local_hit"
+                return local_value
+            local_epoch = local_cache.epoch
+        if self._acoalescer is not None:
+            return await self._acoalescer.run(
+                (keys, hash), lambda: self._aexec_remote(plan, user_args, user_kwds, hash, local_epoch, trace)
+            )
+        return await self._aexec_remote(plan, user_args, user_kwds, hash, local_epoch, trace)
+
+    async def _aexec_remote(
+        self,
+        plan: CallPlan,
+        user_args: Sequence,
+        user_kwds: Mapping[str, Any],
+        hash: KeyT,
+        local_epoch: int,
+        trace: Optional[CallTrace],
+    ):
+        """Async version of :meth:`._exec_remote`"""
+        script_0, script_1 = plan.ascripts or self._abind_scripts(plan)
+        keys = plan.keys
+        local_cache = self._local_cache
+        ext_args = self.policy.calc_ext_args(plan.function, user_args, user_kwds) or ()
+        if trace is not None:
+            trace.mark("keys")
+        if self._adispatcher is None:
+            cached = await self.aget(script_0, keys, hash, self.ttl, plan.encoded_options, ext_args)
+        else:
+            cached = await self._adispatcher.submit(
+                script_0, script_keys(keys, hash), (self.ttl, hash, plan.encoded_options, *ext_args)
+            )
+        if self._lease_timeout is not None:
+            cached = await self._await_lease(script_0, keys, hash, plan.encoded_options, ext_args, cached)
+        cached = await self._apick_early(keys, hash, await self._aread_chunked(keys, hash, cached))
+        if trace is not None:
+            trace.mark("get")
+        stale = 0
+        if isinstance(cached, list):
+            cached, stale = self._unwrap_envelope(cached)
+            if stale == 1 and not self._background_refresh:
+                cached = None  # this caller holds the refresh lease, and refreshes inline
+        if cached is not None:
+            plan.stats.record_hit(len(cached))
+            user_return_value = plan.deserialize(cached)
+            if trace is not None:
+                trace.mark("deserialize")
+                trace.outcome = "stale" if stale else "hit"
+            if stale == 1:
+                task = asyncio.create_task(self._acompute_and_put(plan, script_1, user_args, user_kwds, hash, ext_args))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_done)
+            elif local_cache is not None and not stale:
+                local_cache.put((keys[1], hash), user_return_value, len(cached), local_epoch)
+            return user_return_value
+        plan.stats.record_miss()
+        if trace is not None:
+            trace.outcome = "miss"
+        return await self._acompute_and_put(plan, script_1, user_args, user_kwds, hash, ext_args, trace)
+
+    async def _acompute_and_put(
+        self,
+        plan: CallPlan,
+        script: redis.commands.core.AsyncScript,
+        user_args: Sequence,
+        user_kwds: Mapping[str, Any],
+        hash: KeyT,
+        ext_args: Iterable[EncodableT],
+        trace: Optional[CallTrace] = None,
+    ):
+        """Async version of :meth:`._compute_and_put`"""
+        keys = plan.keys
+        local_cache = self._local_cache
+        try:
+            started = perf_counter()
+            ret_val = plan.function(*user_args, **user_kwds)
+            if iscoroutine(ret_val):
+                user_return_value = await ret_val
+            else:
+                user_return_value = ret_val
+            duration = perf_counter() - started
+            if trace is not None:
+                trace.mark("function")
+            user_retval_serialized = self._encode_duration(plan.serialize(user_return_value), duration)
+            if trace is not None:
+                trace.mark("serialize")
+        except BaseException:
+            if self._uses_leases:
+                await self._arelease_leases(keys, [hash])
+            raise
+        local_epoch = 0 if local_cache is None else local_cache.epoch
+        if self._write_behind is None:
+            stored = await self._aprepare_value(keys, hash, user_retval_serialized)
+            evicted = await self.aput(
+                script, keys, hash, stored, self.maxsize, self.ttl, plan.encoded_options, ext_args
+            )
+            plan.stats.record_put(len(user_retval_serialized), evicted)
         else:
-            user_return_value = ret_val
-        user_retval_serialized = self.serialize_return_value(user_return_value)
-        await self.aput(script_1, keys, hash, user_retval_serialized, self.maxsize, self.ttl, options, ext_args)
+            stored, chunks = self._split_value(keys, hash, user_retval_serialized)
+            await self._write_behind.asubmit(
+                script,
+                script_keys(keys, hash),
+                (self.maxsize, self.ttl, hash, stored, plan.encoded_options, *ext_args),
+                partial(plan.stats.record_put, len(user_retval_serialized)),
+                chunks,
+            )
+        if trace is not None:
+            trace.mark("put")
+        if local_cache is not None:
+            local_cache.put((keys[1], hash), user_return_value, len(user_retval_serialized), local_epoch)
         return user_return_value
 
-    def decorate(self, user_function: Optional[FT] = None, /, **kwargs) -> FT:
-        """Decorate the given function with cache."""
+    def _refresh_done(self, task: asyncio.Task):
+        """Forget a finished background refresh task, and drop its error."""
+        self._refresh_tasks.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    def _resolve_lookup(
+        self,
+        plan: CallPlan,
+        script: redis.commands.core.Script,
+        hash: KeyT,
+        ext_args: Iterable[EncodableT],
+        cached: Any,
+        local_epoch: int,
+    ) -> Any:
+        """Resolve the result of the get Lua ``script`` for a call looked up among others, in a pipeline.
+
+        It waits for the compute lease held by another caller, reads a chunked value, and picks a fresh hit for early recomputation,
+        then counts the hit or the miss, and fills the local tier with a fresh hit.
+
+        Returns:
+            The deserialized value, or :data:`_MISSING` if this caller is to compute it.
+        """
+        keys = plan.keys
+        if self._lease_timeout is not None:
+            cached = self._wait_lease(script, keys, hash, plan.encoded_options, ext_args, cached)
+        cached, fresh = self._unwrap_stale(self._pick_early(keys, hash, self._read_chunked(keys, hash, cached)))
+        return self._deserialize_lookup(plan, hash, cached, fresh, local_epoch)
+
+    async def _aresolve_lookup(
+        self,
+        plan: CallPlan,
+        script: redis.commands.core.AsyncScript,
+        hash: KeyT,
+        ext_args: Iterable[EncodableT],
+        cached: Any,
+        local_epoch: int,
+    ) -> Any:
+        """Async version of :meth:`._resolve_lookup`"""
+        keys = plan.keys
+        if self._lease_timeout is not None:
+            cached = await self._await_lease(script, keys, hash, plan.encoded_options, ext_args, cached)
+        cached = await self._apick_early(keys, hash, await self._aread_chunked(keys, hash, cached))
+        cached, fresh = self._unwrap_stale(cached)
+        return self._deserialize_lookup(plan, hash, cached, fresh, local_epoch)
+
+    def _deserialize_lookup(self, plan: CallPlan, hash: KeyT, cached: Any, fresh: bool, local_epoch: int) -> Any:
+        """Count the hit or the miss of a resolved lookup, and deserialize a hit, see :meth:`._resolve_lookup`."""
+        if cached is None:
+            plan.stats.record_miss()
+            return _MISSING
+        plan.stats.record_hit(len(cached))
+        value = plan.deserialize(cached)
+        if self._local_cache is not None and fresh:
+            self._local_cache.put((plan.keys[1], hash), value, len(cached), local_epoch)
+        return value
+
+    def _compute_value(
+        self, plan: CallPlan, hash: KeyT, user_args: Sequence, user_kwds: Mapping[str, Any]
+    ) -> Tuple[Any, EncodedT, EncodedT]:
+        """Run the user function for a call missed among others, releasing the lease of the hash if it fails.
+
+        Returns:
+            The return value, its serialization, and what the put Lua script receives, see :meth:`._prepare_value`.
+        """
+        try:
+            started = perf_counter()
+            value = plan.function(*user_args, **user_kwds)
+            serialized = self._encode_duration(plan.serialize(value), perf_counter() - started)
+        except BaseException:
+            if self._uses_leases:
+                self._release_leases(plan.keys, [hash])
+            raise
+        return value, serialized, self._prepare_value(plan.keys, hash, serialized)
+
+    async def _acompute_value(
+        self, plan: CallPlan, hash: KeyT, user_args: Sequence, user_kwds: Mapping[str, Any]
+    ) -> Tuple[Any, EncodedT, EncodedT]:
+        """Async version of :meth:`._compute_value`"""
+        try:
+            started = perf_counter()
+            value = plan.function(*user_args, **user_kwds)
+            if iscoroutine(value):
+                value = await value
+            serialized = self._encode_duration(plan.serialize(value), perf_counter() - started)
+        except BaseException:
+            if self._uses_leases:
+                await self._arelease_leases(plan.keys, [hash])
+            raise
+        return value, serialized, await self._aprepare_value(plan.keys, hash, serialized)
+
+    def _lookup_many(
+        self, plan: CallPlan, calls: Sequence[Tuple[Sequence, Mapping[str, Any]]]
+    ) -> Tuple[List[Any], List[KeyT], List[int], int]:
+        """Hash all calls, and look them up in the local tier.
+
+        Returns:
+            The results (:data:`_MISSING` where not found), the hashes,
+            the indices of the first call of every distinct hash not found, and the epoch of the local tier.
+        """
+        keys = plan.keys
+        hashes = [plan.calc_hash(args, kwds) for args, kwds in calls]
+        results: List[Any] = [_MISSING] * len(calls)
+        local_cache = self._local_cache
+        local_epoch = 0
+        if local_cache is not None:
+            local_epoch = local_cache.epoch
+            for i, hash in enumerate(hashes):
+                results[i] = local_cache.get((keys[1], hash), _MISSING)
+                if results[i] is not _MISSING:
+                    plan.stats.record_local_hit()
+        pending: Dict[KeyT, int] = {}
+        for i, hash in enumerate(hashes):
+            if results[i] is _MISSING and hash not in pending:
+                pending[hash] = i
+        return results, hashes, list(pending.values()), local_epoch
+
+    def _store_many(
+        self,
+        plan: CallPlan,
+        hashes: List[KeyT],
+        misses: List[int],
+        computed: List[Any],
+        values: Dict[KeyT, Any],
+        duration: float = 0.0,
+    ) -> Tuple[List[int], List[EncodedT]]:
+        """Serialize computed values (:data:`_MISSING` ones are skipped), and collect them in ``values`` keyed by hash.
+
+        ``duration`` (in seconds) is the time spent computing each value, on average.
+
+        Returns:
+            The indices and serialized values to put.
+        """
+        stored: List[int] = []
+        serialized: List[EncodedT] = []
+        for i, value in zip(misses, computed):
+            if value is _MISSING:
+                continue
+            serialized.append(self._encode_duration(plan.serialize(value), duration))
+            stored.append(i)
+            values[hashes[i]] = value
+        return stored, serialized
+
+    def _fill_local_many(
+        self,
+        plan: CallPlan,
+        hashes: List[KeyT],
+        stored: List[int],
+        serialized: List[EncodedT],
+        values: Mapping[KeyT, Any],
+        local_epoch: int,
+    ):
+        """Fill the local tier with the values just put."""
+        local_cache = self._local_cache
+        if local_cache is not None:
+            for i, data in zip(stored, serialized):
+                local_cache.put((plan.keys[1], hashes[i]), values[hashes[i]], len(data), local_epoch)
+
+    @staticmethod
+    def _fill_many(results: List[Any], hashes: List[KeyT], values: Mapping[KeyT, Any]) -> List[Any]:
+        """Fill the results not found yet, including duplicated calls, from ``values`` keyed by hash.
+
+        Results of calls neither cached nor computed stay :data:`_MISSING`.
+        """
+        for i, hash in enumerate(hashes):
+            if results[i] is _MISSING:
+                results[i] = values.get(hash, _MISSING)
+        return results
+
+    def _exec_many(
+        self,
+        plan: CallPlan,
+        calls: Sequence[Tuple[Sequence, Mapping[str, Any]]],
+        compute: Callable[[List[int]], List[Any]],
+    ) -> List[Any]:
+        """Look up all ``calls`` in one round trip, ``compute`` the misses by their indices, and put them in one round trip."""
+        script_0, script_1 = plan.scripts or self._bind_scripts(plan)
+        keys = plan.keys
+        local_cache = self._local_cache
+        listener = self._invalidation_listener
+        if listener is not None and not listener.started:
+            listener.start(self.client)  # type: ignore[arg-type]
+        results, hashes, pending, local_epoch = self._lookup_many(plan, calls)
+        ext_args = [self.policy.calc_ext_args(plan.function, *calls[i]) or () for i in pending]
+        cached_list = self.get_many(
+            script_0, keys, [hashes[i] for i in pending], self.ttl, plan.encoded_options, ext_args
+        )
+        values: Dict[KeyT, Any] = {}
+        misses: List[int] = []
+        miss_ext_args: Dict[int, Iterable[EncodableT]] = {}
+        for i, ext, cached in zip(pending, ext_args, cached_list):
+            value = self._resolve_lookup(plan, script_0, hashes[i], ext, cached, local_epoch)
+            if value is _MISSING:
+                misses.append(i)
+                miss_ext_args[i] = ext
+            else:
+                values[hashes[i]] = value
+        if misses:
+            try:
+                started = perf_counter()
+                computed = compute(misses)
+                duration = (perf_counter() - started) / len(misses)
+                stored, serialized = self._store_many(plan, hashes, misses, computed, values, duration)
+            except BaseException:
+                if self._uses_leases:
+                    self._release_leases(keys, [hashes[i] for i in misses])
+                raise
+            if local_cache is not None:
+                local_epoch = local_cache.epoch
+            evicted = self.put_many(
+                script_1,
+                keys,
+                [hashes[i] for i in stored],
+                [self._prepare_value(keys, hashes[i], data) for i, data in zip(stored, serialized)],
+                self.maxsize,
+                self.ttl,
+                plan.encoded_options,
+                [miss_ext_args[i] for i in stored],
+            )
+            for data, n in zip(serialized, evicted):
+                plan.stats.record_put(len(data), n)
+            self._fill_local_many(plan, hashes, stored, serialized, values, local_epoch)
+        return self._fill_many(results, hashes, values)
+
+    async def _aexec_many(
+        self,
+        plan: CallPlan,
+        calls: Sequence[Tuple[Sequence, Mapping[str, Any]]],
+        compute: Callable[[List[int]], Awaitable[List[Any]]],
+    ) -> List[Any]:
+        """Async version of :meth:`._exec_many`"""
+        script_0, script_1 = plan.ascripts or self._abind_scripts(plan)
+        keys = plan.keys
+        local_cache = self._local_cache
+        listener = self._invalidation_listener
+        if listener is not None and not listener.started:
+            await listener.astart(self.client)  # type: ignore[arg-type]
+        results, hashes, pending, local_epoch = self._lookup_many(plan, calls)
+        ext_args = [self.policy.calc_ext_args(plan.function, *calls[i]) or () for i in pending]
+        cached_list = await self.aget_many(
+            script_0, keys, [hashes[i] for i in pending], self.ttl, plan.encoded_options, ext_args
+        )
+        values: Dict[KeyT, Any] = {}
+        misses: List[int] = []
+        miss_ext_args: Dict[int, Iterable[EncodableT]] = {}
+        for i, ext, cached in zip(pending, ext_args, cached_list):
+            value = await self._aresolve_lookup(plan, script_0, hashes[i], ext, cached, local_epoch)
+            if value is _MISSING:
+                misses.append(i)
+                miss_ext_args[i] = ext
+            else:
+                values[hashes[i]] = value
+        if misses:
+            try:
+                started = perf_counter()
+                computed = await compute(misses)
+                duration = (perf_counter() - started) / len(misses)
+                stored, serialized = self._store_many(plan, hashes, misses, computed, values, duration)
+            except BaseException:
+                if self._uses_leases:
+                    await self._arelease_leases(keys, [hashes[i] for i in misses])
+                raise
+            if local_cache is not None:
+                local_epoch = local_cache.epoch
+            evicted = await self.aput_many(
+                script_1,
+                keys,
+                [hashes[i] for i in stored],
+                [await self._aprepare_value(keys, hashes[i], data) for i, data in zip(stored, serialized)],
+                self.maxsize,
+                self.ttl,
+                plan.encoded_options,
+                [miss_ext_args[i] for i in stored],
+            )
+            for data, n in zip(serialized, evicted):
+                plan.stats.record_put(len(data), n)
+            self._fill_local_many(plan, hashes, stored, serialized, values, local_epoch)
+        return self._fill_many(results, hashes, values)
+
+    def exec_plan_many(
+        self,
+        plan: CallPlan,
+        calls: Sequence[Tuple[Sequence, Mapping[str, Any]]],
+        executor: Optional[Executor] = None,
+    ) -> List[Any]:
+        """Bulk version of :meth:`.exec_plan`, for many ``(args, kwds)`` calls of the same function.
+
+        All calls are hashed up front, then looked up with :meth:`.get_many` in one round trip.
+        Only the misses are computed, by ``executor`` if provided (a thread or process pool), then stored with one :meth:`.put_many`.
+        Calls with the same hash are computed only once.
+
+        Calls in a bulk are not coalesced with concurrent single calls.
+
+        Returns:
+            Return values in the order of ``calls``.
+        """
+
+        def compute(misses: List[int]) -> List[Any]:
+            if executor is None:
+                return [plan.function(*calls[i][0], **calls[i][1]) for i in misses]
+            target = plan.wrapper or plan.function
+            futures = [executor.submit(_run_original, target, *calls[i]) for i in misses]
+            return [future.result() for future in futures]
+
+        return self._exec_many(plan, calls, compute)
+
+    async def aexec_plan_many(
+        self,
+        plan: CallPlan,
+        calls: Sequence[Tuple[Sequence, Mapping[str, Any]]],
+        executor: Optional[Executor] = None,
+    ) -> List[Any]:
+        """Async version of :meth:`.exec_plan_many`.
+
+        Without ``executor``, misses of a coroutine function are awaited concurrently.
+        """
+
+        async def compute(misses: List[int]) -> List[Any]:
+            if executor is None:
+                ret_vals = [plan.function(*calls[i][0], **calls[i][1]) for i in misses]
+                return await asyncio.gather(*(_as_awaitable(ret_val) for ret_val in ret_vals))
+            loop = asyncio.get_running_loop()
+            target = plan.wrapper or plan.function
+            return await asyncio.gather(
+                *(loop.run_in_executor(executor, _run_original, target, *calls[i]) for i in misses)
+            )
+
+        return await self._aexec_many(plan, calls, compute)
+
+    def exec_plan_elementwise(
+        self,
+        plan: CallPlan,
+        elements: Iterable,
+        user_args: Sequence,
+        user_kwds: Mapping[str, Any],
+        returns: Type[Union[list, dict]] = list,
+    ) -> Union[list, dict]:
+        """Execute a batch-native function of a :class:`.CallPlan`, caching each of its ``elements`` separately.
+
+        The function is called as ``function(elements, *user_args, **user_kwds)``, and returns either a :class:`list`
+        of results in the order of ``elements``, or a :class:`dict` mapping elements to results (``returns``).
+
+        Each element is hashed as the call ``function(element, *user_args, **user_kwds)``, and all of them are looked up in one round trip.
+        The function is then called only with the missing elements, in their original order, and its results are put in one round trip.
+
+        Returns:
+            A :class:`list` of results in the order of ``elements``,
+            or a :class:`dict` of the elements found, either cached or returned by the function.
+        """
+        elements = list(elements)
+        calls = [((element, *user_args), user_kwds) for element in elements]
+
+        def compute(misses: List[int]) -> List[Any]:
+            missing = [elements[i] for i in misses]
+            return _split_elementwise(missing, plan.function(missing, *user_args, **user_kwds), returns)
+
+        return _stitch_elementwise(elements, self._exec_many(plan, calls, compute), returns)
+
+    async def aexec_plan_elementwise(
+        self,
+        plan: CallPlan,
+        elements: Iterable,
+        user_args: Sequence,
+        user_kwds: Mapping[str, Any],
+        returns: Type[Union[list, dict]] = list,
+    ) -> Union[list, dict]:
+        """Async version of :meth:`.exec_plan_elementwise`"""
+        elements = list(elements)
+        calls = [((element, *user_args), user_kwds) for element in elements]
+
+        async def compute(misses: List[int]) -> List[Any]:
+            missing = [elements[i] for i in misses]
+            ret_val = await _as_awaitable(plan.function(missing, *user_args, **user_kwds))
+            return _split_elementwise(missing, ret_val, returns)
+
+        return _stitch_elementwise(elements, await self._aexec_many(plan, calls, compute), returns)
+
+    def decorate(
+        self, user_function: Optional[FT] = None, /, *, elementwise: Optional[Type[Union[list, dict]]] = None, **kwargs
+    ) -> FT:
+        """Decorate the given function with cache.
+
+        The :class:`.CallPlan` of the function is built here, once, and is available as the ``__call_plan__`` attribute of the wrapper.
+        The wrapper's ``cache_info()`` method returns the :class:`.CacheInfo` counters of the function, like :func:`functools.lru_cache`.
+
+        The wrapper of a regular function has a ``map(iterable_of_args, executor=None)`` method,
+        and the wrapper of a coroutine function an ``amap(iterable_of_args, executor=None)`` one,
+        calling the function for each tuple of positional arguments with :meth:`.exec_plan_many` or :meth:`.aexec_plan_many`.
+
+        With ``elementwise=list`` or ``elementwise=dict``, the function is batch-native: its first argument is a sequence of elements,
+        and it returns a :class:`list` of results in the same order, or a :class:`dict` mapping elements to results.
+        Each element is then cached separately, see :meth:`.exec_plan_elementwise`::
+
+            @cache(elementwise=dict)
+            def load_users(ids):
+                return {user.id: user for user in db.query_users(ids)}
+
+        Other keyword arguments are passed to :meth:`.make_plan`, e.g.::
+
+            @cache(ignore=["session"])
+            def get_user(user_id, session=None): ...
+
+
+            @cache(key=lambda request: request.user_id)
+            def get_profile(request): ...
+        """
+
+        if elementwise not in (None, list, dict):
+            raise ValueError(f"elementwise must be list or dict, but got {elementwise!r}")
 
         def decorator(f: FT):
+            plan = self.make_plan(f, **kwargs)
+            if elementwise is not None:
+                return self._decorate_elementwise(f, plan, elementwise)
+
             @wraps(f)
             def wrapper(*f_args, **f_kwargs):
-                return self.exec(f, f_args, f_kwargs, **kwargs)
+                return self.exec_plan(plan, f_args, f_kwargs)
+
+            def map(iterable: Iterable[Sequence], executor: Optional[Executor] = None) -> List[Any]:
+                return self.exec_plan_many(plan, [(tuple(args), {}) for args in iterable], executor)
 
             @wraps(f)
             async def awrapper(*f_args, **f_kwargs):
-                return await self.aexec(f, f_args, f_kwargs, **kwargs)
+                return await self.aexec_plan(plan, f_args, f_kwargs)
+
+            async def amap(iterable: Iterable[Sequence], executor: Optional[Executor] = None) -> List[Any]:
+                return await self.aexec_plan_many(plan, [(tuple(args), {}) for args in iterable], executor)
 
-            return awrapper if iscoroutinefunction(f) else wrapper
+            if iscoroutinefunction(f):
+                awrapper.amap = amap  # type: ignore[attr-defined]
+                wrapped = cast(_CachedFunction, awrapper)
+            else:
+                wrapper.map = map  # type: ignore[attr-defined]
+                wrapped = cast(_CachedFunction, wrapper)
+            wrapped.__call_plan__ = plan
+            wrapped.cache_info = plan.stats.info
+            plan.wrapper = wrapped
+            return wrapped
 
         if user_function is None:
             return decorator  # type: ignore
         return decorator(user_function)  # type: ignore
 
+    def _decorate_elementwise(self, f: FT, plan: CallPlan, returns: Type[Union[list, dict]]) -> FT:
+        @wraps(f)
+        def wrapper(elements, *f_args, **f_kwargs):
+            return self.exec_plan_elementwise(plan, elements, f_args, f_kwargs, returns)
+
+        @wraps(f)
+        async def awrapper(elements, *f_args, **f_kwargs):
+            return await self.aexec_plan_elementwise(plan, elements, f_args, f_kwargs, returns)
+
+        wrapped = cast(_CachedFunction, awrapper if iscoroutinefunction(f) else wrapper)
+        wrapped.__call_plan__ = plan
+        wrapped.cache_info = plan.stats.info
+        plan.wrapper = wrapped
+        return wrapped  # type: ignore[return-value]
+
     __call__ = decorate
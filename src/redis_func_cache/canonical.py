@@ -0,0 +1,228 @@
+"""Fast deterministic encoding of function arguments for hashing."""
+
+from __future__ import annotations
+
+import pickle
+from dataclasses import fields, is_dataclass
+from math import isnan
+from struct import Struct
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable
+
+if TYPE_CHECKING:  # pragma: no cover
+    from hashlib import _Hash
+
+__all__ = ("canonical_dumps", "canonical_update", "PICKLE_PROTOCOL", "HASH_CHUNK_SIZE")
+
+PICKLE_PROTOCOL = 4
+"""Protocol of :mod:`pickle` used for values of unknown types.
+
+It is pinned, rather than :data:`pickle.DEFAULT_PROTOCOL`, so that hashes do not change with the Python version.
+"""
+
+HASH_CHUNK_SIZE = 1 << 20
+"""Size in bytes of the chunks of large buffers fed to the hash object by :func:`canonical_update`."""
+
+_DIRECT_UPDATE_SIZE = 1 << 12
+"""Buffers of at least this size are fed to the hash object directly, instead of being copied to the output first."""
+
+_DOUBLE = Struct(">d")
+
+
+class _HashWriter(bytearray):
+    """Output of :func:`canonical_update`: small encodings are accumulated, large buffers go directly to the hash object."""
+
+    def __init__(self, hasher: _Hash):
+        super().__init__()
+        self.hasher = hasher
+
+    def write_buffer(self, data: memoryview):
+        self.hasher.update(self)
+        del self[:]
+        for i in range(0, len(data), HASH_CHUNK_SIZE):
+            self.hasher.update(data[i : i + HASH_CHUNK_SIZE])
+
+
+def _write_data(data: Any, out: bytearray):
+    if len(data) >= _DIRECT_UPDATE_SIZE and isinstance(out, _HashWriter):
+        out.write_buffer(memoryview(data))
+    else:
+        out += data
+
+
+def _encode_none(obj: None, out: bytearray):
+    out += b"N"
+
+
+def _encode_bool(obj: bool, out: bytearray):
+    out += b"T" if obj else b"F"
+
+
+def _encode_int(obj: int, out: bytearray):
+    out += b"i%d;" % obj
+
+
+def _encode_float(obj: float, out: bytearray):
+    if obj.is_integer():  # equal to an int, so encoded as the int: 1.0 == 1, -0.0 == 0
+        out += b"i%d;" % obj
+    elif isnan(obj):
+        out += b"fnan"
+    else:
+        out += b"f"
+        out += _DOUBLE.pack(obj)
+
+
+def _encode_str(obj: str, out: bytearray):
+    data = obj.encode("utf-8", "surrogatepass")
+    out += b"s%d:" % len(data)
+    out += data
+
+
+def _encode_bytes(obj: bytes, out: bytearray):
+    out += b"b%d:" % len(obj)
+    _write_data(obj, out)
+
+
+def _encode_buffer(obj: Any, view: memoryview, out: bytearray):
+    cls = type(obj)
+    name = f"{cls.__module__}:{cls.__qualname__}".encode()
+    fmt = view.format.encode()
+    out += b"B%d:" % len(name)
+    out += name
+    out += b"%d:" % len(fmt)
+    out += fmt
+    out += b"%d:" % view.ndim
+    for n in view.shape or ():
+        out += b"%d;" % n
+    out += b"%d:" % view.nbytes
+    if view.c_contiguous:
+        _write_data(view.cast("B") if view.ndim != 1 or view.itemsize != 1 else view, out)
+    else:
+        _write_data(view.tobytes(), out)  # non-contiguous memory has to be copied
+
+
+def _encode_items(items: Iterable, out: bytearray):
+    for x in items:
+        t = type(x)
+        if t is str:  # inlined, the most common items
+            data = x.encode("utf-8", "surrogatepass")
+            out += b"s%d:" % len(data)
+            out += data
+        elif t is int:
+            out += b"i%d;" % x
+        else:
+            _encode(x, out)
+
+
+def _encode_tuple(obj: tuple, out: bytearray):
+    out += b"t%d:" % len(obj)
+    _encode_items(obj, out)
+
+
+def _encode_list(obj: list, out: bytearray):
+    out += b"l%d:" % len(obj)
+    _encode_items(obj, out)
+
+
+def _encode_dict(obj: dict, out: bytearray):
+    out += b"d%d:" % len(obj)
+    if all(type(k) is str for k in obj):  # most common: keyword arguments and JSON-like objects
+        for k in sorted(obj):
+            data = k.encode("utf-8", "surrogatepass")
+            out += b"s%d:" % len(data)
+            out += data
+            _encode(obj[k], out)
+    else:  # order items by their encoding
+        for x in sorted(_encode_item(k) + _encode_item(v) for k, v in obj.items()):
+            out += x
+
+
+def _encode_set(obj: frozenset, out: bytearray):
+    items = sorted(_encode_item(x) for x in obj)
+    out += b"S%d:" % len(items)
+    for x in items:
+        out += x
+
+
+def _encode_item(obj: Any) -> bytes:
+    out = bytearray()
+    _encode(obj, out)
+    return bytes(out)
+
+
+_ENCODERS: Dict[type, Callable[[Any, bytearray], None]] = {
+    type(None): _encode_none,
+    bool: _encode_bool,
+    int: _encode_int,
+    float: _encode_float,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    tuple: _encode_tuple,
+    list: _encode_list,
+    dict: _encode_dict,
+    set: _encode_set,
+    frozenset: _encode_set,
+}
+
+
+def _encode(obj: Any, out: bytearray):
+    try:
+        encoder = _ENCODERS[type(obj)]
+    except KeyError:
+        pass
+    else:
+        return encoder(obj, out)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        cls = type(obj)
+        name = f"{cls.__module__}:{cls.__qualname__}".encode()
+        out += b"D%d:" % len(name)
+        out += name
+        fs = fields(obj)
+        out += b"%d:" % len(fs)
+        for f in fs:
+            _encode_str(f.name, out)
+            _encode(getattr(obj, f.name), out)
+        return
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        pass
+    else:
+        with view:
+            return _encode_buffer(obj, view, out)
+    data = pickle.dumps(obj, protocol=PICKLE_PROTOCOL)
+    out += b"p%d:" % len(data)
+    out += data
+
+
+def canonical_dumps(obj: Any) -> bytes:
+    """Encode ``obj`` to bytes, so that equal values are encoded to equal bytes.
+
+    Unlike :func:`pickle.dumps`, the output is canonical for common types:
+
+    - :data:`None`, :class:`bool`, :class:`int`, :class:`str`, :class:`bytes` and :class:`bytearray`
+    - :class:`float`: a float equal to an int is encoded as the int, e.g. ``1.0`` as ``1``; all NaNs are encoded the same
+    - :class:`tuple` and :class:`list`: items in order
+    - :class:`dict`: items sorted by key (:class:`str` keys) or by their encoding (other keys), so the insertion order does not matter
+    - :class:`set` and :class:`frozenset`: elements sorted by their encoding, a set and a frozenset of the same elements are encoded the same
+    - instances of :func:`dataclasses.dataclass`: qualified class name and fields, in definition order
+    - objects supporting the buffer protocol, e.g. :class:`memoryview`, :class:`array.array` and NumPy arrays:
+      qualified class name, item format (the ``dtype``), shape and the raw memory in C order
+
+    Every value is prefixed with a type tag, and variable length values with their length, so different values never share an encoding.
+    Values of other types, including subclasses of the types above, fall back to :func:`pickle.dumps` with :data:`PICKLE_PROTOCOL`.
+    """
+    out = bytearray()
+    _encode(obj, out)
+    return bytes(out)
+
+
+def canonical_update(hasher: _Hash, obj: Any):
+    """Feed the encoding of ``obj`` to ``hasher``, same as ``hasher.update(canonical_dumps(obj))``.
+
+    The memory of large :class:`bytes`, :class:`bytearray` and buffer protocol objects is not copied,
+    it is fed to ``hasher`` directly, in chunks of :data:`HASH_CHUNK_SIZE` bytes.
+    """
+    out = _HashWriter(hasher)
+    _encode(obj, out)
+    hasher.update(out)
@@ -0,0 +1,169 @@
+"""Chunked storage of large serialized return values, in a hash map beside the cache's own."""
+
+from __future__ import annotations
+
+import re
+from os import urandom
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+from .constants import CHUNK_READ_WINDOW
+
+if TYPE_CHECKING:  # pragma: no cover
+    from redis.typing import KeyT
+
+__all__ = (
+    "CHUNK_REF_HEADER",
+    "chunks_key",
+    "is_chunk_ref",
+    "split_chunks",
+    "write_chunks",
+    "awrite_chunks",
+    "delete_chunks",
+    "adelete_chunks",
+    "read_chunks",
+    "aread_chunks",
+)
+
+CHUNK_REF_HEADER = b"\x0e"
+"""First byte of the reference stored in the hash map in place of a chunked value.
+
+Neither JSON text, nor values tagged by :class:`.TaggedSerializer` or :class:`.Compressor`, start with it.
+"""
+
+ChunksT = List[Tuple[bytes, memoryview]]
+
+# a whole reference '<header><id>:<count>:<size>', the put Lua scripts match its start with '^\14([^:]+:%d+):'
+_CHUNK_REF = re.compile(re.escape(CHUNK_REF_HEADER) + rb"([^:]+):(\d+):(\d+)")
+
+
+def _to_bytes(key: KeyT) -> bytes:
+    return key.encode() if isinstance(key, str) else bytes(key)  # type: ignore[arg-type]
+
+
+def chunks_key(hmap_key: KeyT) -> bytes:
+    """Name of the hash map holding the chunks of the values of ``hmap_key``.
+
+    It has a field for each chunk, named ``<hash>:<id>:<index>``,
+    and an index field for each chunked value, named ``<hash>`` with the value ``<id>:<count>``,
+    with which the Lua scripts remove the chunks of a value when it is evicted, expires or is replaced.
+    """
+    return _to_bytes(hmap_key) + b":chunks"
+
+
+def is_chunk_ref(data: object) -> bool:
+    """Whether ``data``, as read from the hash map, is the reference to a chunked value.
+
+    A value only starting with :data:`CHUNK_REF_HEADER` is a plain value.
+    """
+    return isinstance(data, bytes) and data[:1] == CHUNK_REF_HEADER and _CHUNK_REF.fullmatch(data) is not None
+
+
+def _chunk_field(hash: KeyT, id: bytes, index: int) -> bytes:
+    return b"%s:%s:%d" % (_to_bytes(hash), id, index)
+
+
+def split_chunks(hash: KeyT, data: Union[bytes, bytearray], chunk_size: int) -> Tuple[bytes, ChunksT]:
+    """Split ``data`` into chunks of ``chunk_size`` bytes, without copying them.
+
+    Returns:
+        The reference to store in place of ``data``, and the ``(field, chunk)`` pairs to store in :func:`chunks_key`.
+        A random id in the field names keeps the chunks of a value from being mixed with those of a concurrent put of the same hash.
+    """
+    id = urandom(6).hex().encode()
+    view = memoryview(data)
+    chunks = [
+        (_chunk_field(hash, id, i), view[pos : pos + chunk_size])
+        for i, pos in enumerate(range(0, len(view), chunk_size))
+    ]
+    return b"%s%s:%d:%d" % (CHUNK_REF_HEADER, id, len(chunks), len(view)), chunks
+
+
+def write_chunks(client, key: KeyT, chunks: ChunksT, ttl: int):
+    """Store the chunks from :func:`split_chunks` in one pipeline, one ``HSET`` for each,
+    so that no single command blocks Redis for the whole value.
+
+    The reference is stored afterwards, by the put Lua script.
+    """
+    pipe = client.pipeline(transaction=False)
+    for field, chunk in chunks:
+        pipe.hset(key, field, chunk)  # type: ignore[arg-type]
+    if ttl > 0:
+        pipe.expire(key, ttl)
+    pipe.execute()
+
+
+async def awrite_chunks(client, key: KeyT, chunks: ChunksT, ttl: int):
+    """Async version of :func:`write_chunks`"""
+    pipe = client.pipeline(transaction=False)
+    for field, chunk in chunks:
+        pipe.hset(key, field, chunk)  # type: ignore[arg-type]
+    if ttl > 0:
+        pipe.expire(key, ttl)
+    await pipe.execute()
+
+
+def delete_chunks(client, key: KeyT, chunks: ChunksT):
+    """Delete the chunks written by :func:`write_chunks`, when their reference could not be stored."""
+    client.hdel(key, *(field for field, _ in chunks))
+
+
+async def adelete_chunks(client, key: KeyT, chunks: ChunksT):
+    """Async version of :func:`delete_chunks`"""
+    await client.hdel(key, *(field for field, _ in chunks))
+
+
+def _parse_ref(ref: bytes) -> Tuple[bytes, int, int]:
+    match = _CHUNK_REF.fullmatch(ref)
+    if match is None:
+        raise ValueError(f"Not a chunk reference: {ref[:32]!r}")
+    id, count, size = match.groups()
+    return id, int(count), int(size)
+
+
+def _windows(count: int, chunk_size: int):
+    step = max(1, CHUNK_READ_WINDOW // max(1, chunk_size))
+    for start in range(0, count, step):
+        yield range(start, min(count, start + step))
+
+
+def read_chunks(client, key: KeyT, hash: KeyT, ref: bytes) -> Optional[bytearray]:
+    """Read the chunks of a value into one preallocated buffer.
+
+    The chunks are fetched in pipelines of about :data:`.CHUNK_READ_WINDOW` bytes each,
+    so that only one window of responses is held besides the buffer.
+
+    Returns:
+        The value, or :data:`None` if any chunk is missing, e.g. evicted since the reference was read.
+    """
+    id, count, size = _parse_ref(ref)
+    out = bytearray(size)
+    pos = 0
+    with memoryview(out) as view:
+        for window in _windows(count, -(-size // max(1, count))):
+            pipe = client.pipeline(transaction=False)
+            for i in window:
+                pipe.hget(key, _chunk_field(hash, id, i))
+            for chunk in pipe.execute():
+                if chunk is None or pos + len(chunk) > size:
+                    return None
+                view[pos : pos + len(chunk)] = chunk
+                pos += len(chunk)
+    return out if pos == size else None
+
+
+async def aread_chunks(client, key: KeyT, hash: KeyT, ref: bytes) -> Optional[bytearray]:
+    """Async version of :func:`read_chunks`"""
+    id, count, size = _parse_ref(ref)
+    out = bytearray(size)
+    pos = 0
+    with memoryview(out) as view:
+        for window in _windows(count, -(-size // max(1, count))):
+            pipe = client.pipeline(transaction=False)
+            for i in window:
+                pipe.hget(key, _chunk_field(hash, id, i))
+            for chunk in await pipe.execute():
+                if chunk is None or pos + len(chunk) > size:
+                    return None
+                view[pos : pos + len(chunk)] = chunk
+                pos += len(chunk)
+    return out if pos == size else None
@@ -0,0 +1,92 @@
+"""In-process coalescing of concurrent identical calls."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future
+from threading import Lock
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+__all__ = ("CallCoalescer", "AsyncCallCoalescer")
+
+T = TypeVar("T")
+
+
+class CallCoalescer:
+    """Share one in-flight execution between threads making the same call at the same time.
+
+    The first caller of :meth:`run` with a key runs the function, later callers with the same key block until it finishes,
+    and all of them get the same return value, or the same exception.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._flights: Dict[Hashable, Future] = {}
+
+    def __len__(self) -> int:
+        """Number of in-flight calls."""
+        return len(self._flights)
+
+    def run(self, key: Hashable, function: Callable[[], T]) -> T:
+        """Run ``function``, unless a call with the same ``key`` is in flight, then wait for its result."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+        if not leader:
+            return flight.result()  # type: ignore[union-attr]
+        try:
+            result = function()
+        except BaseException as err:
+            flight.set_exception(err)  # type: ignore[union-attr]
+            raise
+        else:
+            flight.set_result(result)  # type: ignore[union-attr]
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+
+class AsyncCallCoalescer:
+    """Async version of :class:`CallCoalescer`, sharing an :class:`asyncio.Future` between tasks of the same event loop.
+
+    If the task running the function is cancelled, the waiting tasks are not: one of them runs the function instead.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        """Number of in-flight calls."""
+        return len(self._flights)
+
+    async def run(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """Await ``function()``, unless a call with the same ``key`` is in flight, then wait for its result."""
+        loop = asyncio.get_running_loop()
+        flight_key = loop, key
+        while True:
+            flight = self._flights.get(flight_key)
+            if flight is None:
+                break
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if not flight.cancelled():  # this task itself is cancelled
+                    raise
+        flight = self._flights[flight_key] = loop.create_future()
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as err:
+            flight.set_exception(err)
+            flight.exception()  # retrieved, even if no task is waiting
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[flight_key]
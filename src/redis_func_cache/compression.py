@@ -0,0 +1,145 @@
+"""Compression of serialized return values, behind a one-byte header."""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from .constants import DEFAULT_COMPRESSION_THRESHOLD
+
+__all__ = ("Compressor", "CODECS", "RAW_HEADER")
+
+CompressT = Callable[[bytes], bytes]
+DecompressT = Callable[[Union[bytes, memoryview]], bytes]  # a view skips the header without a copy
+
+
+def _zlib(level: Optional[int]) -> Tuple[CompressT, DecompressT]:
+    import zlib
+
+    return (lambda data: zlib.compress(data, -1 if level is None else level)), zlib.decompress
+
+
+def _lzma(level: Optional[int]) -> Tuple[CompressT, DecompressT]:
+    import lzma
+
+    return (lambda data: lzma.compress(data, preset=level)), lzma.decompress
+
+
+def _lz4(level: Optional[int]) -> Tuple[CompressT, DecompressT]:
+    import lz4.frame  # type: ignore[import-not-found]
+
+    return (lambda data: lz4.frame.compress(data, compression_level=level or 0)), lz4.frame.decompress
+
+
+def _zstd(level: Optional[int]) -> Tuple[CompressT, DecompressT]:
+    import zstandard  # type: ignore[import-not-found]
+
+    return (lambda data: zstandard.compress(data, 3 if level is None else level)), zstandard.decompress
+
+
+CODECS: Dict[str, Tuple[int, Callable[[Optional[int]], Tuple[CompressT, DecompressT]]]] = {
+    "zlib": (1, _zlib),
+    "lzma": (2, _lzma),
+    "lz4": (3, _lz4),
+    "zstd": (4, _zstd),
+}
+"""Compression codecs by name: the header byte of their output, and a factory of the compress and decompress functions for a level.
+
+``lz4`` requires the ``lz4`` package, and ``zstd`` the ``zstandard`` package.
+"""
+
+RAW_HEADER = 0
+"""Header byte of values stored uncompressed by a :class:`Compressor`, because they are small or incompressible."""
+
+_decompressors: Dict[int, DecompressT] = {}
+
+
+def _get_decompressor(header: int) -> Optional[DecompressT]:
+    try:
+        return _decompressors[header]
+    except KeyError:
+        pass
+    for h, factory in CODECS.values():
+        if h == header:
+            _decompressors[header] = decompress = factory(None)[1]
+            return decompress
+    return None
+
+
+class Compressor:
+    """Compress serialized return values between :meth:`.RedisFuncCache.serialize_return_value` and the put Lua script,
+    and decompress them between the get Lua script and :meth:`.RedisFuncCache.deserialize_return_value`.
+
+    Every value written is prefixed with a one-byte header: the codec's (see :data:`CODECS`),
+    or :data:`RAW_HEADER` if the value is smaller than :attr:`threshold`, or does not shrink.
+    Values are decompressed according to their own header, whatever the codec of this compressor,
+    so the codec can be changed without purging.
+
+    Values without a header, written before compression was enabled, are returned as they are,
+    as long as they do not start with a header byte, from ``0x00`` to ``0x04``:
+    :mod:`json` output, which is text, and :mod:`pickle` output, which starts with ``0x80``, never do.
+    """
+
+    def __init__(self, codec: str = "zlib", threshold: Optional[int] = None, level: Optional[int] = None):
+        """
+        Args:
+            codec: Name of the codec in :data:`CODECS`: ``"zlib"``, ``"lzma"``, ``"lz4"`` or ``"zstd"``.
+
+            threshold: Minimum size in bytes of a serialized value to be compressed.
+
+                If not provided, the default is :data:`.DEFAULT_COMPRESSION_THRESHOLD`.
+
+            level: Compression level of the codec (the ``preset`` of ``lzma``), or its default if not provided.
+
+        Raises:
+            ValueError: If the codec is unknown.
+            ImportError: If the package of the codec is not installed.
+        """
+        try:
+            header, factory = CODECS[codec]
+        except KeyError:
+            raise ValueError(f"Unknown compression codec {codec!r}, expected one of {', '.join(CODECS)}") from None
+        self._codec = codec
+        self._header = bytes([header])
+        self._threshold = DEFAULT_COMPRESSION_THRESHOLD if threshold is None else int(threshold)
+        self._level = level
+        self._compress, _decompressors[header] = factory(level)
+
+    @property
+    def codec(self) -> str:
+        """Name of the codec values are compressed with."""
+        return self._codec
+
+    @property
+    def threshold(self) -> int:
+        """Minimum size in bytes of a serialized value to be compressed."""
+        return self._threshold
+
+    @property
+    def level(self) -> Optional[int]:
+        """Compression level of the codec, or :data:`None` for its default."""
+        return self._level
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a serialized value, and prefix it with the header."""
+        if isinstance(data, str):
+            data = data.encode()
+        if len(data) >= self._threshold:
+            compressed = self._compress(data)
+            if len(compressed) < len(data):
+                return self._header + compressed
+        return b"\x00" + data
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress a value according to its header."""
+        if not data:
+            return data
+        header = data[0]
+        if header == RAW_HEADER:
+            return data[1:]
+        decompress = _get_decompressor(header)
+        if decompress is None:  # written without compression
+            return data
+        return decompress(memoryview(data)[1:])
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__qualname__} codec={self._codec!r} threshold={self._threshold!r} level={self._level!r}>"
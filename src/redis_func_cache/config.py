@@ -0,0 +1,135 @@
+"""Configurators of the optional features of :class:`.RedisFuncCache`, each passed to it as one argument."""
+
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Optional, Union
+
+__all__ = ("LeaseConfig", "StaleConfig", "StorageConfig")
+
+
+@dataclass(frozen=True)
+class LeaseConfig:
+    """Configurator of the compute lease of :class:`.RedisFuncCache`, to prevent cache stampedes.
+
+    On a miss, the get Lua script atomically takes a short-lived lease for the hash,
+    and only the caller holding it runs the user function.
+    The other callers, in any process, wait with exponential backoff (from :data:`.LEASE_MIN_BACKOFF` to :data:`.LEASE_MAX_BACKOFF` seconds)
+    and look up again, until they find the value stored by the holder's :meth:`.RedisFuncCache.put`.
+
+    The lease is released by the put Lua script, or when the user function raises.
+
+    Example::
+
+        cache = RedisFuncCache(__name__, LruTPolicy, redis_client, lease=LeaseConfig(timeout=30))
+    """
+
+    timeout: float
+    """Time-to-live (in seconds) of the lease.
+
+    If the holder crashes, the lease expires after it, and the next waiter takes it over.
+    It **SHOULD** be longer than the user function usually runs, otherwise callers may compute concurrently.
+    """
+
+    def __post_init__(self):
+        if self.timeout <= 0:
+            raise ValueError(f"timeout must be positive, but got {self.timeout!r}")
+
+
+@dataclass(frozen=True)
+class StaleConfig:
+    """Configurator of stale-while-revalidate of :class:`.RedisFuncCache`, and of the probabilistic early recomputation built on it.
+
+    The put Lua scripts stamp each value with the [Redis][] server time.
+    Once the entry is older than :attr:`after`, the get Lua scripts still return it, marked as stale,
+    and atomically hand a refresh lease to exactly one caller, which runs the user function again and puts the new value.
+    Other callers keep getting the stale value meanwhile, instead of all paying the compute latency.
+
+    The refresh lease lives for :attr:`.LeaseConfig.timeout` if the cache has a ``lease``, otherwise :data:`.STALE_REFRESH_TIMEOUT` seconds.
+    All caches sharing the same [Redis][] key pairs **MUST** either use or not use it, and :attr:`early_recompute`, since the stored values differ.
+
+    Example::
+
+        cache = RedisFuncCache(__name__, LruTPolicy, redis_client, stale=StaleConfig(after=60, ttl=600))
+    """
+
+    after: float
+    """Soft expiry (in seconds) of each entry."""
+
+    ttl: Optional[float] = None
+    """Time (in seconds) after the soft expiry during which a stale value is still served.
+
+    Beyond it (the hard expiry), the entry is a miss.
+    Default is :data:`None`, means a stale value is served until it is refreshed, evicted, or the whole key pair expires by the cache's ``ttl``.
+    """
+
+    background_refresh: Union[bool, Executor] = False
+    """Whether the caller holding the refresh lease returns the stale value too, and refreshes it in the background.
+
+    If :data:`False`, that caller recomputes inline, like on a miss.
+    If :data:`True`, coroutine functions are refreshed in a task of the running event loop,
+    and other functions in a thread pool owned by the cache; an :class:`~concurrent.futures.Executor` may be given instead of the pool.
+    Errors of background refreshes are dropped, and the lease released, so a later caller tries again.
+    Bulk and batched calls always refresh inline.
+    """
+
+    early_recompute: Optional[float] = None
+    """``beta`` of probabilistic early recomputation (XFetch), e.g. ``1.0``.
+
+    If provided, the time spent running the user function is stored with each value,
+    and each hit of a fresh entry is turned into a recomputation with a probability rising as its soft expiry nears,
+    and scaling with its compute duration: when ``now - duration * beta * log(random()) >= expiry``.
+    So recomputations of hot entries are spread over time, instead of all of them expiring at once.
+    A picked entry is refreshed like a stale one, by the only caller taking its refresh lease;
+    the others, or all of them while the entry is being computed, keep returning the fresh value.
+    Values greater than ``1.0`` favor earlier recomputation, smaller ones later.
+
+    Default is :data:`None`, means entries are only refreshed once stale.
+    """
+
+    def __post_init__(self):
+        if self.after <= 0:
+            raise ValueError(f"after must be positive, but got {self.after!r}")
+        if self.ttl is not None and self.ttl <= 0:
+            raise ValueError(f"ttl must be positive, but got {self.ttl!r}")
+        if self.early_recompute is not None and self.early_recompute <= 0:
+            raise ValueError(f"early_recompute must be positive, but got {self.early_recompute!r}")
+
+
+@dataclass(frozen=True)
+class StorageConfig:
+    """Configurator of how :class:`.RedisFuncCache` stores large and repeated serialized return values.
+
+    Both ways keep the values in hash maps beside the cache's one, which the Lua scripts update
+    when an entry is evicted, expires, is replaced, or the cache is purged.
+
+    Example::
+
+        cache = RedisFuncCache(__name__, LruTPolicy, redis_client, storage=StorageConfig(chunk_size=512 * 1024))
+    """
+
+    chunk_size: Optional[int] = None
+    """Size in bytes above which serialized return values are stored in chunks.
+
+    A larger value is split into chunks of this size, written by one ``HSET`` each in a pipeline,
+    to a hash map beside the cache's one (see :func:`.chunks_key`), and the put Lua script only stores a small reference to them.
+    So no single command blocks Redis for long. A hit fetches the chunks in pipelines into one preallocated buffer.
+
+    Default is :data:`None`, means values are never chunked.
+    """
+
+    dedup: bool = False
+    """Whether to store identical serialized return values only once.
+
+    If :data:`True`, the put Lua scripts store each value once under the BLAKE2b digest of its content, computed by the client,
+    in a hash map beside the cache's one (``<hash map key>:blobs``),
+    with a count of the entries referring to it, and the entries only hold the digest.
+    The get Lua scripts resolve the digest, and evicted, expired or replaced entries decrement the count,
+    the value being deleted when it drops to zero.
+    Chunked values are not deduplicated.
+    """
+
+    def __post_init__(self):
+        if self.chunk_size is not None and self.chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, but got {self.chunk_size!r}")
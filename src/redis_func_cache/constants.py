@@ -6,3 +6,33 @@ DEFAULT_TTL = 3600
 
 DEFAULT_PREFIX = "func-cache:"
 """Default prefix for the cache keys."""
+
+DEFAULT_LOCAL_MAXSIZE = 256
+"""Default maximum size of the in-process local cache tier."""
+
+DEFAULT_LOCAL_TTL = 1.0
+"""Default time-to-live in seconds of entries in the in-process local cache tier."""
+
+LEASE_MIN_BACKOFF = 0.005
+"""Initial interval in seconds between two lookups of a caller waiting for the compute lease held by another caller."""
+
+LEASE_MAX_BACKOFF = 0.2
+"""Maximum interval in seconds between two lookups of a caller waiting for the compute lease held by another caller."""
+
+DEFAULT_WRITE_BEHIND_MAXSIZE = 10000
+"""Default maximum number of puts queued by write-behind."""
+
+DEFAULT_WRITE_BEHIND_BATCH_SIZE = 256
+"""Default maximum number of queued puts written in one pipeline by write-behind."""
+
+STALE_REFRESH_TIMEOUT = 60
+"""Time-to-live in seconds of the refresh lease of a stale entry, when the cache has no ``lease``."""
+
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+"""Default minimum size in bytes of a serialized return value to be compressed."""
+
+CHUNK_READ_WINDOW = 8 << 20
+"""Size in bytes of the chunks of a chunked value fetched in one pipeline."""
+
+DEDUP_DIGEST_SIZE = 20
+"""Size in bytes of the BLAKE2b digest under which a deduplicated return value is stored."""
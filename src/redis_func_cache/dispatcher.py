@@ -0,0 +1,127 @@
+"""Automatic micro-batching of concurrent script calls, DataLoader style."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future
+from threading import Lock
+from time import sleep
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .pipeline import arun_script_calls, run_script_calls
+
+if TYPE_CHECKING:  # pragma: no cover
+    from redis.commands.core import AsyncScript, Script
+    from redis.typing import KeyT
+
+__all__ = ("LookupDispatcher", "AsyncLookupDispatcher")
+
+
+class LookupDispatcher:
+    """Collect script calls issued by threads within a short time window, and send them in a single pipeline.
+
+    The first thread submitting a call waits for the window, then sends every call submitted meanwhile by other threads,
+    and routes each result back to its caller. A call submitted after the batch is taken, even while it is being sent,
+    goes in the next pipeline, whose first call waits for the window in turn.
+    """
+
+    def __init__(self, window: float):
+        """
+        Args:
+            window: Time (in seconds) the first call of a batch waits for others, e.g. ``200e-6``.
+                Zero means no wait: the first call only takes those submitted by other threads before it takes the batch,
+                which is right away, so there is little batching. Calls submitted while a pipeline is being sent are not added to it,
+                the first of them sends the next pipeline.
+        """
+        self._window = float(window)
+        self._lock = Lock()
+        self._pending: List[Tuple[Tuple[Script, Sequence[KeyT], Tuple], Future]] = []
+
+    @property
+    def window(self) -> float:
+        """Time (in seconds) the first call of a batch waits for others."""
+        return self._window
+
+    def submit(self, script: Script, keys: Sequence[KeyT], args: Tuple) -> Any:
+        """Run ``script`` with ``keys`` and ``args`` in the next pipeline, and return its result."""
+        future: Future = Future()
+        with self._lock:
+            self._pending.append(((script, keys, args), future))
+            leader = len(self._pending) == 1
+        if leader:
+            interrupted: Optional[BaseException] = None
+            try:
+                if self._window > 0:
+                    sleep(self._window)
+            except BaseException as err:
+                interrupted = err
+                raise
+            finally:
+                # the calls submitted meanwhile are always taken, so that the next call elects a new leader
+                with self._lock:
+                    batch, self._pending = self._pending, []
+                if interrupted is None:
+                    self._run(batch)
+                else:
+                    for _, f in batch:
+                        f.set_exception(interrupted)
+        return future.result()
+
+    @staticmethod
+    def _run(batch: List[Tuple[Tuple[Script, Sequence[KeyT], Tuple], Future]]):
+        try:
+            results = run_script_calls([call for call, _ in batch], raise_on_error=False)
+        except BaseException as err:
+            for _, f in batch:
+                f.set_exception(err)
+        else:
+            for (_, f), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    f.set_exception(result)
+                else:
+                    f.set_result(result)
+
+
+class AsyncLookupDispatcher:
+    """Collect script calls issued by tasks within one iteration of their event loop, and send them in a single pipeline."""
+
+    def __init__(self):
+        self._pending: Dict[
+            asyncio.AbstractEventLoop, List[Tuple[Tuple[AsyncScript, Sequence[KeyT], Tuple], asyncio.Future]]
+        ] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, script: AsyncScript, keys: Sequence[KeyT], args: Tuple) -> Any:
+        """Async version of :meth:`.LookupDispatcher.submit`"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.get(loop)
+        if pending is None:
+            pending = self._pending[loop] = []
+            loop.call_soon(self._dispatch, loop)
+        pending.append(((script, keys, args), future))
+        return await future
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop):
+        batch = self._pending.pop(loop)
+        task = loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Tuple[AsyncScript, Sequence[KeyT], Tuple], asyncio.Future]]):
+        try:
+            results = await arun_script_calls([call for call, _ in batch], raise_on_error=False)
+        except BaseException as err:
+            for _, f in batch:
+                if not f.done():
+                    f.set_exception(err)
+            if isinstance(err, asyncio.CancelledError):
+                raise
+        else:
+            for (_, f), result in zip(batch, results):
+                if f.done():  # the caller is cancelled
+                    continue
+                if isinstance(result, Exception):
+                    f.set_exception(result)
+                else:
+                    f.set_result(result)
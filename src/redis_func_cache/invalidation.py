@@ -0,0 +1,163 @@
+"""Broadcast invalidation of the in-process local cache tier."""
+
+from __future__ import annotations
+
+import asyncio
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional, Union
+from uuid import uuid4
+
+if TYPE_CHECKING:  # pragma: no cover
+    import redis.asyncio.client
+    import redis.client
+    from redis.typing import KeyT
+
+    from .local_cache import LocalCache
+
+__all__ = ("InvalidationListener", "encode_invalidation_message", "publish_invalidation", "apublish_invalidation")
+
+
+def encode_invalidation_message(origin: str, key: KeyT, hash: Optional[KeyT] = None) -> bytes:
+    """Encode a message published on the invalidation channel.
+
+    The message is ``<origin>\\n<key>\\n<hash>``, or ``<origin>\\n<key>`` when all entries of ``key`` are invalidated, e.g. by a purge.
+    The put and get Lua scripts publish the same format.
+    """
+    parts = [origin.encode(), key.encode() if isinstance(key, str) else bytes(key)]  # type: ignore[arg-type]
+    if hash is not None:
+        parts.append(hash.encode() if isinstance(hash, str) else bytes(hash))  # type: ignore[arg-type]
+    return b"\n".join(parts)
+
+
+async def _aclose_pubsub(pubsub: Any):
+    """Close an asynchronous pub/sub, with ``aclose()`` (redis-py 5.0.1+) or the older ``close()`` coroutine."""
+    aclose = getattr(pubsub, "aclose", None)
+    await (pubsub.close() if aclose is None else aclose())
+
+
+class InvalidationListener:
+    """Subscribe to the invalidation channel and drop the affected entries from a :class:`.LocalCache`.
+
+    When a :class:`.RedisFuncCache` has an ``invalidation_channel``, its put Lua scripts publish every written and evicted hash,
+    and :meth:`.AbstractPolicy.purge` publishes every deleted key.
+    The listener receives these messages in a background thread (synchronous client) or task (asynchronous client),
+    and removes the entries from the local tier as soon as they changed in Redis.
+
+    The local tier is only filled after the subscription has been confirmed, so no invalidation can be missed in between.
+    If the subscription connection fails, the whole local tier is cleared, as messages may have been lost.
+    """
+
+    def __init__(self, local_cache: LocalCache, channel: str):
+        self._local_cache = local_cache
+        self._channel = channel
+        self._origin = uuid4().hex
+        self._lock = Lock()
+        self._pubsub: Union[redis.client.PubSub, redis.asyncio.client.PubSub, None] = None
+        self._worker: Any = None
+
+    @property
+    def channel(self) -> str:
+        """Name of the invalidation channel."""
+        return self._channel
+
+    @property
+    def origin(self) -> str:
+        """Unique identifier of the listener, so that it ignores the writes published by its own process."""
+        return self._origin
+
+    @property
+    def script_options(self) -> Mapping[str, Any]:
+        """Options passed to the Lua scripts to make them publish invalidation messages."""
+        return {"invalidation_channel": self._channel, "invalidation_origin": self._origin}
+
+    @property
+    def started(self) -> bool:
+        """Whether the subscription is confirmed and the listener is running."""
+        return self._worker is not None
+
+    def handle_message(self, message: Mapping[str, Any]):
+        """Callback of the subscription, drop local entries referred by ``message``."""
+        data = message.get("data")
+        if not isinstance(data, bytes):
+            return
+        parts = data.split(b"\n", 2)
+        if len(parts) == 2:
+            key = parts[1].decode()
+            self._local_cache.invalidate_where(lambda k: k[0] == key)
+        elif len(parts) == 3:
+            origin, key_bytes, hash = parts
+            if origin.decode() == self._origin:
+                return
+            key = key_bytes.decode()
+            self._local_cache.invalidate((key, hash))
+            try:
+                self._local_cache.invalidate((key, hash.decode()))
+            except UnicodeDecodeError:
+                pass
+
+    def _handle_exception(self, *_):
+        self._local_cache.clear()
+
+    def start(self, client: redis.client.Redis):
+        """Subscribe with a synchronous client and process messages in a daemon thread."""
+        with self._lock:
+            if self._worker is not None:
+                return
+            pubsub = client.pubsub()
+            pubsub.subscribe(**{self._channel: self.handle_message})
+            while pubsub.get_message(timeout=1.0) is None:  # wait for the subscription confirmation
+                pass
+            self._local_cache.clear()
+            self._pubsub = pubsub
+            self._worker = pubsub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=self._handle_exception)
+
+    async def astart(self, client: redis.asyncio.client.Redis):
+        """Subscribe with an asynchronous client and process messages in a task."""
+        if self._worker is not None:
+            return
+        pubsub = client.pubsub()
+        await pubsub.subscribe(**{self._channel: self.handle_message})
+        while await pubsub.get_message(timeout=1.0) is None:  # wait for the subscription confirmation
+            pass
+        if self._worker is not None:  # started by another task meanwhile
+            await _aclose_pubsub(pubsub)
+            return
+        self._local_cache.clear()
+        self._pubsub = pubsub
+        self._worker = asyncio.create_task(pubsub.run(exception_handler=self._handle_exception))
+
+    def stop(self):
+        """Stop the background thread and close the subscription started by :meth:`start`."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+            pubsub, self._pubsub = self._pubsub, None
+        if worker is not None:
+            worker.stop()
+            worker.join(timeout=5)
+        if pubsub is not None:
+            pubsub.close()  # type: ignore[union-attr]
+
+    async def astop(self):
+        """Cancel the background task and close the subscription started by :meth:`astart`."""
+        worker, self._worker = self._worker, None
+        pubsub, self._pubsub = self._pubsub, None
+        if worker is not None:
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        if pubsub is not None:
+            await _aclose_pubsub(pubsub)
+
+
+def publish_invalidation(client: redis.client.Redis, channel: str, origin: str, keys: Iterable[KeyT]):
+    """Publish a whole-key invalidation message for each of ``keys``."""
+    for key in keys:
+        client.publish(channel, encode_invalidation_message(origin, key))
+
+
+async def apublish_invalidation(client: redis.asyncio.client.Redis, channel: str, origin: str, keys: Iterable[KeyT]):
+    """Async version of :func:`publish_invalidation`."""
+    for key in keys:
+        await client.publish(channel, encode_invalidation_message(origin, key))
@@ -0,0 +1,169 @@
+"""In-process near-cache tier in front of Redis."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Optional, Tuple, TypeVar, Union
+
+from .constants import DEFAULT_LOCAL_MAXSIZE, DEFAULT_LOCAL_TTL
+
+if TYPE_CHECKING:  # pragma: no cover
+    DefaultT = TypeVar("DefaultT")
+
+__all__ = ("LocalCache",)
+
+
+class LocalCache:
+    """A small, thread-safe, in-process LRU cache holding **already deserialized** return values.
+
+    When a :class:`.RedisFuncCache` is created with a ``local_cache``, every call consults this tier before running the ``get`` Lua script.
+    A local hit skips the Redis round trip, the script and the deserializer entirely.
+    The tier is filled on both Redis hits and puts.
+
+    Entries are bounded by count, by total bytes (measured on the serialized form), and expire after a short time-to-live,
+    so the staleness of a value served from the local tier is bounded by :attr:`ttl`.
+
+    .. attention::
+        Values are stored by reference. Mutating a returned object also mutates what later callers get from the local tier,
+        just like :func:`functools.lru_cache`.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        maxbytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Args:
+            maxsize: Maximum number of entries.
+
+                If not provided, the default is :data:`.DEFAULT_LOCAL_MAXSIZE`.
+                Zero or negative values means no limit.
+
+            maxbytes: Maximum total size in bytes of the entries, measured on their serialized form.
+
+                If not provided, total size is not limited.
+
+            ttl: Time-to-live (in seconds) of each entry.
+
+                If not provided, the default is :data:`.DEFAULT_LOCAL_TTL`.
+                Zero or negative values means entries never expire by time.
+        """
+        self._maxsize = DEFAULT_LOCAL_MAXSIZE if maxsize is None else int(maxsize)
+        self._maxbytes = 0 if maxbytes is None else int(maxbytes)
+        self._ttl = DEFAULT_LOCAL_TTL if ttl is None else float(ttl)
+        self._data: OrderedDict[Hashable, Tuple[Any, int, float]] = OrderedDict()
+        self._nbytes = 0
+        self._epoch = 0
+        self._lock = Lock()
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum number of entries."""
+        return self._maxsize
+
+    @property
+    def maxbytes(self) -> int:
+        """Maximum total size in bytes of the entries."""
+        return self._maxbytes
+
+    @property
+    def ttl(self) -> float:
+        """Time-to-live (in seconds) of each entry."""
+        return self._ttl
+
+    @property
+    def nbytes(self) -> int:
+        """Current total size in bytes of the entries."""
+        return self._nbytes
+
+    @property
+    def epoch(self) -> int:
+        """A counter increased by every invalidation.
+
+        Read it before fetching a value from Redis, and pass it to :meth:`put`,
+        so that a value fetched before a concurrent invalidation is not stored.
+        """
+        return self._epoch
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Optional[DefaultT] = None) -> Union[Any, DefaultT, None]:
+        """Return the value of ``key``, or ``default`` if it is absent or expired.
+
+        A hit moves the entry to the most recently used end.
+        """
+        with self._lock:
+            try:
+                value, size, expire_at = self._data[key]
+            except KeyError:
+                return default
+            if expire_at and expire_at <= monotonic():
+                del self._data[key]
+                self._nbytes -= size
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any, size: int = 0, epoch: Optional[int] = None):
+        """Insert or replace the value of ``key``.
+
+        Least recently used entries are evicted until both :attr:`maxsize` and :attr:`maxbytes` are satisfied.
+        A value whose ``size`` alone exceeds :attr:`maxbytes` is not stored.
+        If ``epoch`` is given and any invalidation happened since it was read from :attr:`epoch`, the value is not stored.
+        """
+        if self._maxbytes > 0 and size > self._maxbytes:
+            self.invalidate(key)
+            return
+        expire_at = monotonic() + self._ttl if self._ttl > 0 else 0.0
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            self._data[key] = value, size, expire_at
+            self._nbytes += size
+            while (self._maxsize > 0 and len(self._data) > self._maxsize) or (
+                self._maxbytes > 0 and self._nbytes > self._maxbytes
+            ):
+                _, (_, popped_size, _) = self._data.popitem(last=False)
+                self._nbytes -= popped_size
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Remove the entry of ``key``.
+
+        Returns:
+            Whether an entry was removed.
+        """
+        with self._lock:
+            self._epoch += 1
+            old = self._data.pop(key, None)
+            if old is None:
+                return False
+            self._nbytes -= old[1]
+            return True
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Remove all entries whose key satisfies ``predicate``.
+
+        Returns:
+            Number of removed entries.
+        """
+        with self._lock:
+            self._epoch += 1
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                self._nbytes -= self._data.pop(k)[1]
+            return len(keys)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+            self._nbytes = 0
@@ -1,21 +1,24 @@
 local zset_key = KEYS[1]
-local hmap_key = KEYS[2]
 
 local ttl = ARGV[1]
 local hash = ARGV[2]
+options = cjson.decode(ARGV[3])
 
-if tonumber(ttl) > 0 then
-    redis.call('EXPIRE', zset_key, ttl)
-    redis.call('EXPIRE', hmap_key, ttl)
-end
+expire_keys(ttl)
+drop_if_expired(hash, 'ZREM')
 
 local rnk = redis.call('ZRANK', zset_key, hash)
-local val = redis.call('HGET', hmap_key, hash)
+local val = lookup(hash)
 
 if rnk and val then
-    return val
+    local hit = reply(val)
+    if hit then
+        return hit
+    end
 elseif rnk then
     redis.call('ZREM', zset_key, hash)
 elseif val then
-    redis.call('HDEL', hmap_key, hash)
+    drop(hash)
 end
+
+return miss()
@@ -1,23 +1,18 @@
 local zset_key = KEYS[1]
-local hmap_key = KEYS[2]
 
 local maxsize = tonumber(ARGV[1])
 local ttl = ARGV[2]
 local hash = ARGV[3]
-local return_value = ARGV[4]
-
-if tonumber(ttl) > 0 then
-    redis.call('EXPIRE', zset_key, ttl)
-    redis.call('EXPIRE', hmap_key, ttl)
-end
+options = cjson.decode(ARGV[5])
+local value, digest, blob, chunk_index = decode_value(ARGV[4])
 
 local c = 0
 local rnk_with_score = redis.call('ZRANK', zset_key, hash, 'WITHSCORE')
 if maxsize > 0 and not rnk_with_score then
-    local n = redis.call('ZCARD', zset_key) - maxsize
+    local n
+    n, c = evict_expired(redis.call('ZCARD', zset_key) - maxsize, 'ZCARD', { 'ZRANGE', zset_key, 0, -1 }, 'ZREM')
     while n >= 0 do
-        local popped = redis.call('ZPOPMIN', zset_key)
-        redis.call('HDEL', hmap_key, popped[1])
+        drop(redis.call('ZPOPMIN', zset_key)[1])
         n = n - 1
         c = c + 1
     end
@@ -32,6 +27,7 @@ if not rnk_with_score then
     end
 end
 
-redis.call('HSET', hmap_key, hash, return_value)
+store(hash, value, digest, blob, chunk_index)
+end_put(ttl)
 
 return c
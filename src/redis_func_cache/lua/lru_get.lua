@@ -1,16 +1,14 @@
 local zset_key = KEYS[1]
-local hmap_key = KEYS[2]
 
 local ttl = ARGV[1]
 local hash = ARGV[2]
+options = cjson.decode(ARGV[3])
 
-if tonumber(ttl) > 0 then
-    redis.call('EXPIRE', zset_key, ttl)
-    redis.call('EXPIRE', hmap_key, ttl)
-end
+expire_keys(ttl)
+drop_if_expired(hash, 'ZREM')
 
 local rnk_and_score = redis.call('ZRANK', zset_key, hash, 'WITHSCORE')
-local val = redis.call('HGET', hmap_key, hash)
+local val = lookup(hash)
 
 if rnk_and_score and val then
     local highest_with_score = redis.call('ZRANGE', zset_key, '+inf', '-inf', 'BYSCORE', 'REV', 'LIMIT', 0, 1,
@@ -23,9 +21,14 @@ if rnk_and_score and val then
     else
         redis.call('ZADD', zset_key, 1, hash)
     end
-    return val
+    local hit = reply(val)
+    if hit then
+        return hit
+    end
 elseif rnk_and_score then
     redis.call('ZREM', zset_key, hash)
 elseif val then
-    redis.call('HDEL', hmap_key, hash)
+    drop(hash)
 end
+
+return miss()
@@ -0,0 +1,235 @@
+-- The keys and helpers shared by the get and put scripts of every policy,
+-- prepended to each of them by AbstractPolicy.read_lua_scripts().
+-- A script decodes `options` from its own ARGV before calling any of the helpers.
+
+local hmap_key = KEYS[2]
+local expiry_key = KEYS[3] -- the side keys, named after hmap_key by script_keys() in Python
+local chunks_key = KEYS[4]
+local blobs_key = KEYS[5]
+local lease_key = KEYS[6]
+
+local options = {}
+
+local function now_ms()
+    local now = redis.call('TIME')
+    return now[1] * 1000 + math.floor(now[2] / 1000)
+end
+
+-- The key pair, and the side keys in use, live ttl seconds after the last get or put.
+-- The put scripts call it after their writes, which may have created any of them.
+local function expire_keys(ttl)
+    if tonumber(ttl) > 0 then
+        redis.call('EXPIRE', KEYS[1], ttl)
+        redis.call('EXPIRE', hmap_key, ttl)
+        if options['entry_ttl'] then
+            redis.call('EXPIRE', expiry_key, ttl)
+        end
+        if options['chunks'] then
+            redis.call('EXPIRE', chunks_key, ttl)
+        end
+        if options['dedup'] then
+            redis.call('EXPIRE', blobs_key, ttl)
+        end
+    end
+end
+
+local function chunk_fields(member, index) -- fields of a chunked value in the side hash map, from its index 'id:count'
+    local sep = string.find(index, ':', 1, true)
+    local fields = { member }
+    for i = 0, tonumber(string.sub(index, sep + 1)) - 1 do
+        fields[#fields + 1] = member .. ':' .. string.sub(index, 1, sep - 1) .. ':' .. i
+    end
+    return fields
+end
+
+local function del_chunks(member)
+    local index = options['chunks'] and redis.call('HGET', chunks_key, member)
+    if index then
+        for _, field in ipairs(chunk_fields(member, index)) do
+            redis.call('HDEL', chunks_key, field)
+        end
+    end
+end
+
+local function unref(member) -- a deduplicated value is deleted when no member refers to it anymore
+    local value = options['dedup'] and redis.call('HGET', hmap_key, member)
+    local digest = value and string.match(value, '^%d*:?\15(%x+)$')
+    if digest and redis.call('HINCRBY', blobs_key, digest .. ':refs', -1) <= 0 then
+        redis.call('HDEL', blobs_key, digest, digest .. ':refs')
+    end
+end
+
+-- Delete the value of a member, already removed from KEYS[1] by the script, with its side data.
+-- Returns whether there was a value.
+local function drop(member)
+    unref(member)
+    del_chunks(member)
+    if options['entry_ttl'] then
+        redis.call('ZREM', expiry_key, member)
+    end
+    if redis.call('HDEL', hmap_key, member) == 0 then
+        return false
+    end
+    if options['invalidation_channel'] then
+        redis.call('PUBLISH', options['invalidation_channel'], '\n' .. hmap_key .. '\n' .. member)
+    end
+    return true
+end
+
+----------------------------------------------------------------------------------------------------
+-- get scripts
+----------------------------------------------------------------------------------------------------
+
+-- Expiry scores are only used before Redis 7.4, which expires hash fields itself, and for deduplicated values.
+-- `remove` is the command removing a member from KEYS[1].
+local function drop_if_expired(hash, remove)
+    local expire_at = options['entry_ttl'] and redis.call('ZSCORE', expiry_key, hash)
+    if expire_at and tonumber(expire_at) <= now_ms() then
+        redis.call(remove, KEYS[1], hash)
+        drop(hash)
+    end
+end
+
+local function lookup(hash) -- a deduplicated value is '[<stamp>:]\15<digest>', and is stored under its digest
+    local value = redis.call('HGET', hmap_key, hash)
+    local stamp, digest = string.match(value or '', '^(%d*:?)\15(%x+)$')
+    if not (options['dedup'] and digest) then
+        return value
+    end
+    local blob = redis.call('HGET', blobs_key, digest)
+    return blob and stamp .. blob
+end
+
+-- The reply to a hit: the value, or with stale-while-revalidate, the value and its state.
+-- Returns nothing for a value too stale to be served.
+local function reply(value)
+    local swr = options['swr']
+    if not swr then
+        return value
+    end
+    local sep = string.find(value, ':', 1, true)
+    local stored_at = sep and tonumber(string.sub(value, 1, sep - 1))
+    if stored_at then
+        local age = now_ms() - stored_at
+        if age < swr['fresh'] then
+            return { string.sub(value, sep + 1), 0, age }
+        end
+        if swr['stale'] <= 0 or age < swr['fresh'] + swr['stale'] then
+            if redis.call('SET', lease_key, 1, 'NX', 'PX', swr['refresh']) then
+                return { string.sub(value, sep + 1), 1 }
+            end
+            return { string.sub(value, sep + 1), 2 }
+        end
+    end
+end
+
+-- The reply to a miss: 0 if another caller holds the compute lease, nothing if the caller is to compute the value.
+local function miss()
+    if options['lease'] and not redis.call('SET', lease_key, 1, 'NX', 'PX', options['lease']) then
+        return 0
+    end
+end
+
+----------------------------------------------------------------------------------------------------
+-- put scripts
+----------------------------------------------------------------------------------------------------
+
+-- Decode the value to put. Returns the value to store in the hash map,
+-- the digest and content of a value to deduplicate, and the index 'id:count' of a chunked value.
+local function decode_value(value)
+    -- a reference to a chunked value, whose chunks are already written, is '\14<id>:<count>:<size>'
+    local chunk_index = options['chunks'] and string.match(value, '^\14([^:]+:%d+):')
+    -- a value to deduplicate is '\15<digest>:<value>', the digest of its content computed by the client
+    local blob = nil
+    local digest = options['dedup'] and string.match(string.sub(value, 1, 80), '^\15(%x+):')
+    if digest then
+        blob = string.sub(value, #digest + 3)
+        value = '\15' .. digest
+    end
+    if options['swr'] then
+        value = string.format('%d', now_ms()) .. ':' .. value
+    end
+    return value, digest, blob, chunk_index
+end
+
+-- Before the policy evicts `n` + 1 entries for a new one, evict those expired: the entries whose expiry score is past,
+-- then the members left by hash fields expired by HPEXPIRE, which must not count as entries.
+-- `card`, `members` and `remove` are the commands counting, listing and removing the members of KEYS[1].
+-- Returns the number of entries the policy still has to evict, and the number evicted.
+local function evict_expired(n, card, members, remove)
+    local c = 0
+    if not options['entry_ttl'] or n < 0 then
+        return n, c
+    end
+    for _, member in ipairs(redis.call('ZRANGE', expiry_key, '-inf', now_ms(), 'BYSCORE', 'LIMIT', 0, n + 1)) do
+        if redis.call(remove, KEYS[1], member) > 0 then
+            n = n - 1
+        end
+        if drop(member) then
+            c = c + 1
+        end
+    end
+    local dead = n >= 0 and redis.call(card, KEYS[1]) - redis.call('HLEN', hmap_key) or 0
+    if dead > 0 then
+        for _, member in ipairs(redis.call(unpack(members))) do
+            if redis.call('HEXISTS', hmap_key, member) == 0 then
+                redis.call(remove, KEYS[1], member)
+                drop(member)
+                n = n - 1
+                dead = dead - 1
+                if dead == 0 then
+                    break
+                end
+            end
+        end
+    end
+    return n, c
+end
+
+local function expire_entry(hash, digest, chunk_index)
+    local entry_ttl = options['entry_ttl']
+    if not entry_ttl then
+        return
+    end
+    local now = redis.call('TIME')
+    -- the microseconds of the server time are random enough to shorten each entry's ttl by a different fraction
+    entry_ttl = math.max(1, math.floor(entry_ttl * (1 - (options['ttl_jitter'] or 0) * now[2] / 1000000)))
+    -- deduplicated values are released by the scripts, so their expiry scores are checked lazily too
+    local expired = not digest and redis.pcall('HPEXPIRE', hmap_key, entry_ttl, 'FIELDS', 1, hash)
+    if not expired or (type(expired) == 'table' and expired['err']) then -- before Redis 7.4, expiry scores are checked lazily
+        redis.call('ZADD', expiry_key, now[1] * 1000 + math.floor(now[2] / 1000) + entry_ttl, hash)
+    elseif chunk_index and redis.call('HEXISTS', chunks_key, hash) == 1 then -- the chunks expire with the value
+        for _, field in ipairs(chunk_fields(hash, chunk_index)) do
+            redis.call('HPEXPIRE', chunks_key, entry_ttl, 'FIELDS', 1, field)
+        end
+    end
+end
+
+-- Store the value from decode_value() of a member, in place of its previous value and side data.
+local function store(hash, value, digest, blob, chunk_index)
+    unref(hash) -- of the replaced value
+    if digest and redis.call('HINCRBY', blobs_key, digest .. ':refs', 1) == 1 then
+        redis.call('HSET', blobs_key, digest, blob)
+    end
+    del_chunks(hash) -- of the replaced value
+    if chunk_index then
+        redis.call('HSET', chunks_key, hash, chunk_index)
+    end
+    redis.call('HSET', hmap_key, hash, value)
+    local channel = options['invalidation_channel']
+    if channel then
+        redis.call('PUBLISH', channel, (options['invalidation_origin'] or '') .. '\n' .. hmap_key .. '\n' .. hash)
+    end
+    expire_entry(hash, digest, chunk_index)
+end
+
+local function end_put(ttl)
+    if options['lease'] or options['swr'] then
+        redis.call('DEL', lease_key)
+    end
+    expire_keys(ttl)
+end
+
+----------------------------------------------------------------------------------------------------
+-- the script of the policy
+----------------------------------------------------------------------------------------------------
@@ -1,21 +1,24 @@
 local set_key = KEYS[1]
-local hmap_key = KEYS[2]
 
 local ttl = ARGV[1]
 local hash = ARGV[2]
+options = cjson.decode(ARGV[3])
 
-if tonumber(ttl) > 0 then
-    redis.call('EXPIRE', set_key, ttl)
-    redis.call('EXPIRE', hmap_key, ttl)
-end
+expire_keys(ttl)
+drop_if_expired(hash, 'SREM')
 
 local is_member = redis.call('SISMEMBER', set_key, hash)
-local val = redis.call('HGET', hmap_key, hash)
+local val = lookup(hash)
 
 if is_member and val then
-    return val
+    local hit = reply(val)
+    if hit then
+        return hit
+    end
 elseif is_member then
     redis.call('SREM', set_key, hash)
 elseif val then
-    redis.call('HDEL', hmap_key, hash)
+    drop(hash)
 end
+
+return miss()
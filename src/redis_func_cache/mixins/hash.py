@@ -4,8 +4,9 @@ import hashlib
 import json
 import pickle
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, Callable, Mapping, Optional, Sequence
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Optional, Sequence, cast
 
+from ..canonical import canonical_dumps, canonical_update
 from ..utils import base64_hash_digest, get_fullname, get_source
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -27,6 +28,12 @@ __all__ = (
     "PickleSha1HashMixin",
     "PickleSha1HexHashMixin",
     "PickleSha1Base64HashMixin",
+    "CanonicalMd5HashMixin",
+    "CanonicalMd5HexHashMixin",
+    "CanonicalMd5Base64HashMixin",
+    "CanonicalBlake2bHashMixin",
+    "CanonicalBlake2bHexHashMixin",
+    "CanonicalBlake2bBase64HashMixin",
 )
 
 
@@ -43,6 +50,17 @@ class HashConfig:
 
     Default is :data:`None`, means no convert and use the digested bytes directly.
     """
+    digest_size: Optional[int] = None
+    """digest size in bytes, for the algorithms with a variable digest size, ``blake2b`` and ``blake2s``.
+
+    Default is :data:`None`, means the algorithm's default.
+    """
+    updater: Optional[Callable[[_Hash, Any], None]] = None
+    """function to feed arguments directly to the hash object, instead of serializing them to bytes first.
+
+    It shall have the same effect as ``h.update(serializer(x))``, without copying large buffers.
+    Default is :data:`None`, means :attr:`serializer` is used.
+    """
 
 
 class AbstractHashMixin:
@@ -71,16 +89,54 @@ class AbstractHashMixin:
         """
         if not callable(f):
             raise TypeError(f"Can not calculate hash for {f=}")
+        return self.calc_hash_with_seed(self._make_seed(f), args, kwds)
+
+    def seed_hash(self, f: Callable) -> Optional[_Hash]:
+        """Mixin method to overwrite :meth:`redis_func_cache.policies.abstract.AbstractPolicy.seed_hash`
+
+        Returns a hash object of the configured algorithm, fed with the function's full name and source code.
+
+        If a subclass overrides :meth:`calc_hash`, it returns :data:`None`, so that the overridden method is always used.
+        """
+        if type(self).calc_hash is not AbstractHashMixin.calc_hash:
+            return None
+        return self._make_seed(f)
+
+    def _make_seed(self, f: Callable) -> _Hash:
         conf = self.__hash_config__
-        h = hashlib.new(conf.algorithm)
+        if conf.digest_size is None:
+            h = hashlib.new(conf.algorithm)
+        elif conf.algorithm == "blake2b":
+            h = cast("_Hash", hashlib.blake2b(digest_size=conf.digest_size))
+        elif conf.algorithm == "blake2s":
+            h = cast("_Hash", hashlib.blake2s(digest_size=conf.digest_size))
+        else:
+            raise ValueError(f"digest_size is not supported by the {conf.algorithm!r} algorithm")
         h.update(get_fullname(f).encode())
         source = get_source(f)
         if source is not None:
             h.update(source.encode())
-        if args is not None:
-            h.update(conf.serializer(args))
-        if kwds is not None:
-            h.update(conf.serializer(kwds))
+        return h
+
+    def calc_hash_with_seed(
+        self, seed: _Hash, args: Optional[Sequence] = None, kwds: Optional[Mapping[str, Any]] = None
+    ) -> KeyT:
+        """Mixin method to overwrite :meth:`redis_func_cache.policies.abstract.AbstractPolicy.calc_hash_with_seed`
+
+        Copies ``seed``, feeds it with the serialized arguments, then returns the decoded digest.
+        """
+        conf = self.__hash_config__
+        h = seed.copy()
+        if conf.updater is None:
+            if args is not None:
+                h.update(conf.serializer(args))
+            if kwds is not None:
+                h.update(conf.serializer(kwds))
+        else:
+            if args is not None:
+                conf.updater(h, args)
+            if kwds is not None:
+                conf.updater(h, kwds)
         if conf.decoder is None:
             return h.digest()
         return conf.decoder(h)
@@ -238,3 +294,103 @@ class PickleSha1Base64HashMixin(AbstractHashMixin):
     """
 
     __hash_config__ = HashConfig(algorithm="sha1", serializer=pickle.dumps, decoder=base64_hash_digest)
+
+
+CANONICAL_BLAKE2B_DIGEST_SIZE = 16
+"""Digest size in bytes of the ``blake2b`` canonical hash mixins."""
+
+
+class CanonicalMd5HashMixin(AbstractHashMixin):
+    """
+    Serializes the function name, source code, and arguments using :func:`.canonical_dumps`,
+    then calculates the MD5 hash value,
+    and finally returns the digest as bytes.
+
+    Equal arguments always produce the same hash, e.g. dicts with different insertion orders, or ``1`` and ``1.0``.
+    Large buffer protocol arguments, such as :class:`bytes` or NumPy arrays, are hashed without being copied (:func:`.canonical_update`).
+
+    .. inheritance-diagram:: CanonicalMd5HashMixin
+    """
+
+    __hash_config__ = HashConfig(algorithm="md5", serializer=canonical_dumps, updater=canonical_update)
+
+
+class CanonicalMd5HexHashMixin(AbstractHashMixin):
+    """
+    Serializes the function name, source code, and arguments using :func:`.canonical_dumps`,
+    then calculates the MD5 hash value,
+    and finally returns the hexadecimal representation of the digest.
+
+    .. inheritance-diagram:: CanonicalMd5HexHashMixin
+    """
+
+    __hash_config__ = HashConfig(
+        algorithm="md5", serializer=canonical_dumps, updater=canonical_update, decoder=hexdigest
+    )
+
+
+class CanonicalMd5Base64HashMixin(AbstractHashMixin):
+    """
+    Serializes the function name, source code, and arguments using :func:`.canonical_dumps`,
+    then calculates the MD5 hash value,
+    and finally returns the base64 encoded digest.
+
+    .. inheritance-diagram:: CanonicalMd5Base64HashMixin
+    """
+
+    __hash_config__ = HashConfig(
+        algorithm="md5", serializer=canonical_dumps, updater=canonical_update, decoder=base64_hash_digest
+    )
+
+
+class CanonicalBlake2bHashMixin(AbstractHashMixin):
+    """
+    Serializes the function name, source code, and arguments using :func:`.canonical_dumps`,
+    then calculates the BLAKE2b hash value of :data:`CANONICAL_BLAKE2B_DIGEST_SIZE` bytes,
+    and finally returns the digest as bytes.
+
+    .. inheritance-diagram:: CanonicalBlake2bHashMixin
+    """
+
+    __hash_config__ = HashConfig(
+        algorithm="blake2b",
+        serializer=canonical_dumps,
+        updater=canonical_update,
+        digest_size=CANONICAL_BLAKE2B_DIGEST_SIZE,
+    )
+
+
+class CanonicalBlake2bHexHashMixin(AbstractHashMixin):
+    """
+    Serializes the function name, source code, and arguments using :func:`.canonical_dumps`,
+    then calculates the BLAKE2b hash value of :data:`CANONICAL_BLAKE2B_DIGEST_SIZE` bytes,
+    and finally returns the hexadecimal representation of the digest.
+
+    .. inheritance-diagram:: CanonicalBlake2bHexHashMixin
+    """
+
+    __hash_config__ = HashConfig(
+        algorithm="blake2b",
+        serializer=canonical_dumps,
+        updater=canonical_update,
+        decoder=hexdigest,
+        digest_size=CANONICAL_BLAKE2B_DIGEST_SIZE,
+    )
+
+
+class CanonicalBlake2bBase64HashMixin(AbstractHashMixin):
+    """
+    Serializes the function name, source code, and arguments using :func:`.canonical_dumps`,
+    then calculates the BLAKE2b hash value of :data:`CANONICAL_BLAKE2B_DIGEST_SIZE` bytes,
+    and finally returns the base64 encoded digest.
+
+    .. inheritance-diagram:: CanonicalBlake2bBase64HashMixin
+    """
+
+    __hash_config__ = HashConfig(
+        algorithm="blake2b",
+        serializer=canonical_dumps,
+        updater=canonical_update,
+        decoder=base64_hash_digest,
+        digest_size=CANONICAL_BLAKE2B_DIGEST_SIZE,
+    )
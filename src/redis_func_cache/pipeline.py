@@ -0,0 +1,93 @@
+"""Run many Lua script calls in pipelines, one round trip per Redis client."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple, Union
+
+from redis.exceptions import NoScriptError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from redis.commands.core import AsyncScript, Script
+    from redis.typing import KeyT
+
+__all__ = ("run_script_calls", "arun_script_calls")
+
+ScriptCallT = Tuple["Script", Sequence["KeyT"], Tuple]
+AsyncScriptCallT = Tuple["AsyncScript", Sequence["KeyT"], Tuple]
+
+
+def _group_by_client(calls: Sequence[Union[ScriptCallT, AsyncScriptCallT]]) -> Dict[int, Tuple[Any, List[int]]]:
+    groups: Dict[int, Tuple[Any, List[int]]] = {}
+    for i, (script, _, _) in enumerate(calls):
+        client = script.registered_client
+        groups.setdefault(id(client), (client, []))[1].append(i)
+    return groups
+
+
+def _execute(client, calls: Sequence[ScriptCallT], indices: List[int]) -> List[Any]:
+    pipe = client.pipeline(transaction=False)
+    for i in indices:
+        script, keys, args = calls[i]
+        script(keys=keys, args=args, client=pipe)
+    return pipe.execute(raise_on_error=False)
+
+
+async def _aexecute(client, calls: Sequence[AsyncScriptCallT], indices: List[int]) -> List[Any]:
+    pipe = client.pipeline(transaction=False)
+    for i in indices:
+        script, keys, args = calls[i]
+        await script(keys=keys, args=args, client=pipe)
+    return await pipe.execute(raise_on_error=False)
+
+
+def _raise_first(results: List[Any]):
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+
+def run_script_calls(calls: Sequence[ScriptCallT], raise_on_error: bool = True) -> List[Any]:
+    """Run ``(script, keys, args)`` calls in non-transactional pipelines, one for each client the scripts are registered with.
+
+    With a cluster client, the pipeline itself groups the calls by the slot of their keys, and sends each group to the node serving it:
+    the commands are written to every node before any reply is read, or, with an asynchronous client, the nodes are sent their commands concurrently.
+    A cluster pipeline does not load the scripts, so the scripts missing on a node are loaded on every primary node,
+    and the calls which missed them are sent again, in a second pipeline.
+
+    Args:
+        calls: The script calls.
+        raise_on_error: Whether to raise the first error, otherwise errors are returned in place of the results.
+
+    Returns:
+        Results in the order of ``calls``.
+    """
+    results: List[Any] = [None] * len(calls)
+    for client, indices in _group_by_client(calls).values():
+        for i, result in zip(indices, _execute(client, calls, indices)):
+            results[i] = result
+        unloaded = [i for i in indices if isinstance(results[i], NoScriptError)]
+        if unloaded:
+            for script in {calls[i][0].sha: calls[i][0] for i in unloaded}.values():
+                client.script_load(script.script)
+            for i, result in zip(unloaded, _execute(client, calls, unloaded)):
+                results[i] = result
+    if raise_on_error:
+        _raise_first(results)
+    return results
+
+
+async def arun_script_calls(calls: Sequence[AsyncScriptCallT], raise_on_error: bool = True) -> List[Any]:
+    """Async version of :func:`run_script_calls`"""
+    results: List[Any] = [None] * len(calls)
+    for client, indices in _group_by_client(calls).values():
+        for i, result in zip(indices, await _aexecute(client, calls, indices)):
+            results[i] = result
+        unloaded = [i for i in indices if isinstance(results[i], NoScriptError)]
+        if unloaded:
+            for script in {calls[i][0].sha: calls[i][0] for i in unloaded}.values():
+                await client.script_load(script.script)
+            for i, result in zip(unloaded, await _aexecute(client, calls, unloaded)):
+                results[i] = result
+    if raise_on_error:
+        _raise_first(results)
+    return results
@@ -0,0 +1,142 @@
+"""Per-function call plan, computed once when a function is decorated."""
+
+from __future__ import annotations
+
+from inspect import Parameter, signature
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, Optional, Sequence, Tuple
+
+from .stats import CacheStats
+
+if TYPE_CHECKING:  # pragma: no cover
+    from hashlib import _Hash
+
+    from redis.commands.core import AsyncScript, Script
+    from redis.typing import EncodedT, KeyT
+
+    from .policies.abstract import AbstractPolicy
+
+__all__ = ("CallPlan", "make_args_normalizer")
+
+ArgsNormalizerT = Callable[[Sequence, Mapping[str, Any]], Tuple[Sequence, Mapping[str, Any]]]
+
+
+def make_args_normalizer(
+    function: Callable,
+    normalize: bool = False,
+    ignore: Optional[Iterable[str]] = None,
+    key: Optional[Callable[..., Any]] = None,
+) -> Optional[ArgsNormalizerT]:
+    """Make a function that turns the arguments of a call to ``function`` into those actually hashed.
+
+    Args:
+        function: The decorated function.
+
+        normalize: Bind the arguments to the signature of ``function``, with defaults applied,
+            so that equivalent calls such as ``f(1, 2)``, ``f(1, b=2)`` and ``f(a=1, b=2)`` have the same hash.
+            The signature is inspected only once, here.
+
+        ignore: Names of parameters excluded from the hash, e.g. loggers, database sessions or request objects.
+            It implies ``normalize``.
+
+        key: A function called with the same arguments as ``function``, whose return value is hashed instead of the arguments.
+            It can not be used with ``normalize`` or ``ignore``.
+
+    Returns:
+        :data:`None` if the arguments are hashed as they are.
+    """
+    if key is not None:
+        if normalize or ignore:
+            raise ValueError("key can not be used with normalize or ignore")
+        if not callable(key):
+            raise TypeError(f"key must be callable, but got {key!r}")
+
+        def key_normalizer(args: Sequence, kwds: Mapping[str, Any]) -> Tuple[Sequence, Mapping[str, Any]]:
+            return (key(*args, **kwds),), {}
+
+        return key_normalizer
+
+    ignored = frozenset([ignore] if isinstance(ignore, str) else ignore or ())
+    if not (normalize or ignored):
+        return None
+    sig = signature(function)
+    unknown = ignored.difference(sig.parameters)
+    if unknown:
+        raise ValueError(f"{function!r} has no parameter named {', '.join(sorted(unknown))}")
+
+    var_keyword = next((p.name for p in sig.parameters.values() if p.kind == Parameter.VAR_KEYWORD), None)
+
+    def normalizer(args: Sequence, kwds: Mapping[str, Any]) -> Tuple[Sequence, Mapping[str, Any]]:
+        bound = sig.bind(*args, **kwds)
+        bound.apply_defaults()
+        arguments = {k: v for k, v in bound.arguments.items() if k not in ignored}
+        if var_keyword in arguments:  # extra keyword arguments in any order are the same call
+            arguments[var_keyword] = dict(sorted(arguments[var_keyword].items()))
+        return (), arguments
+
+    return normalizer
+
+
+class CallPlan:
+    """Everything about calling a decorated function that does not depend on its arguments.
+
+    :meth:`.RedisFuncCache.decorate` builds a plan once for each decorated function, so that the hot path only has to hash the arguments:
+
+    - the Redis key pair, from :meth:`.AbstractPolicy.calc_keys`
+    - a hasher already fed with the function's name and source, from :meth:`.AbstractPolicy.seed_hash`, which is :meth:`copy`'d for each call
+    - the JSON encoded options passed to the Lua scripts
+    - the pair of Lua scripts, bound and validated on the first call, in :attr:`scripts` or :attr:`ascripts` for an asynchronous client
+      (not kept for a factory of asynchronous clients, whose scripts are bound in each event loop)
+    - the return value serializer and deserializer
+    - an optional normalizer of the arguments before hashing, from :func:`make_args_normalizer`
+    - the :class:`.CacheStats` counters of the function
+    - the decorated ``wrapper``, set by :meth:`.RedisFuncCache.decorate`
+    """
+
+    __slots__ = (
+        "function",
+        "policy",
+        "keys",
+        "hasher",
+        "encoded_options",
+        "scripts",
+        "ascripts",
+        "serialize",
+        "deserialize",
+        "normalize_args",
+        "stats",
+        "wrapper",
+    )
+
+    def __init__(
+        self,
+        function: Callable,
+        policy: AbstractPolicy,
+        encoded_options: bytes,
+        serialize: Callable[[Any], EncodedT],
+        deserialize: Callable[[EncodedT], Any],
+        normalize_args: Optional[ArgsNormalizerT] = None,
+        stats: Optional[CacheStats] = None,
+    ):
+        self.function = function
+        self.policy = policy
+        self.keys: Tuple[KeyT, KeyT] = policy.calc_keys(function)
+        self.hasher: Optional[_Hash] = policy.seed_hash(function)
+        self.encoded_options = encoded_options
+        self.scripts: Optional[Tuple[Script, Script]] = None
+        self.ascripts: Optional[Tuple[AsyncScript, AsyncScript]] = None
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.normalize_args = normalize_args
+        self.stats = CacheStats() if stats is None else stats
+        self.wrapper: Optional[Callable] = None
+
+    def calc_hash(self, args: Optional[Sequence] = None, kwds: Optional[Mapping[str, Any]] = None) -> KeyT:
+        """Calculate the hash of a call with the given arguments."""
+        if self.normalize_args is not None:
+            args, kwds = self.normalize_args(args or (), kwds or {})
+        if self.hasher is None:
+            return self.policy.calc_hash(self.function, args, kwds)
+        return self.policy.calc_hash_with_seed(self.hasher, args, kwds)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__qualname__} function={self.function!r} keys={self.keys!r}>"
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import weakref
 from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, Optional, Sequence, Tuple, TypeVar, Union
 
+import redis.commands.core
+
+from ..invalidation import apublish_invalidation, publish_invalidation
 from ..utils import read_lua_file
 
 if TYPE_CHECKING:  # pragma: no cover
+    from hashlib import _Hash
+
     from redis.commands.core import AsyncScript, Script
     from redis.typing import EncodableT, EncodedT, KeyT, ScriptTextT
 
@@ -31,6 +37,7 @@ class AbstractPolicy:
 
     - ``__key__``: A component of the Redis key pair used by this policy.
     - ``__scripts__``: A tuple containing two strings; the first string is the script for ``get``, and the second string is the script for ``put``.
+      Each is the name of a file in the ``lua`` directory of the package, to which ``prelude.lua`` is prepended (see :meth:`read_lua_scripts`).
 
     Whether to use it is determined by how :meth:`calc_keys` and :meth:`calc_hash` are implemented.
     """
@@ -45,6 +52,9 @@ class AbstractPolicy:
         """
         self._cache = cache
         self._lua_scripts: Union[None, Tuple[Script, Script], Tuple[AsyncScript, AsyncScript]] = None
+        self._alua_scripts: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[AsyncScript, AsyncScript]] = (
+            weakref.WeakKeyDictionary()
+        )
 
     @property
     def cache(self) -> RedisFuncCache:
@@ -69,6 +79,11 @@ class AbstractPolicy:
             - Subclasses **MUST** implement this method.
               This is because different caching strategies may require different key naming rules, so this method is designed to be overridden by subclasses.
 
+        .. note::
+            :class:`.RedisFuncCache` calls it only once for each decorated function, when building the :class:`.CallPlan`,
+            with ``args`` and ``kwds`` being :data:`None`.
+            So the key pair **SHOULD** depend on the function only.
+
         Args:
             f: The function for which the cache keys are being calculated.
             args: The positional arguments of the function.
@@ -102,6 +117,29 @@ class AbstractPolicy:
         """
         raise NotImplementedError()  # pragma: no cover
 
+    def seed_hash(self, f: Callable) -> Optional[_Hash]:
+        """Create a hash object already fed with everything of ``f`` that does not depend on its arguments.
+
+        :class:`.CallPlan` keeps the returned object, and passes it to :meth:`calc_hash_with_seed` on every call,
+        which avoids re-hashing the function's name and source code.
+
+        By default, it returns :data:`None`, meaning the policy does not support it and :meth:`calc_hash` is called instead.
+        """
+        return None
+
+    def calc_hash_with_seed(
+        self, seed: _Hash, args: Optional[Sequence] = None, kwds: Optional[Mapping[str, Any]] = None
+    ) -> KeyT:
+        """Calculate the hash of a call from a hash object returned by :meth:`seed_hash`.
+
+        Implementations **MUST NOT** modify ``seed``, but update a :meth:`copy` of it.
+
+        .. important::
+            - This method is not implemented in the base class.
+            - Subclasses whose :meth:`seed_hash` returns a hash object **MUST** implement this method.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
     def calc_ext_args(
         self, f: Optional[Callable] = None, args: Optional[Sequence] = None, kwds: Optional[Mapping[str, Any]] = None
     ) -> Optional[Iterable[EncodableT]]:
@@ -132,8 +170,12 @@ class AbstractPolicy:
         return None
 
     def read_lua_scripts(self) -> Tuple[ScriptTextT, ScriptTextT]:
-        """Read the Lua scripts from the package resources."""
-        return read_lua_file(self.__scripts__[0]), read_lua_file(self.__scripts__[1])
+        """Read the Lua scripts from the package resources.
+
+        The keys and helpers shared by the scripts of all the policies, in ``prelude.lua``, are prepended to both of them.
+        """
+        prelude = read_lua_file("prelude.lua")
+        return prelude + read_lua_file(self.__scripts__[0]), prelude + read_lua_file(self.__scripts__[1])
 
     @property
     def lua_scripts(self) -> Union[Tuple[Script, Script], Tuple[AsyncScript, AsyncScript]]:
@@ -141,18 +183,52 @@ class AbstractPolicy:
 
         - When :meth:`cache` property has a synchronous Redis client, it will return a pair of :class:`redis.commands.core.Script` objects.
         - When :meth:`cache` property has an asynchronous Redis client, it will return a pair of :class:`redis.commands.core.AsyncScript` objects.
+          They are registered with a client of each event loop, as the connections of an asynchronous client are bound to the loop they were made in,
+          which matters when the cache has a client factory.
         """
-        if self._lua_scripts is None:
-            script_texts = self.read_lua_scripts()
-            self._lua_scripts = (
-                self.cache.client.register_script(script_texts[0]),
-                self.cache.client.register_script(script_texts[1]),
-            )
-        return self._lua_scripts
+        if self._lua_scripts is not None:
+            return self._lua_scripts
+        try:
+            loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None and loop in self._alua_scripts:
+            return self._alua_scripts[loop]
+        client = self.cache.client
+        script_texts = self.read_lua_scripts()
+        scripts = client.register_script(script_texts[0]), client.register_script(script_texts[1])
+        if loop is not None and isinstance(scripts[0], redis.commands.core.AsyncScript):
+            self._alua_scripts[loop] = scripts
+        else:
+            self._lua_scripts = scripts
+        return scripts
+
+    def _invalidation_origin(self) -> str:
+        listener = self.cache.invalidation_listener
+        return "" if listener is None else listener.origin
+
+    def _after_purge(self, client, keys: Iterable[KeyT]):
+        local_cache = self.cache.local_cache
+        if local_cache is not None:
+            local_cache.clear()
+        channel = self.cache.invalidation_channel
+        if channel:
+            publish_invalidation(client, channel, self._invalidation_origin(), keys)
+
+    async def _aafter_purge(self, client, keys: Iterable[KeyT]):
+        local_cache = self.cache.local_cache
+        if local_cache is not None:
+            local_cache.clear()
+        channel = self.cache.invalidation_channel
+        if channel:
+            await apublish_invalidation(client, channel, self._invalidation_origin(), keys)
 
     def purge(self) -> int:
         """Purge the cache.
 
+        Implementations shall also drop the entries held in :attr:`.RedisFuncCache.local_cache`, if any,
+        and publish the deleted keys on :attr:`.RedisFuncCache.invalidation_channel`, if any.
+
         .. note::
             - This method is not implemented in the base class.
             - Subclasses can optionally implement this method.
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import hashlib
 import sys
-from typing import TYPE_CHECKING, Any, Callable, Mapping, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Any, Callable, List, Mapping, Optional, Sequence, Tuple
 from weakref import CallableProxyType
 
 if sys.version_info < (3, 12):  # pragma: no cover
@@ -18,7 +18,7 @@ import redis.client
 import redis.cluster
 
 from ..cache import RedisFuncCache
-from ..utils import base64_hash_digest, get_fullname, get_source
+from ..utils import base64_hash_digest, get_fullname, get_source, side_keys
 from .abstract import AbstractPolicy
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -65,7 +65,11 @@ class BaseSinglePolicy(AbstractPolicy):
             raise TypeError(
                 f"Expect type of the cache object's client is {_SYNCHRONOUS_CLIENT_TYPES}, but actual type is {type(client)}"
             )
-        return client.delete(*self.calc_keys())
+        keys = self.calc_keys()
+        n = client.delete(*keys)
+        client.delete(*side_keys(keys[1]))
+        self._after_purge(client, keys)
+        return n
 
     @override
     async def apurge(self) -> int:
@@ -74,7 +78,11 @@ class BaseSinglePolicy(AbstractPolicy):
             raise TypeError(
                 f"Expect type of the cache object's client is {_ASYNCHRONOUS_CLIENT_TYPES}, but actual type is {type(client)}"
             )
-        return await client.delete(*self.calc_keys())  # type: ignore[union-attr]
+        keys = self.calc_keys()
+        n = await client.delete(*keys)  # type: ignore[union-attr]
+        await client.delete(*side_keys(keys[1]))  # type: ignore[union-attr]
+        await self._aafter_purge(client, keys)
+        return n
 
     @override
     def size(self) -> int:
@@ -115,6 +123,20 @@ class BaseClusterSinglePolicy(BaseSinglePolicy):
         return self._keys
 
 
+def _split_side_keys(keys: Sequence[KeyT]) -> Tuple[List[KeyT], List[KeyT]]:
+    """Split the keys of a multiple policy into its key pairs and the :func:`.side_keys` or lease keys beside them.
+
+    A key pair is ``<...>:<fullname>#<checksum>:0`` and ``<...>:<fullname>#<checksum>:1``,
+    the base64 checksum has no ``:``, which every key beside the pair has after it.
+    """
+    pairs: List[KeyT] = []
+    others: List[KeyT] = []
+    for key in keys:
+        sep, mark = (b":", b"#") if isinstance(key, bytes) else (":", "#")
+        (pairs if key.partition(mark)[2].count(sep) == 1 else others).append(key)  # type: ignore[arg-type,union-attr]
+    return pairs, others
+
+
 class BaseMultiplePolicy(AbstractPolicy):
     """
     .. inheritance-diagram:: BaseMultiplePolicy
@@ -148,10 +170,12 @@ class BaseMultiplePolicy(AbstractPolicy):
             raise TypeError(
                 f"Expect type of the cache object's client is {redis.Redis}, but actual type is {type(client)}"
             )
-        keys = client.keys(pat)
-        if keys:
-            return client.delete(*keys)
-        return 0
+        keys, others = _split_side_keys(client.keys(pat))
+        n = client.delete(*keys) if keys else 0
+        if others:
+            client.delete(*others)
+        self._after_purge(client, keys)
+        return n
 
     @override
     async def apurge(self) -> int:
@@ -161,10 +185,12 @@ class BaseMultiplePolicy(AbstractPolicy):
             raise TypeError(
                 f"Expect type of the cache object's client is {redis.asyncio.Redis}, but actual type is {type(client)}"
             )
-        keys = await client.keys(pat)
-        if keys:
-            return await client.delete(*keys)
-        return 0
+        keys, others = _split_side_keys(await client.keys(pat))
+        n = await client.delete(*keys) if keys else 0
+        if others:
+            await client.delete(*others)
+        await self._aafter_purge(client, keys)
+        return n
 
 
 class BaseClusterMultiplePolicy(BaseMultiplePolicy):
@@ -0,0 +1,241 @@
+"""Registry of return value serializers, whose output is tagged with a one-byte header."""
+
+from __future__ import annotations
+
+import json
+import logging
+import pickle
+from functools import partial
+from struct import Struct
+from timeit import Timer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+__all__ = ("SERIALIZERS", "TaggedSerializer", "register_serializer", "fastest_serializer", "tagged_loads")
+
+_logger = logging.getLogger(__name__)
+
+DumpsT = Callable[[Any], Union[bytes, bytearray]]
+LoadsT = Callable[[memoryview], Any]
+
+
+def _json() -> Tuple[DumpsT, LoadsT]:
+    return (lambda value: json.dumps(value, ensure_ascii=False).encode()), (lambda data: json.loads(bytes(data)))
+
+
+def _pickle() -> Tuple[DumpsT, LoadsT]:
+    return (lambda value: pickle.dumps(value, protocol=5)), pickle.loads
+
+
+_BUFFERS_HEADER = Struct(">IQ")
+_BUFFER_ENTRY = Struct(">QQ")
+_BUFFER_ALIGNMENT = 64
+_OUT_OF_BAND_SIZE = 1 << 12
+
+
+class _OutOfBand:
+    """Pickle a :class:`bytes` or :class:`bytearray` return value out-of-band, as NumPy does for its arrays.
+
+    The pickler does not let exact :class:`bytes` and :class:`bytearray` be reduced otherwise.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Union[bytes, bytearray]):
+        self.data = data
+
+    def __reduce_ex__(self, protocol):
+        return type(self.data), (pickle.PickleBuffer(self.data),)
+
+
+def _dumps_buffers(value: Any, prefix: bytes = b"") -> bytearray:
+    if type(value) in (bytes, bytearray) and len(value) >= _OUT_OF_BAND_SIZE:
+        value = _OutOfBand(value)
+    buffers: List[pickle.PickleBuffer] = []
+    pickled = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    start = len(prefix)
+    pos = _BUFFERS_HEADER.size + _BUFFER_ENTRY.size * len(raws) + len(pickled)
+    offsets = []
+    for raw in raws:
+        pos += -(start + pos) % _BUFFER_ALIGNMENT  # aligned in the whole value, as read from Redis
+        offsets.append(pos)
+        pos += raw.nbytes
+    out = bytearray(start + pos)  # written in place, so that the buffers are copied only once
+    out[:start] = prefix
+    _BUFFERS_HEADER.pack_into(out, start, len(raws), len(pickled))
+    pos = start + _BUFFERS_HEADER.size
+    for raw, offset in zip(raws, offsets):
+        _BUFFER_ENTRY.pack_into(out, pos, offset, raw.nbytes)
+        pos += _BUFFER_ENTRY.size
+    with memoryview(out) as view:  # assigning to a slice of the bytearray itself would copy the buffers first
+        view[pos : pos + len(pickled)] = pickled
+        for raw, offset in zip(raws, offsets):
+            view[start + offset : start + offset + raw.nbytes] = raw
+            raw.release()
+    return out
+
+
+def _loads_buffers(data: memoryview) -> Any:
+    count, size = _BUFFERS_HEADER.unpack_from(data)
+    pos = _BUFFERS_HEADER.size
+    buffers = []
+    for _ in range(count):
+        offset, length = _BUFFER_ENTRY.unpack_from(data, pos)
+        buffers.append(data[offset : offset + length])
+        pos += _BUFFER_ENTRY.size
+    return pickle.loads(data[pos : pos + size], buffers=buffers)
+
+
+def _pickle_buffers() -> Tuple[DumpsT, LoadsT]:
+    return _dumps_buffers, _loads_buffers
+
+
+def _orjson() -> Tuple[DumpsT, LoadsT]:
+    import orjson  # type: ignore[import-not-found]
+
+    return orjson.dumps, orjson.loads
+
+
+def _msgpack() -> Tuple[DumpsT, LoadsT]:
+    import msgpack  # type: ignore[import-not-found]
+
+    return (lambda value: msgpack.packb(value, use_bin_type=True)), (lambda data: msgpack.unpackb(data, raw=False))
+
+
+SERIALIZERS: Dict[str, Tuple[int, Callable[[], Tuple[DumpsT, LoadsT]]]] = {
+    "json": (0x10, _json),
+    "pickle": (0x11, _pickle),
+    "orjson": (0x12, _orjson),
+    "msgpack": (0x13, _msgpack),
+    "pickle_buffers": (0x14, _pickle_buffers),
+}
+"""Serializers by name: the tag byte of their output, and a factory of their ``dumps`` and ``loads`` functions.
+
+``orjson`` requires the ``orjson`` package, and ``msgpack`` the ``msgpack`` package.
+``pickle`` uses protocol 5.
+
+``pickle_buffers`` also uses pickle protocol 5, but stores out-of-band buffers, such as the memory of NumPy arrays,
+or a large :class:`bytes` or :class:`bytearray` return value, raw and aligned after the pickle stream, instead of copying them into it.
+The buffers are copied once when writing. On a hit, NumPy arrays are rebuilt on the memory of the Redis response without copying,
+so they are **read-only**, and :class:`bytes` and :class:`bytearray` are copied once from it.
+"""
+
+_loaders: Dict[int, LoadsT] = {}
+
+
+def register_serializer(name: str, tag: int, dumps: DumpsT, loads: LoadsT):
+    """Register a serializer, so that it can be used by name, e.g. ``RedisFuncCache(..., serializer=name)``.
+
+    Args:
+        name: Name of the serializer.
+        tag: The byte its output is tagged with, from ``0x15`` to ``0x1f``.
+            It is stored with every value, so it **MUST NOT** change once used.
+        dumps: Serialize a return value to :class:`bytes`.
+        loads: Deserialize a :class:`memoryview` of the serialized bytes.
+    """
+    if not 0x15 <= tag <= 0x1F:
+        raise ValueError(f"tag must be from 0x15 to 0x1f, but got {tag!r}")
+    for other, (other_tag, _) in SERIALIZERS.items():
+        if other_tag == tag and other != name:
+            raise ValueError(f"tag {tag:#x} is already used by serializer {other!r}")
+    SERIALIZERS[name] = tag, lambda: (dumps, loads)
+    _loaders.pop(tag, None)
+
+
+def _get_loads(tag: int) -> Optional[LoadsT]:
+    try:
+        return _loaders[tag]
+    except KeyError:
+        pass
+    for t, factory in SERIALIZERS.values():
+        if t == tag:
+            _loaders[tag] = loads = factory()[1]
+            return loads
+    return None
+
+
+def tagged_loads(data: Union[bytes, bytearray, memoryview]) -> Any:
+    """Deserialize ``data`` with the serializer of its tag byte, or as JSON if it has no tag.
+
+    JSON text never starts with a tag byte, from ``0x10`` to ``0x1f``,
+    so values written by the default serializer, and by any :class:`TaggedSerializer`, can be read by each other.
+    """
+    tagged = isinstance(data, (bytes, bytearray, memoryview)) and data and 0x10 <= data[0] <= 0x1F
+    loads = _get_loads(data[0]) if tagged else None
+    if loads is None:
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+    with memoryview(data) as view:
+        return loads(view[1:])
+
+
+class TaggedSerializer:
+    """Serialize return values with a serializer of :data:`SERIALIZERS`, prefixing them with its tag byte.
+
+    Values are deserialized by the serializer their own tag tells, whatever the serializer used for writing,
+    so the serializer can be changed without purging. Values without a tag, written by the default serializer, are deserialized as JSON.
+    """
+
+    def __init__(self, name: str = "json"):
+        """
+        Args:
+            name: Name of the serializer in :data:`SERIALIZERS`.
+
+        Raises:
+            ValueError: If the serializer is unknown.
+            ImportError: If the package of the serializer is not installed.
+        """
+        try:
+            tag, factory = SERIALIZERS[name]
+        except KeyError:
+            raise ValueError(f"Unknown serializer {name!r}, expected one of {', '.join(SERIALIZERS)}") from None
+        self._name = name
+        self._tag = bytes([tag])
+        self._dumps, _loaders[tag] = factory()
+        if self._dumps is _dumps_buffers:  # the tag is written in place too
+            self.dumps = partial(_dumps_buffers, prefix=self._tag)  # type: ignore[method-assign]
+
+    @property
+    def name(self) -> str:
+        """Name of the serializer values are written with."""
+        return self._name
+
+    def dumps(self, value: Any) -> Union[bytes, bytearray]:
+        """Serialize ``value``, prefixed with the tag byte."""
+        return self._tag + self._dumps(value)
+
+    loads = staticmethod(tagged_loads)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__qualname__} name={self._name!r}>"
+
+
+def _round_trip(dumps: DumpsT, loads: LoadsT, value: Any) -> Any:
+    return loads(memoryview(dumps(value)))
+
+
+def fastest_serializer(sample: Any, names: Optional[Iterable[str]] = None) -> str:
+    """Measure serializers on a sample return value, and return the name of the fastest.
+
+    Each serializer of ``names`` (all of :data:`SERIALIZERS` by default) is timed for a ``dumps`` and ``loads`` round trip of ``sample``.
+    Serializers whose package is not installed, which fail on ``sample``, or do not give an equal value back, are skipped and logged.
+
+    Example::
+
+        cache = RedisFuncCache(__name__, LruTPolicy, redis_client, serializer=fastest_serializer(sample))
+    """
+    best: Optional[Tuple[float, str]] = None
+    for name in SERIALIZERS if names is None else names:
+        try:
+            dumps, loads = SERIALIZERS[name][1]()
+            if _round_trip(dumps, loads, sample) != sample:
+                _logger.info("Skip the %s serializer, it does not round trip the sample", name)
+                continue
+        except (ImportError, TypeError, ValueError) as err:
+            _logger.info("Skip the %s serializer: %r", name, err)
+            continue
+        number, elapsed = Timer(partial(_round_trip, dumps, loads, sample)).autorange()
+        if best is None or elapsed / number < best[0]:
+            best = elapsed / number, name
+    if best is None:
+        raise ValueError(f"No serializer round trips {sample!r}")
+    return best[1]
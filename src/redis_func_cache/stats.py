@@ -0,0 +1,149 @@
+"""Counters of hits, misses, puts and evictions, and their Prometheus text exposition."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterable, List, NamedTuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .cache import RedisFuncCache
+
+__all__ = ("CacheInfo", "CacheStats", "prometheus_text")
+
+
+class CacheInfo(NamedTuple):
+    """Snapshot of the counters of a :class:`CacheStats`, or the sum of several of them."""
+
+    hits: int = 0
+    """Calls whose return value was found, in :class:`.LocalCache` or in Redis, including stale values."""
+    misses: int = 0
+    """Calls whose return value was not found, so the function was run."""
+    local_hits: int = 0
+    """Part of :attr:`hits` found in :class:`.LocalCache`, without any round trip."""
+    puts: int = 0
+    """Return values stored by the put Lua scripts, including background refreshes."""
+    evictions: int = 0
+    """Entries evicted by the put Lua scripts to keep the cache within its ``maxsize``."""
+    bytes_read: int = 0
+    """Total size of the serialized return values read from Redis."""
+    bytes_written: int = 0
+    """Total size of the serialized return values put to Redis."""
+
+    @property
+    def hit_ratio(self) -> float:
+        """``hits / (hits + misses)``, or ``0.0`` before any call."""
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    @classmethod
+    def total(cls, infos: Iterable[CacheInfo]) -> CacheInfo:
+        """Add up ``infos`` field by field."""
+        return cls(*(sum(values) for values in zip(cls(), *infos)))
+
+
+class CacheStats:
+    """Counters of the calls of a decorated function, updated by :class:`.RedisFuncCache` on the hot path.
+
+    Every :class:`.CallPlan` has one, shared by the plans of functions with the same full name.
+    Read them with :meth:`info`, the decorated function's ``cache_info()``, or :meth:`.RedisFuncCache.stats`.
+
+    Counters are plain integers, updated without a lock to keep the overhead to a few attribute increments per call.
+    Under heavy contention from many threads, a few increments may be lost, which does not matter for ratios and rates.
+    """
+
+    __slots__ = ("hits", "misses", "local_hits", "puts", "evictions", "bytes_read", "bytes_written")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Set all counters to zero."""
+        self.hits = 0
+        self.misses = 0
+        self.local_hits = 0
+        self.puts = 0
+        self.evictions = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def record_hit(self, nbytes: int):
+        """Count a hit of a serialized value of ``nbytes`` bytes read from Redis."""
+        self.hits += 1
+        self.bytes_read += nbytes
+
+    def record_local_hit(self):
+        """Count a hit in :class:`.LocalCache`."""
+        self.hits += 1
+        self.local_hits += 1
+
+    def record_miss(self, count: int = 1):
+        """Count ``count`` misses."""
+        self.misses += count
+
+    def record_put(self, nbytes: int, evicted: Any = 0):
+        """Count a put of a serialized value of ``nbytes`` bytes, whose put Lua script returned ``evicted``.
+
+        The put scripts return the number of evicted entries, any other result (e.g. an error) is not counted as evictions.
+        """
+        self.puts += 1
+        self.bytes_written += nbytes
+        if isinstance(evicted, int):
+            self.evictions += evicted
+
+    def info(self) -> CacheInfo:
+        """Snapshot of the counters."""
+        return CacheInfo(
+            self.hits,
+            self.misses,
+            self.local_hits,
+            self.puts,
+            self.evictions,
+            self.bytes_read,
+            self.bytes_written,
+        )
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__qualname__} {self.info()!r}>"
+
+
+_METRICS = (
+    ("hits", "Calls whose return value was found in the cache."),
+    ("misses", "Calls whose return value was not found in the cache."),
+    ("local_hits", "Hits served by the in-process local cache tier."),
+    ("puts", "Return values put to Redis."),
+    ("evictions", "Entries evicted to keep the cache within its maxsize."),
+    ("bytes_read", "Bytes of serialized return values read from Redis."),
+    ("bytes_written", "Bytes of serialized return values put to Redis."),
+)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def prometheus_text(*caches: RedisFuncCache, namespace: str = "redis_func_cache") -> str:
+    """Render the counters of every function of ``caches`` in the Prometheus text exposition format.
+
+    Each counter is a ``<namespace>_<counter>_total`` metric, labelled with the ``cache`` name and the ``function`` full name.
+    Serve it from the HTTP endpoint scraped by Prometheus, e.g. with :mod:`http.server`::
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = prometheus_text(cache).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.end_headers()
+                self.wfile.write(body)
+    """
+    samples = [
+        (_escape_label(cache.name), _escape_label(function), info)
+        for cache in caches
+        for function, info in sorted(cache.function_stats().items())
+    ]
+    lines: List[str] = []
+    for i, (counter, help_text) in enumerate(_METRICS):
+        metric = f"{namespace}_{counter}_total"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for cache_name, function, info in samples:
+            lines.append(f'{metric}{{cache="{cache_name}",function="{function}"}} {info[i]}')
+    return "\n".join(lines) + "\n"
@@ -3,7 +3,7 @@ from __future__ import annotations
 import sys
 from base64 import b64encode
 from inspect import getsource
-from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, Union
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, TypeVar, Union
 
 if sys.version_info < (3, 9):  # pragma: no cover
     import importlib_resources
@@ -13,7 +13,9 @@ else:  # pragma: no cover
 if TYPE_CHECKING:  # pragma: no cover
     from hashlib import _Hash
 
-__all__ = ["get_fullname", "get_source", "read_lua_file", "base64_hash_digest"]
+    from redis.typing import KeyT
+
+__all__ = ["get_fullname", "get_source", "read_lua_file", "base64_hash_digest", "side_keys", "lease_key", "script_keys"]
 
 
 def get_fullname(f: Callable) -> str:
@@ -80,3 +82,30 @@ def base64_hash_digest(x: _Hash) -> bytes:
     It is useful when you need to represent a hash value in a compact and readable format.
     """
     return b64encode(x.digest()).rstrip(b"=")
+
+
+def _to_bytes(key: KeyT) -> bytes:
+    return key.encode() if isinstance(key, str) else bytes(key)  # type: ignore[arg-type]
+
+
+def side_keys(hmap_key: KeyT) -> Tuple[bytes, bytes, bytes]:
+    """Names of the keys beside the hash map ``hmap_key``: its expiry scores, chunks and deduplicated values.
+
+    They are ``<hmap_key>:expiry``, ``<hmap_key>:chunks`` and ``<hmap_key>:blobs``,
+    so they have the same hash tag as ``hmap_key``, and are in the same slot of a Redis Cluster.
+    """
+    key = _to_bytes(hmap_key)
+    return key + b":expiry", key + b":chunks", key + b":blobs"
+
+
+def lease_key(hmap_key: KeyT, hash: KeyT) -> bytes:
+    """Name of the compute lease key of ``hash``, ``<hmap_key>:lease:<hash>``."""
+    return _to_bytes(hmap_key) + b":lease:" + _to_bytes(hash)
+
+
+def script_keys(key_pair: Tuple[KeyT, KeyT], hash: KeyT) -> Tuple[KeyT, ...]:
+    """``KEYS`` of a call of the get and put Lua scripts for ``hash``: the key pair, its :func:`side_keys` and its :func:`lease_key`.
+
+    The scripts only access the keys they are given, as required by Redis Cluster.
+    """
+    return (*key_pair, *side_keys(key_pair[1]), lease_key(key_pair[1], hash))
@@ -0,0 +1,331 @@
+"""Write-behind of the puts after cache misses, in a background thread or task."""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import logging
+from functools import partial
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .chunking import adelete_chunks, awrite_chunks, delete_chunks, write_chunks
+from .constants import DEFAULT_WRITE_BEHIND_BATCH_SIZE, DEFAULT_WRITE_BEHIND_MAXSIZE
+from .pipeline import arun_script_calls, run_script_calls
+
+if TYPE_CHECKING:  # pragma: no cover
+    from redis.commands.core import AsyncScript, Script
+    from redis.typing import KeyT
+
+    from .chunking import ChunksT
+
+__all__ = ("WriteBehind",)
+
+_STOP = object()
+
+_logger = logging.getLogger(__name__)
+
+# the script call, the callback of its result, and the (key, chunks, ttl) of a chunked value to write before it
+_QueuedT = Tuple[Tuple[Any, Sequence[Any], Tuple], Optional[Callable[[Any], Any]], Optional[Tuple[Any, Any, int]]]
+
+
+class WriteBehind:
+    """A bounded queue of put script calls, written to Redis in the background.
+
+    When a :class:`.RedisFuncCache` is created with a ``write_behind``, a call missing the cache returns the user function's value
+    as soon as it is serialized, and the put is queued here instead of waiting for its round trip.
+    A daemon thread (synchronous client) or a task of each event loop (asynchronous client) takes the queued puts,
+    and writes all those available, up to :attr:`batch_size`, in a single pipeline.
+
+    When the queue is full, :meth:`submit` either blocks until there is room, or drops the put, according to :attr:`block`.
+    A dropped put only means a later call will miss the cache again.
+
+    The chunks of a value larger than :attr:`.StorageConfig.chunk_size` are queued with its put, and written just before it,
+    so that nothing is left of a dropped put, and they are deleted if the put fails.
+
+    Call :meth:`.RedisFuncCache.close` (or :meth:`close`) to write the pending puts and stop the thread,
+    it is also called when the interpreter exits. With an asynchronous client, call :meth:`.RedisFuncCache.aclose` (or :meth:`aclose`)
+    before the event loop is closed.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        block: bool = True,
+        batch_size: Optional[int] = None,
+        on_error: Optional[Callable[[BaseException], Any]] = None,
+    ):
+        """
+        Args:
+            maxsize: Maximum number of queued puts.
+
+                If not provided, the default is :data:`.DEFAULT_WRITE_BEHIND_MAXSIZE`.
+                Zero or negative values means no limit.
+
+            block: What to do when the queue is full: wait for room if :data:`True`, otherwise drop the put.
+
+            batch_size: Maximum number of puts written in one pipeline.
+
+                If not provided, the default is :data:`.DEFAULT_WRITE_BEHIND_BATCH_SIZE`.
+
+            on_error: Optional callback receiving the errors of the background writes.
+
+                There is no caller left to raise them to, so they are otherwise only counted in :attr:`errors`.
+                An exception raised by the callback itself is logged, and does not stop the background writes.
+        """
+        self._maxsize = DEFAULT_WRITE_BEHIND_MAXSIZE if maxsize is None else int(maxsize)
+        self._block = bool(block)
+        self._batch_size = DEFAULT_WRITE_BEHIND_BATCH_SIZE if batch_size is None else int(batch_size)
+        if self._batch_size < 1:
+            raise ValueError(f"batch_size must be positive, but got {batch_size!r}")
+        self._on_error = on_error
+        self._queue: Queue = Queue(max(0, self._maxsize))
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+        self._aqueues: Dict[asyncio.AbstractEventLoop, asyncio.Queue] = {}
+        self._atasks: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+        self._dropped = 0
+        self._errors = 0
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum number of queued puts."""
+        return self._maxsize
+
+    @property
+    def block(self) -> bool:
+        """Whether :meth:`submit` waits for room when the queue is full, otherwise the put is dropped."""
+        return self._block
+
+    @property
+    def batch_size(self) -> int:
+        """Maximum number of puts written in one pipeline."""
+        return self._batch_size
+
+    @property
+    def dropped(self) -> int:
+        """Number of puts dropped because the queue was full."""
+        return self._dropped
+
+    @property
+    def errors(self) -> int:
+        """Number of puts failed in the background."""
+        return self._errors
+
+    def _handle_results(self, batch: List[_QueuedT], results: List[Any]):
+        for (_, callback, _), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                self._errors += 1
+                callback = self._on_error
+            if callback is None:
+                continue
+            try:
+                callback(result)
+            except Exception:
+                _logger.exception("%r failed in the write-behind of %r", callback, self)
+
+    def submit(
+        self,
+        script: Script,
+        keys: Sequence[KeyT],
+        args: Tuple,
+        callback: Optional[Callable[[Any], Any]] = None,
+        chunks: Optional[Tuple[KeyT, ChunksT, int]] = None,
+    ) -> bool:
+        """Queue running ``script`` with ``keys`` and ``args``, starting the background thread if needed.
+
+        ``callback``, if provided, is called with the result of the script once it is written, from the background thread.
+
+        ``chunks``, if provided, are the ``(key, chunks, ttl)`` arguments of :func:`.write_chunks` for the chunked value put by the script.
+        They are written before the script runs, which is skipped if they could not be, and deleted if the script fails.
+
+        Returns:
+            Whether the put was queued, :data:`False` if it was dropped.
+        """
+        if self._thread is None:
+            self._start()
+        call = (script, keys, args), callback, chunks
+        if self._block:
+            self._queue.put(call)
+            return True
+        try:
+            self._queue.put_nowait(call)
+        except Full:
+            self._dropped += 1
+            return False
+        return True
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._work, name=f"{type(self).__name__}-{id(self):x}", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _work(self):
+        queue = self._queue
+        while True:
+            batch = [queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except Empty:
+                    break
+            calls = [call for call in batch if call is not _STOP]
+            try:
+                if calls:
+                    self._handle_results(calls, self._write(calls))
+            except Exception as err:
+                self._handle_results(calls, [err] * len(calls))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+            if len(calls) < len(batch):
+                return
+
+    @staticmethod
+    def _write(calls: List[_QueuedT]) -> List[Any]:
+        """Write the chunks of the queued calls, then run the calls in pipelines.
+
+        Returns:
+            Results or errors in the order of ``calls``.
+        """
+        results: List[Any] = [None] * len(calls)
+        ready = []
+        for i, ((script, _, _), _, chunks) in enumerate(calls):
+            try:
+                if chunks is not None:
+                    write_chunks(script.registered_client, *chunks)
+            except Exception as err:
+                results[i] = err
+            else:
+                ready.append(i)
+        for i, result in zip(ready, run_script_calls([calls[i][0] for i in ready], raise_on_error=False)):
+            results[i] = result
+            (script, _, _), _, chunks = calls[i]
+            if chunks is not None and isinstance(result, Exception):
+                try:
+                    delete_chunks(script.registered_client, *chunks[:2])
+                except Exception:
+                    _logger.exception("Failed to delete the chunks of a failed put, in the write-behind")
+        return results
+
+    @staticmethod
+    async def _awrite(calls: List[_QueuedT]) -> List[Any]:
+        """Async version of :meth:`_write`"""
+        results: List[Any] = [None] * len(calls)
+        ready = []
+        for i, ((script, _, _), _, chunks) in enumerate(calls):
+            try:
+                if chunks is not None:
+                    await awrite_chunks(script.registered_client, *chunks)
+            except Exception as err:
+                results[i] = err
+            else:
+                ready.append(i)
+        for i, result in zip(ready, await arun_script_calls([calls[i][0] for i in ready], raise_on_error=False)):
+            results[i] = result
+            (script, _, _), _, chunks = calls[i]
+            if chunks is not None and isinstance(result, Exception):
+                try:
+                    await adelete_chunks(script.registered_client, *chunks[:2])
+                except Exception:
+                    _logger.exception("Failed to delete the chunks of a failed put, in the write-behind")
+        return results
+
+    def flush(self):
+        """Block until every put queued by :meth:`submit` is written."""
+        if self._queue.unfinished_tasks:
+            if self._thread is None:
+                self._start()
+            self._queue.join()
+
+    def close(self):
+        """Write the pending puts and stop the background thread started by :meth:`submit`.
+
+        It is restarted by the next :meth:`submit`.
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            thread.join()
+            self._thread = None
+            atexit.unregister(self.close)
+
+    async def asubmit(
+        self,
+        script: AsyncScript,
+        keys: Sequence[KeyT],
+        args: Tuple,
+        callback: Optional[Callable[[Any], Any]] = None,
+        chunks: Optional[Tuple[KeyT, ChunksT, int]] = None,
+    ) -> bool:
+        """Async version of :meth:`submit`, the puts are written by a task of the running event loop."""
+        loop = asyncio.get_running_loop()
+        queue = self._aqueues.get(loop)
+        if queue is None:
+            for closed in [other for other in self._aqueues if other.is_closed()]:
+                del self._aqueues[closed]
+                self._atasks.pop(closed, None)
+            queue = self._aqueues[loop] = asyncio.Queue(max(0, self._maxsize))
+            task = self._atasks[loop] = loop.create_task(self._awork(queue))
+            task.add_done_callback(partial(self._forget, loop))
+        call = (script, keys, args), callback, chunks
+        if self._block:
+            await queue.put(call)
+            return True
+        try:
+            queue.put_nowait(call)
+        except asyncio.QueueFull:
+            self._dropped += 1
+            return False
+        return True
+
+    def _forget(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task):
+        """Drop the queue of ``loop`` once its task is done, e.g. cancelled when the loop is shut down."""
+        if self._atasks.get(loop) is task:
+            del self._atasks[loop]
+            self._aqueues.pop(loop, None)
+
+    async def _awork(self, queue: asyncio.Queue):
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                self._handle_results(batch, await self._awrite(batch))
+            except Exception as err:
+                self._handle_results(batch, [err] * len(batch))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def aflush(self):
+        """Wait until every put queued by :meth:`asubmit` in the running event loop is written."""
+        queue = self._aqueues.get(asyncio.get_running_loop())
+        if queue is not None:
+            await queue.join()
+
+    async def aclose(self):
+        """Write the pending puts and cancel the task started by :meth:`asubmit` in the running event loop."""
+        loop = asyncio.get_running_loop()
+        queue = self._aqueues.get(loop)
+        if queue is None:
+            return
+        await queue.join()
+        self._aqueues.pop(loop, None)
+        task = self._atasks.pop(loop, None)
+        if task is None:  # already done
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,58 @@
+from functools import wraps
+from inspect import iscoroutinefunction
+from os import getenv
+from threading import Lock
+
+import redis.asyncio
+from redis import Redis
+
+REDIS_URL = getenv("REDIS_URL", "redis://")
+
+
+def redis_factory() -> Redis:
+    return Redis.from_url(REDIS_URL)
+
+
+def async_redis_factory() -> redis.asyncio.Redis:
+    return redis.asyncio.Redis.from_url(REDIS_URL)
+
+
+class Calls(list):
+    """Arguments of the calls of a function decorated by :meth:`record`, i.e. of the calls which computed a value.
+
+    A call with one positional argument is recorded as that argument, others as the tuple of their positional arguments.
+    Decorate the function with :meth:`record` under the cache, so that the cache sees the name and source of the function::
+
+        calls = Calls()
+
+
+        @cache
+        @calls.record
+        def echo(x):
+            return x
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = Lock()
+
+    def _append(self, args):
+        with self._lock:
+            self.append(args[0] if len(args) == 1 else args)
+
+    def record(self, function):
+        if iscoroutinefunction(function):
+
+            @wraps(function)
+            async def awrapper(*args, **kwds):
+                self._append(args)
+                return await function(*args, **kwds)
+
+            return awrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwds):
+            self._append(args)
+            return function(*args, **kwds)
+
+        return wrapper
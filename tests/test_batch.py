@@ -0,0 +1,142 @@
+import asyncio
+from time import monotonic
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from redis_func_cache import Deferred, LeaseConfig, LfuPolicy, LruPolicy, LruTMultiplePolicy, RedisFuncCache
+from redis_func_cache import batch as batch_module
+
+from .conftest import async_redis_factory, redis_factory
+
+CLIENT = redis_factory()
+
+
+class BatchTest(TestCase):
+    def setUp(self):
+        # caches with different policies and key pairs, sharing one client
+        self.caches = [
+            RedisFuncCache(__name__, policy, client=CLIENT) for policy in (LruPolicy, LfuPolicy, LruTMultiplePolicy)
+        ]
+        for cache in self.caches:
+            cache.policy.purge()
+
+    def test_deferred(self):
+        cache_a, cache_b, cache_c = self.caches
+        calls = []
+
+        @cache_a
+        def inc(x):
+            calls.append(("inc", x))
+            return x + 1
+
+        @cache_b
+        def dec(x):
+            calls.append(("dec", x))
+            return x - 1
+
+        @cache_c
+        def fail(x):
+            raise ValueError(x)
+
+        self.assertEqual(2, inc(1))
+        with patch.object(batch_module, "run_script_calls", wraps=batch_module.run_script_calls) as mock_run:
+            with cache_a.batch() as batch:
+                a, b, c, d = inc(1), dec(1), inc(2), fail(0)
+                self.assertIsInstance(a, Deferred)
+                self.assertFalse(a.done())
+                self.assertEqual(4, len(batch))
+            self.assertEqual(2, mock_run.call_count)  # one pipeline for the gets, one for the puts
+        self.assertListEqual([2, 0, 3], [a.result(), b.result(), c.result()])
+        with self.assertRaises(ValueError):
+            d.result()
+        self.assertListEqual([("inc", 1), ("dec", 1), ("inc", 2)], calls)
+
+        with cache_b.batch():
+            a, b = inc(1), dec(1)
+        self.assertListEqual([2, 0], [a.result(), b.result()])
+        self.assertEqual(3, len(calls))
+
+    def test_first_access(self):
+        cache = self.caches[0]
+
+        @cache
+        def inc(x):
+            return x + 1
+
+        with cache.batch() as batch:
+            a = inc(1)
+            self.assertEqual(2, a.result())
+            b = inc(2)
+            self.assertEqual(1, len(batch))
+        self.assertEqual(3, b.result())
+
+    def test_aborted(self):
+        cache = self.caches[0]
+
+        @cache
+        def inc(x):
+            return x + 1
+
+        with self.assertRaises(KeyError):
+            with cache.batch():
+                a = inc(1)
+                raise KeyError()
+        with self.assertRaises(RuntimeError):
+            a.result()
+
+    def test_duplicates(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=CLIENT, lease=LeaseConfig(5))
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def inc(x):
+            calls.append(x)
+            return x + 1
+
+        started = monotonic()
+        with cache.batch() as batch:
+            a, b, c = inc(1), inc(2), inc(1)
+            self.assertEqual(3, len(batch))
+        self.assertLess(monotonic() - started, 1)  # the duplicate does not wait for the lease of the first call
+        self.assertListEqual([2, 3, 2], [a.result(), b.result(), c.result()])
+        self.assertListEqual([1, 2], calls)
+
+
+class AsyncBatchTest(IsolatedAsyncioTestCase):
+    async def test_deferred(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory())
+        await cache.policy.apurge()
+        calls = []
+
+        @cache
+        async def inc(x):
+            calls.append(x)
+            await asyncio.sleep(0)
+            return x + 1
+
+        async with cache.batch():
+            a = await inc(1)
+            b = await inc(2)
+            self.assertIsInstance(a, Deferred)
+            self.assertEqual(2, await a)
+            c = await inc(1)
+        self.assertListEqual([2, 3, 2], [a.result(), b.result(), await c])
+        self.assertListEqual([1, 2], calls)
+
+    async def test_duplicates(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory(), lease=LeaseConfig(5))
+        await cache.policy.apurge()
+        calls = []
+
+        @cache
+        async def inc(x):
+            calls.append(x)
+            return x + 1
+
+        started = monotonic()
+        async with cache.batch():
+            a, b = await inc(1), await inc(1)
+        self.assertLess(monotonic() - started, 1)
+        self.assertListEqual([2, 2], [await a, await b])
+        self.assertListEqual([1], calls)
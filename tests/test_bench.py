@@ -0,0 +1,72 @@
+from collections import Counter
+from os import getenv
+from unittest import TestCase
+
+from redis_func_cache.bench import POLICIES, KeySampler, LoadConfig, run_load
+
+REDIS_URL = getenv("REDIS_URL", "redis://")
+
+
+class KeySamplerTest(TestCase):
+    def test_scan(self):
+        sampler = KeySampler("scan", 5, offset=3)
+        self.assertListEqual([sampler() for _ in range(7)], [3, 4, 0, 1, 2, 3, 4])
+
+    def test_uniform(self):
+        sampler = KeySampler("uniform", 10, seed=0)
+        keys = [sampler() for _ in range(1000)]
+        self.assertTrue(all(0 <= k < 10 for k in keys))
+        self.assertEqual(len(set(keys)), 10)
+
+    def test_zipf(self):
+        sampler = KeySampler("zipf", 100, zipf_s=1.2, seed=0)
+        counts = Counter(sampler() for _ in range(10_000))
+        self.assertTrue(all(0 <= k < 100 for k in counts))
+        self.assertGreater(counts[0], counts[1])
+        self.assertGreater(counts[1], counts[10])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            KeySampler("gauss", 10)
+        with self.assertRaises(ValueError):
+            KeySampler("uniform", 0)
+
+
+class RunLoadTest(TestCase):
+    def check_result(self, config: LoadConfig):
+        result = run_load(config)
+        self.assertEqual(result.policy, config.policy)
+        self.assertGreater(result.calls, 0)
+        self.assertGreater(result.throughput, 0)
+        self.assertGreater(result.hit_ratio, 0)
+        self.assertLess(result.hit_ratio, 1)
+        self.assertIsNotNone(result.miss_latency["p50"])
+        p50, p999 = result.hit_latency["p50"], result.hit_latency["p999"]
+        if p50 is None or p999 is None:
+            self.fail(f"missing hit latencies: {result.hit_latency!r}")
+        self.assertLessEqual(p50, p999)
+        if result.commands_per_call is not None:
+            self.assertGreaterEqual(result.commands_per_call, 1)
+
+    def test_threads(self):
+        for policy in POLICIES:
+            config = LoadConfig(policy, REDIS_URL, "threads", concurrency=2, duration=0.2, keys=50, maxsize=20, seed=0)
+            with self.subTest(policy=policy):
+                self.check_result(config)
+
+    def test_asyncio(self):
+        config = LoadConfig("lru_t", REDIS_URL, "asyncio", concurrency=4, duration=0.2, keys=50, maxsize=20, seed=0)
+        self.check_result(config)
+
+    def test_scan_misses_lru(self):
+        config = LoadConfig(
+            "lru", REDIS_URL, "threads", concurrency=1, duration=0.2, distribution="scan", keys=50, maxsize=20
+        )
+        result = run_load(config)
+        self.assertEqual(result.hit_ratio, 0)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            run_load(LoadConfig("arc", REDIS_URL))
+        with self.assertRaises(ValueError):
+            run_load(LoadConfig("lru", REDIS_URL, "fibers"))
@@ -0,0 +1,49 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from redis import Redis
+
+from redis_func_cache import LruTMultiplePolicy, LruTPolicy, RedisFuncCache
+from redis_func_cache.mixins import hash as hash_mixins
+from redis_func_cache.policies.base import BaseSinglePolicy
+
+HASH_MIXINS = [getattr(hash_mixins, name) for name in hash_mixins.__all__ if name != "AbstractHashMixin"]
+
+
+def _echo(x, y=None):
+    return x
+
+
+class CallPlanTest(TestCase):
+    def test_hash_equals_policy_hash(self):
+        for mixin in HASH_MIXINS:
+            policy_type = type(f"{mixin.__name__}Policy", (mixin, BaseSinglePolicy), {"__key__": mixin.__name__})
+            cache = RedisFuncCache(__name__, policy_type, client=Redis())
+            plan = cache.make_plan(_echo)
+            for args, kwds in [((1,), {}), (("a",), {"y": 2}), ((), {"x": [1, 2]})]:
+                self.assertEqual(plan.calc_hash(args, kwds), cache.policy.calc_hash(_echo, args, kwds))
+
+    def test_computed_once(self):
+        for policy in (LruTPolicy, LruTMultiplePolicy):
+            cache = RedisFuncCache(__name__, policy, client=Redis())
+            echo = cache(_echo)
+            plan = echo.__call_plan__
+            self.assertEqual(plan.keys, cache.policy.calc_keys(_echo))
+            with patch.object(cache, "get", return_value=cache.serialize_return_value(1)):
+                with patch.object(cache.policy, "calc_keys") as mock_calc_keys:
+                    with patch("redis_func_cache.mixins.hash.get_source") as mock_get_source:
+                        self.assertEqual(1, echo(1))
+                        mock_calc_keys.assert_not_called()
+                        mock_get_source.assert_not_called()
+
+    def test_overridden_calc_hash(self):
+        class MyPolicy(LruTPolicy):
+            __key__ = "my-policy"
+
+            def calc_hash(self, f=None, args=None, kwds=None):
+                return b"constant"
+
+        cache = RedisFuncCache(__name__, MyPolicy, client=Redis())
+        plan = cache.make_plan(_echo)
+        self.assertIsNone(plan.hasher)
+        self.assertEqual(b"constant", plan.calc_hash((1,), {}))
@@ -0,0 +1,114 @@
+import hashlib
+import tracemalloc
+from array import array
+from dataclasses import dataclass
+from decimal import Decimal
+from unittest import TestCase
+
+from redis import Redis
+
+from redis_func_cache import LruTPolicy, RedisFuncCache
+from redis_func_cache.canonical import canonical_dumps, canonical_update
+from redis_func_cache.mixins.hash import CanonicalBlake2bHashMixin, CanonicalMd5HexHashMixin
+
+
+@dataclass
+class Point:
+    x: float
+    y: float
+
+
+def _echo(a=None, b=None):
+    return a
+
+
+class CanonicalDumpsTest(TestCase):
+    def test_equal_values(self):
+        self.assertEqual(canonical_dumps({"a": 1, "b": 2}), canonical_dumps({"b": 2, "a": 1}))
+        self.assertEqual(canonical_dumps({3, 1, 2}), canonical_dumps(frozenset([2, 3, 1])))
+        self.assertEqual(canonical_dumps(1), canonical_dumps(1.0))
+        self.assertEqual(canonical_dumps(0), canonical_dumps(-0.0))
+        self.assertEqual(canonical_dumps(float("nan")), canonical_dumps(float("-nan")))
+        self.assertEqual(canonical_dumps(b"ab"), canonical_dumps(bytearray(b"ab")))
+        self.assertEqual(canonical_dumps(Point(1, 2)), canonical_dumps(Point(1.0, 2.0)))
+
+    def test_different_values(self):
+        values = [
+            None,
+            True,
+            False,
+            0,
+            1,
+            -1,
+            1.5,
+            "",
+            "1",
+            b"1",
+            (),
+            [],
+            {},
+            set(),
+            (1,),
+            [1],
+            ("1",),
+            ("a", "b"),
+            ("ab",),
+        ]
+        values += [{1: 2}, {2: 1}, {1}, Point(1, 2), Point(2, 1), Decimal("1.5")]
+        encoded = [canonical_dumps(x) for x in values]
+        self.assertEqual(len(set(encoded)), len(values))
+
+    def test_pickle_fallback(self):
+        self.assertEqual(canonical_dumps(Decimal("1.5")), canonical_dumps(Decimal("1.5")))
+        self.assertEqual(canonical_dumps([Decimal("1.5")]), canonical_dumps([Decimal("1.5")]))
+
+    def test_buffers(self):
+        data = bytes(range(24))
+        self.assertEqual(canonical_dumps(array("h", [1, 2])), canonical_dumps(array("h", [1, 2])))
+        self.assertNotEqual(canonical_dumps(array("h", [1, 2])), canonical_dumps(array("i", [1, 2])))
+        self.assertNotEqual(canonical_dumps(memoryview(data)), canonical_dumps(memoryview(data).cast("B", (4, 6))))
+        self.assertNotEqual(canonical_dumps(memoryview(data)), canonical_dumps(data))
+        self.assertEqual(canonical_dumps(memoryview(data)[::2]), canonical_dumps(memoryview(data[::2])))
+
+
+class CanonicalUpdateTest(TestCase):
+    def test_same_as_dumps(self):
+        values = [
+            b"x" * 100_000,
+            [bytearray(5000), memoryview(b"a" * 9000), {"k": array("d", range(3000))}],
+            memoryview(bytes(range(100)))[::3],
+            {1: b"y" * 10_000},
+            (1, "a", None, [Point(1, 2)]),
+        ]
+        for value in values:
+            h = hashlib.md5()
+            canonical_update(h, value)
+            self.assertEqual(hashlib.md5(canonical_dumps(value)).digest(), h.digest())
+
+    def test_no_copy(self):
+        value = (bytes(1 << 24), array("d", range(1 << 20)))
+        h = hashlib.md5()
+        tracemalloc.start()
+        try:
+            canonical_update(h, value)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 1 << 16)
+
+
+class CanonicalHashMixinTest(TestCase):
+    def test_keyword_order(self):
+        for mixin in (CanonicalMd5HexHashMixin, CanonicalBlake2bHashMixin):
+            policy_type = type(f"{mixin.__name__}Policy", (mixin, LruTPolicy), {"__key__": mixin.__name__})
+            cache = RedisFuncCache(__name__, policy_type, client=Redis())
+            self.assertEqual(
+                cache.policy.calc_hash(_echo, (), {"a": 1, "b": {"x": 1, "y": 2}}),
+                cache.policy.calc_hash(_echo, (), {"b": {"y": 2, "x": 1}, "a": 1}),
+            )
+            self.assertNotEqual(cache.policy.calc_hash(_echo, (1,), {}), cache.policy.calc_hash(_echo, (2,), {}))
+
+    def test_blake2b_digest_size(self):
+        policy_type = type("Blake2bPolicy", (CanonicalBlake2bHashMixin, LruTPolicy), {"__key__": "blake2b"})
+        cache = RedisFuncCache(__name__, policy_type, client=Redis())
+        self.assertEqual(16, len(cache.policy.calc_hash(_echo, (1,), {})))
@@ -0,0 +1,235 @@
+from time import sleep
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from redis_func_cache import (
+    FifoPolicy,
+    FifoTPolicy,
+    LfuPolicy,
+    LruMultiplePolicy,
+    LruPolicy,
+    LruTPolicy,
+    MruPolicy,
+    RedisFuncCache,
+    RrPolicy,
+    StorageConfig,
+)
+from redis_func_cache.chunking import chunks_key, is_chunk_ref
+
+from .conftest import Calls, async_redis_factory, redis_factory
+
+POLICIES = (FifoPolicy, FifoTPolicy, LfuPolicy, LruPolicy, LruTPolicy, MruPolicy, RrPolicy, LruMultiplePolicy)
+CHUNK_SIZE = 1000
+
+
+def payload(x):
+    return f"{x}:" + "x" * (10 * CHUNK_SIZE)
+
+
+class ChunkingTest(TestCase):
+    def test_round_trip(self):
+        for policy in POLICIES:
+            cache = RedisFuncCache(
+                __name__, policy, client=redis_factory(), storage=StorageConfig(chunk_size=CHUNK_SIZE)
+            )
+            cache.policy.purge()
+            calls = Calls()
+
+            @cache
+            @calls.record
+            def echo(x):
+                return payload(x)
+
+            for _ in range(3):
+                self.assertEqual(payload(1), echo(1), policy)
+            self.assertEqual([1], calls, policy)
+            _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+            values = cache.client.hvals(hmap)
+            self.assertTrue(any(is_chunk_ref(v) for v in values), policy)
+            # 11 chunks of the 10 KB JSON string, and the index
+            self.assertEqual(12, cache.client.hlen(chunks_key(hmap)), policy)
+            cache.policy.purge()
+            self.assertFalse(cache.client.exists(chunks_key(hmap)), policy)
+
+    def test_small_values(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), storage=StorageConfig(chunk_size=CHUNK_SIZE)
+        )
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        self.assertEqual(1, echo(1))
+        self.assertEqual(1, echo(1))
+        _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+        self.assertEqual([b"1"], cache.client.hvals(hmap))
+        self.assertFalse(cache.client.exists(chunks_key(hmap)))
+
+    def test_eviction(self):
+        for policy in POLICIES:
+            cache = RedisFuncCache(
+                __name__, policy, client=redis_factory(), maxsize=1, storage=StorageConfig(chunk_size=CHUNK_SIZE)
+            )
+            cache.policy.purge()
+
+            @cache
+            def echo(x):
+                return payload(x)
+
+            echo(1)
+            echo(2)
+            _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+            (hash,) = cache.client.hkeys(hmap)
+            fields = cache.client.hkeys(chunks_key(hmap))
+            self.assertEqual(12, len(fields), policy)
+            self.assertTrue(all(field.startswith(hash) for field in fields), policy)
+
+    def test_expiry(self):
+        for policy in POLICIES:
+            cache = RedisFuncCache(
+                __name__, policy, client=redis_factory(), storage=StorageConfig(chunk_size=CHUNK_SIZE), entry_ttl=0.1
+            )
+            cache.policy.purge()
+            calls = Calls()
+
+            @cache
+            @calls.record
+            def echo(x):
+                return payload(x)
+
+            echo(1)
+            sleep(0.2)
+            self.assertEqual(payload(1), echo(1), policy)
+            self.assertEqual([1, 1], calls, policy)
+            _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+            self.assertEqual(12, cache.client.hlen(chunks_key(hmap)), policy)
+
+    def test_read_past_ttl(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), ttl=1, storage=StorageConfig(chunk_size=CHUNK_SIZE)
+        )
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return payload(x)
+
+        for _ in range(6):  # each read keeps the chunks as long as the value, past the ttl of the put
+            self.assertEqual(payload(1), echo(1))
+            sleep(0.3)
+        self.assertListEqual([1], calls)
+
+    def test_missing_chunk(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), storage=StorageConfig(chunk_size=CHUNK_SIZE)
+        )
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return payload(x)
+
+        echo(1)
+        _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+        field = next(f for f in cache.client.hkeys(chunks_key(hmap)) if f.endswith(b":3"))
+        cache.client.hdel(chunks_key(hmap), field)
+        self.assertEqual(payload(1), echo(1))
+        self.assertEqual([1, 1], calls)
+        self.assertEqual(12, cache.client.hlen(chunks_key(hmap)))
+        self.assertEqual(payload(1), echo(1))
+        self.assertEqual([1, 1], calls)
+
+    def test_read_window(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), storage=StorageConfig(chunk_size=CHUNK_SIZE)
+        )
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return payload(x)
+
+        echo(1)
+        with patch("redis_func_cache.chunking.CHUNK_READ_WINDOW", 3 * CHUNK_SIZE):
+            self.assertEqual(payload(1), echo(1))
+
+    def test_map_and_batch(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), storage=StorageConfig(chunk_size=CHUNK_SIZE)
+        )
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return payload(x)
+
+        self.assertEqual([payload(1), payload(2)], echo.map([(1,), (2,)]))
+        self.assertEqual([payload(1), payload(2)], echo.map([(1,), (2,)]))
+        with cache.batch():
+            a, b = echo(1), echo(3)
+        self.assertEqual([payload(1), payload(3)], [a.result(), b.result()])
+        self.assertEqual(payload(3), echo(3))
+        self.assertEqual([1, 2, 3], calls)
+
+    def test_header_only(self):
+        self.assertFalse(is_chunk_ref(b"\x0e"))
+        self.assertFalse(is_chunk_ref(b"\x0eabc"))
+        self.assertFalse(is_chunk_ref(b"\x0eabc:1:2:3"))
+        self.assertTrue(is_chunk_ref(b"\x0eabc:1:2"))
+        serializer = (lambda x: b"\x0e" + x.encode()), (lambda data: bytes(data[1:]).decode())
+        cache = RedisFuncCache(
+            __name__,
+            LruPolicy,
+            client=redis_factory(),
+            storage=StorageConfig(chunk_size=CHUNK_SIZE),
+            serializer=serializer,
+        )
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return x
+
+        for x in ("abc", "a:1:2x"):
+            self.assertEqual(x, echo(x))
+            self.assertEqual(x, echo(x))  # a plain value, only starting with the header byte
+        self.assertListEqual(["abc", "a:1:2x"], calls)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            StorageConfig(chunk_size=0)
+
+
+class AsyncChunkingTest(IsolatedAsyncioTestCase):
+    async def test_round_trip(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=async_redis_factory(), storage=StorageConfig(chunk_size=CHUNK_SIZE)
+        )
+        await cache.policy.apurge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        async def echo(x):
+            return payload(x)
+
+        for _ in range(3):
+            self.assertEqual(payload(1), await echo(1))
+        self.assertEqual([payload(1), payload(2)], await echo.amap([(1,), (2,)]))
+        async with cache.batch():
+            a = await echo(3)
+        self.assertEqual(payload(3), await a)
+        self.assertEqual(payload(3), await echo(3))
+        self.assertEqual([1, 2, 3], calls)
+        _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+        self.assertEqual(36, await cache.client.hlen(chunks_key(hmap)))
@@ -3,6 +3,7 @@ from random import randint
 from unittest import TestCase
 
 from redis import Redis
+from redis.crc import key_slot
 
 from redis_func_cache import (
     FifoClusterPolicy,
@@ -13,6 +14,7 @@ from redis_func_cache import (
     RedisFuncCache,
     RrClusterPolicy,
 )
+from redis_func_cache.utils import script_keys
 
 REDIS_URL = getenv("REDIS_URL", "redis://")
 REDIS_FACTORY = lambda: Redis.from_url(REDIS_URL)  # noqa: E731
@@ -57,3 +59,13 @@ class ClusterTest(TestCase):
             for i in range(randint(MAXSIZE, MAXSIZE * 2)):
                 self.assertEqual(i, echo1(i))
                 self.assertEqual(i, echo2(i))
+
+    def test_script_keys_in_one_slot(self):
+        for cache in CACHES.values():
+
+            def echo(x):
+                return x
+
+            keys = script_keys(cache.policy.calc_keys(echo), b"hash")
+            self.assertEqual(6, len(keys))
+            self.assertEqual(1, len({key_slot(k.encode() if isinstance(k, str) else k) for k in keys}))
@@ -0,0 +1,97 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from time import sleep
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from redis_func_cache import LruPolicy, RedisFuncCache
+from redis_func_cache.coalescing import AsyncCallCoalescer, CallCoalescer
+
+from .conftest import async_redis_factory, redis_factory
+
+CONCURRENCY = 16
+
+
+class CoalescingTest(TestCase):
+    def setUp(self):
+        self.cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory, coalesce=True)
+        self.cache.policy.purge()
+
+    def test_one_flight(self):
+        calls = []
+        barrier = Barrier(CONCURRENCY)
+
+        @self.cache
+        def slow(x):
+            calls.append(x)
+            sleep(0.2)
+            return [x]
+
+        def call(_):
+            barrier.wait()
+            return slow(1)
+
+        with patch.object(self.cache, "get", wraps=self.cache.get) as mock_get:
+            with ThreadPoolExecutor(CONCURRENCY) as executor:
+                results = list(executor.map(call, range(CONCURRENCY)))
+            self.assertEqual(1, mock_get.call_count)
+        self.assertListEqual([1], calls)
+        self.assertListEqual([[1]] * CONCURRENCY, results)
+        self.assertEqual(0, len(self.cache._coalescer))  # type: ignore[arg-type]
+
+    def test_shared_exception(self):
+        coalescer = CallCoalescer()
+        barrier = Barrier(4)
+
+        def fail():
+            sleep(0.2)
+            raise ValueError()
+
+        def call(_):
+            barrier.wait()
+            try:
+                coalescer.run("k", fail)
+            except ValueError as err:
+                return err
+
+        with ThreadPoolExecutor(4) as executor:
+            errors = list(executor.map(call, range(4)))
+        self.assertTrue(all(isinstance(err, ValueError) for err in errors))
+        self.assertEqual(0, len(coalescer))
+
+
+class AsyncCoalescingTest(IsolatedAsyncioTestCase):
+    async def test_one_flight(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory, coalesce=True)
+        await cache.policy.apurge()
+        calls = []
+
+        @cache
+        async def slow(x):
+            calls.append(x)
+            await asyncio.sleep(0.1)
+            return x
+
+        with patch.object(cache, "aget", wraps=cache.aget) as mock_aget:
+            results = await asyncio.gather(*(slow(1) for _ in range(CONCURRENCY)), slow(2))
+            self.assertEqual(2, mock_aget.call_count)
+        self.assertListEqual([1] * CONCURRENCY + [2], results)
+        self.assertListEqual([1, 2], calls)
+
+    async def test_leader_cancelled(self):
+        coalescer = AsyncCallCoalescer()
+        calls = []
+
+        async def slow():
+            calls.append(None)
+            await asyncio.sleep(0.1)
+            return len(calls)
+
+        leader = asyncio.create_task(coalescer.run("k", slow))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(coalescer.run("k", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        self.assertEqual(2, await waiter)
+        self.assertEqual(0, len(coalescer))
@@ -0,0 +1,86 @@
+import json
+import pickle
+from importlib.util import find_spec
+from os import urandom
+from unittest import TestCase
+
+from redis_func_cache import Compressor, LruPolicy, RedisFuncCache
+from redis_func_cache.compression import CODECS
+
+from .conftest import redis_factory
+
+AVAILABLE_CODECS = ["zlib", "lzma"] + [c for c, m in (("lz4", "lz4"), ("zstd", "zstandard")) if find_spec(m)]
+PAYLOAD = json.dumps([{"id": i, "name": f"user-{i}", "tags": ["a", "b", "c"]} for i in range(1000)]).encode()
+
+
+class CompressorTest(TestCase):
+    def test_round_trip(self):
+        for codec in AVAILABLE_CODECS:
+            compressor = Compressor(codec)
+            data = compressor.compress(PAYLOAD)
+            self.assertEqual(CODECS[codec][0], data[0], codec)
+            self.assertLess(len(data), len(PAYLOAD), codec)
+            self.assertEqual(PAYLOAD, compressor.decompress(data), codec)
+
+    def test_threshold(self):
+        compressor = Compressor(threshold=len(PAYLOAD) + 1)
+        data = compressor.compress(PAYLOAD)
+        self.assertEqual(b"\x00" + PAYLOAD, data)
+        self.assertEqual(PAYLOAD, compressor.decompress(data))
+
+    def test_incompressible(self):
+        compressor = Compressor(threshold=0)
+        payload = urandom(4096)
+        data = compressor.compress(payload)
+        self.assertEqual(b"\x00" + payload, data)
+        self.assertEqual(payload, compressor.decompress(data))
+
+    def test_without_header(self):
+        compressor = Compressor()
+        for data in (PAYLOAD, pickle.dumps(PAYLOAD), b""):
+            self.assertEqual(data, compressor.decompress(data))
+
+    def test_other_codec(self):
+        data = Compressor("lzma").compress(PAYLOAD)
+        self.assertEqual(PAYLOAD, Compressor("zlib").decompress(data))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Compressor("bzip3")
+
+
+class CompressionCacheTest(TestCase):
+    def test_cache(self):
+        compressor = Compressor(threshold=64)
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), compressor=compressor)
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def make(n):
+            calls.append(n)
+            return ["x" * 10] * n
+
+        self.assertListEqual(["x" * 10] * 100, make(100))
+        self.assertListEqual(["x" * 10] * 100, make(100))
+        self.assertListEqual(["x" * 10], make(1))
+        self.assertListEqual(["x" * 10], make(1))
+        self.assertListEqual([100, 1], calls)
+        values = sorted(cache.client.hvals(cache.policy.calc_keys()[1]), key=len)
+        self.assertEqual(0, values[0][0])
+        self.assertEqual(CODECS["zlib"][0], values[1][0])
+
+    def test_rollout(self):
+        plain = RedisFuncCache(__name__, LruPolicy, client=redis_factory())
+        compressed = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), compressor=Compressor(threshold=0))
+        plain.policy.purge()
+        calls = []
+
+        def make(n):
+            calls.append(n)
+            return ["x" * 10] * n
+
+        plain_make, compressed_make = plain(make), compressed(make)
+        self.assertListEqual(["x" * 10] * 100, plain_make(100))
+        self.assertListEqual(["x" * 10] * 100, compressed_make(100))
+        self.assertListEqual([100], calls)
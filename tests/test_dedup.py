@@ -0,0 +1,161 @@
+from time import sleep
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from redis_func_cache import (
+    FifoPolicy,
+    FifoTPolicy,
+    LfuPolicy,
+    LruMultiplePolicy,
+    LruPolicy,
+    LruTPolicy,
+    MruPolicy,
+    RedisFuncCache,
+    RrPolicy,
+    StaleConfig,
+    StorageConfig,
+)
+from redis_func_cache.utils import side_keys
+
+from .conftest import Calls, async_redis_factory, redis_factory
+
+POLICIES = (FifoPolicy, FifoTPolicy, LfuPolicy, LruPolicy, LruTPolicy, MruPolicy, RrPolicy, LruMultiplePolicy)
+BLOB = "x" * 1000
+
+
+def blobs(cache: RedisFuncCache, f):
+    _, hmap = cache.policy.calc_keys(f)
+    return {k.decode(): v for k, v in cache.client.hgetall(side_keys(hmap)[2]).items()}
+
+
+class DedupTest(TestCase):
+    def test_dedup(self):
+        for policy in POLICIES:
+            cache = RedisFuncCache(__name__, policy, client=redis_factory(), storage=StorageConfig(dedup=True))
+            cache.policy.purge()
+            calls = Calls()
+
+            @cache
+            @calls.record
+            def page(x):
+                return BLOB if x < 10 else f"{x}"
+
+            for _ in range(2):
+                for x in (1, 2, 3, 10):
+                    self.assertEqual(BLOB if x < 10 else "10", page(x), policy)
+            self.assertEqual([1, 2, 3, 10], calls, policy)
+            stored = blobs(cache, page.__wrapped__)
+            self.assertEqual(4, len(stored), policy)  # two values, and their counts
+            counts = sorted(int(v) for k, v in stored.items() if k.endswith(":refs"))
+            self.assertEqual([1, 3], counts, policy)
+            _, hmap = cache.policy.calc_keys(page.__wrapped__)
+            self.assertTrue(all(len(v) == 41 for v in cache.client.hvals(hmap)), policy)
+            cache.policy.purge()
+            self.assertEqual({}, blobs(cache, page.__wrapped__), policy)
+
+    def test_read_past_ttl(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), ttl=1, storage=StorageConfig(dedup=True))
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def page(x):
+            return BLOB
+
+        page(1)
+        _, hmap = cache.policy.calc_keys(page.__wrapped__)
+        self.assertGreater(cache.client.ttl(side_keys(hmap)[2]), 0)
+        for _ in range(6):  # each read keeps the blob as long as the value, past the ttl of the put
+            sleep(0.3)
+            self.assertEqual(BLOB, page(1))
+        self.assertListEqual([1], calls)
+
+    def test_eviction(self):
+        for policy in POLICIES:
+            cache = RedisFuncCache(
+                __name__, policy, client=redis_factory(), maxsize=2, storage=StorageConfig(dedup=True)
+            )
+            cache.policy.purge()
+
+            @cache
+            def page(x):
+                return BLOB if x % 2 else f"{x}"
+
+            for x in range(8):
+                page(x)
+                # each stored value is counted as many times as entries refer to it, and only as long as any does
+                _, hmap = cache.policy.calc_keys(page.__wrapped__)
+                refs = [v[1:].decode() for v in cache.client.hvals(hmap)]
+                stored = blobs(cache, page.__wrapped__)
+                counts = {k[: -len(":refs")]: int(v) for k, v in stored.items() if k.endswith(":refs")}
+                self.assertEqual({d: refs.count(d) for d in refs}, counts, policy)
+                self.assertEqual(2 * len(counts), len(stored), policy)
+
+    def test_expiry(self):
+        for policy in POLICIES:
+            cache = RedisFuncCache(
+                __name__, policy, client=redis_factory(), storage=StorageConfig(dedup=True), entry_ttl=0.1
+            )
+            cache.policy.purge()
+            calls = Calls()
+
+            @cache
+            @calls.record
+            def page(x):
+                return BLOB
+
+            page(1)
+            page(2)
+            sleep(0.2)
+            self.assertEqual(BLOB, page(1), policy)
+            self.assertEqual(BLOB, page(2), policy)
+            self.assertEqual([1, 2, 1, 2], calls, policy)
+            stored = blobs(cache, page.__wrapped__)
+            self.assertEqual([b"2"], [v for k, v in stored.items() if k.endswith(":refs")], policy)
+
+    def test_stale(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), storage=StorageConfig(dedup=True), stale=StaleConfig(60)
+        )
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def page(x):
+            return BLOB
+
+        for x in (1, 2, 1, 2):
+            self.assertEqual(BLOB, page(x))
+        self.assertEqual([1, 2], calls)
+        self.assertEqual(2, len(blobs(cache, page.__wrapped__)))
+
+    def test_map(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), storage=StorageConfig(dedup=True))
+        cache.policy.purge()
+
+        @cache
+        def page(x):
+            return BLOB
+
+        self.assertEqual([BLOB] * 3, page.map([(1,), (2,), (3,)]))
+        self.assertEqual([BLOB] * 3, page.map([(1,), (2,), (3,)]))
+        self.assertEqual(2, len(blobs(cache, page.__wrapped__)))
+
+
+class AsyncDedupTest(IsolatedAsyncioTestCase):
+    async def test_dedup(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory(), storage=StorageConfig(dedup=True))
+        await cache.policy.apurge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        async def page(x):
+            return BLOB
+
+        for x in (1, 2, 1, 2):
+            self.assertEqual(BLOB, await page(x))
+        self.assertEqual([1, 2], calls)
+        _, hmap = cache.policy.calc_keys(page.__wrapped__)
+        self.assertEqual(2, len(await cache.client.hgetall(side_keys(hmap)[2])))
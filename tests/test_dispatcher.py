@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier, Thread
+from time import sleep
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from redis_func_cache import LruPolicy, RedisFuncCache
+from redis_func_cache import dispatcher as dispatcher_module
+
+from .conftest import async_redis_factory, redis_factory
+
+CONCURRENCY = 16
+
+
+class DispatcherTest(TestCase):
+    def test_threads(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), micro_batch_window=0.05)
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        for i in range(CONCURRENCY):
+            self.assertEqual(i, echo(i))
+        barrier = Barrier(CONCURRENCY)
+
+        def call(i):
+            barrier.wait()
+            return echo(i)
+
+        with patch.object(dispatcher_module, "run_script_calls", wraps=dispatcher_module.run_script_calls) as mock_run:
+            with ThreadPoolExecutor(CONCURRENCY) as executor:
+                self.assertListEqual(list(range(CONCURRENCY)), list(executor.map(call, range(CONCURRENCY))))
+            self.assertLess(mock_run.call_count, CONCURRENCY)
+
+    def test_interrupted_window(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), micro_batch_window=1)
+        cache.policy.purge()
+        dispatcher = cache._dispatcher
+
+        @cache
+        def echo(x):
+            return x
+
+        errors = []
+
+        def follow():
+            try:
+                echo(2)
+            except KeyboardInterrupt as err:
+                errors.append(err)
+
+        follower = Thread(target=follow)
+
+        def interrupted_sleep(_):
+            follower.start()
+            while len(dispatcher._pending) < 2:
+                sleep(0.001)
+            raise KeyboardInterrupt()
+
+        with patch.object(dispatcher_module, "sleep", side_effect=interrupted_sleep):
+            with self.assertRaises(KeyboardInterrupt):
+                echo(1)
+        follower.join(5)
+        self.assertFalse(follower.is_alive())
+        self.assertEqual(1, len(errors))  # the call submitted meanwhile is failed, not left waiting
+        self.assertListEqual([], dispatcher._pending)
+        with patch.object(dispatcher_module, "sleep"):
+            self.assertEqual(1, echo(1))
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            RedisFuncCache(__name__, LruPolicy, client=redis_factory, micro_batch_window=-1)
+
+
+class AsyncDispatcherTest(IsolatedAsyncioTestCase):
+    async def test_one_tick(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory(), micro_batch_window=0)
+        await cache.policy.apurge()
+        calls = []
+
+        @cache
+        async def echo(x):
+            calls.append(x)
+            return x
+
+        self.assertListEqual(list(range(CONCURRENCY)), await asyncio.gather(*(echo(i) for i in range(CONCURRENCY))))
+        with patch.object(
+            dispatcher_module, "arun_script_calls", wraps=dispatcher_module.arun_script_calls
+        ) as mock_run:
+            self.assertListEqual(list(range(CONCURRENCY)), await asyncio.gather(*(echo(i) for i in range(CONCURRENCY))))
+            mock_run.assert_called_once()
+        self.assertListEqual(list(range(CONCURRENCY)), calls)
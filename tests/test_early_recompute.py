@@ -0,0 +1,121 @@
+import asyncio
+from time import sleep
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from redis_func_cache import LruPolicy, RedisFuncCache, StaleConfig
+from redis_func_cache import cache as cache_module
+from redis_func_cache.utils import lease_key
+
+from .conftest import async_redis_factory, redis_factory
+
+
+class EarlyRecomputeTest(TestCase):
+    def test_expensive(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), stale=StaleConfig(60, early_recompute=1e4))
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def count(x):
+            calls.append(x)
+            sleep(0.01)
+            return len(calls)
+
+        self.assertEqual(1, count(1))
+        with patch.object(cache_module, "random", return_value=0.5):
+            self.assertEqual(2, count(1))  # 10ms * 1e4 * log(2) is beyond the expiry
+            self.assertEqual(3, count(1))
+
+    def test_cheap(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), stale=StaleConfig(60, early_recompute=1.0))
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def count(x):
+            calls.append(x)
+            return len(calls)
+
+        self.assertEqual(1, count(1))
+        with patch.object(cache_module, "random", return_value=0.5):
+            for _ in range(10):
+                self.assertEqual(1, count(1))
+
+    def test_near_expiry(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), stale=StaleConfig(0.2, early_recompute=1.0))
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def count(x):
+            calls.append(x)
+            sleep(0.05)
+            return len(calls)
+
+        self.assertEqual(1, count(1))
+        with patch.object(cache_module, "random", return_value=0.5):
+            self.assertEqual(1, count(1))  # 50ms * log(2) is far before the expiry
+            sleep(0.18)
+            self.assertEqual(2, count(1))  # but not any more
+
+    def test_lease_held(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), stale=StaleConfig(60, early_recompute=1e4))
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def count(x):
+            calls.append(x)
+            sleep(0.01)
+            return len(calls)
+
+        self.assertEqual(1, count(1))
+        plan = count.__call_plan__
+        lease = lease_key(plan.keys[1], plan.calc_hash((1,), {}))
+        cache.client.set(lease, b"another caller", px=10_000)
+        with patch.object(cache_module, "random", return_value=0.5):
+            self.assertEqual(1, count(1))  # picked, but another caller holds the lease
+        self.assertEqual(b"another caller", cache.client.get(lease))
+        cache.client.delete(lease)
+        with patch.object(cache_module, "random", return_value=0.5):
+            self.assertEqual(2, count(1))
+        self.assertFalse(cache.client.exists(lease))
+
+    def test_bulk_and_batch(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), stale=StaleConfig(60, early_recompute=1.0))
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        self.assertListEqual([1, 2], echo.map([(1,), (2,)]))
+        self.assertListEqual([1, 2, 3], echo.map([(1,), (2,), (3,)]))
+        with cache.batch():
+            deferred = echo(4)
+        self.assertEqual(4, deferred.result())
+        self.assertEqual(4, echo(4))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            StaleConfig(1, early_recompute=0)
+
+
+class AsyncEarlyRecomputeTest(IsolatedAsyncioTestCase):
+    async def test_expensive(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=async_redis_factory(), stale=StaleConfig(60, early_recompute=1e4)
+        )
+        await cache.policy.apurge()
+        calls = []
+
+        @cache
+        async def count(x):
+            calls.append(x)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        self.assertEqual(1, await count(1))
+        with patch.object(cache_module, "random", return_value=0.5):
+            self.assertEqual(2, await count(1))
@@ -0,0 +1,75 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from redis_func_cache import LruPolicy, RedisFuncCache
+
+from .conftest import async_redis_factory, redis_factory
+
+CACHE = RedisFuncCache(__name__, LruPolicy, client=redis_factory)
+
+
+class ElementwiseTest(TestCase):
+    def setUp(self):
+        CACHE.policy.purge()
+
+    def test_list(self):
+        calls = []
+
+        @CACHE(elementwise=list)
+        def squares(xs, offset=0):
+            calls.append(list(xs))
+            return [x * x + offset for x in xs]
+
+        self.assertListEqual([1, 4, 9], squares([1, 2, 3]))
+        self.assertListEqual([16, 4, 25, 1], squares([4, 2, 5, 1]))
+        self.assertListEqual([[1, 2, 3], [4, 5]], calls)
+        self.assertListEqual([4, 1], squares([2, 1]))
+        self.assertEqual(2, len(calls))
+        self.assertListEqual([5, 2], squares([2, 1], offset=1))  # other arguments are part of the hash
+        self.assertListEqual([[2, 1]], calls[2:])
+        self.assertListEqual([], squares([]))
+
+    def test_dict(self):
+        calls = []
+        users = {1: "alice", 2: "bob", 3: "carol"}
+
+        @CACHE(elementwise=dict)
+        def load_users(ids):
+            calls.append(list(ids))
+            return {i: users[i] for i in ids if i in users}
+
+        self.assertDictEqual({1: "alice"}, load_users([1, 4]))
+        self.assertDictEqual({2: "bob", 1: "alice"}, load_users([2, 1, 2]))
+        self.assertListEqual([[1, 4], [2]], calls)
+        self.assertListEqual([2, 1], list(load_users([2, 1])))
+        self.assertDictEqual({}, load_users([4]))  # absent elements are not cached
+        self.assertListEqual([4], calls[-1])
+
+    def test_wrong_length(self):
+        @CACHE(elementwise=list)
+        def broken(xs):
+            return xs[:-1]
+
+        with self.assertRaises(ValueError):
+            broken([1, 2])
+
+    def test_invalid_option(self):
+        with self.assertRaises(ValueError):
+            CACHE(elementwise=tuple)
+
+
+class AsyncElementwiseTest(IsolatedAsyncioTestCase):
+    async def test_list(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory)
+        await cache.policy.apurge()
+        calls = []
+
+        @cache(elementwise=list)
+        async def doubles(xs):
+            calls.append(list(xs))
+            await asyncio.sleep(0)
+            return [2 * x for x in xs]
+
+        self.assertListEqual([2, 4], await doubles([1, 2]))
+        self.assertListEqual([4, 6, 2], await doubles([2, 3, 1]))
+        self.assertListEqual([[1, 2], [3]], calls)
@@ -0,0 +1,184 @@
+import asyncio
+from time import sleep
+from unittest import IsolatedAsyncioTestCase, TestCase, skipIf, skipUnless
+
+from redis.exceptions import ResponseError
+
+from redis_func_cache import (
+    FifoPolicy,
+    FifoTPolicy,
+    LfuPolicy,
+    LruMultiplePolicy,
+    LruPolicy,
+    LruTPolicy,
+    MruPolicy,
+    RedisFuncCache,
+    RrPolicy,
+    StorageConfig,
+)
+from redis_func_cache.utils import side_keys
+
+from .conftest import Calls, async_redis_factory, redis_factory
+
+POLICIES = (FifoPolicy, FifoTPolicy, LfuPolicy, LruPolicy, LruTPolicy, MruPolicy, RrPolicy, LruMultiplePolicy)
+
+
+def _has_hexpire() -> bool:
+    try:
+        redis_factory().execute_command("HPEXPIRE", f"{__name__}:hexpire", 1, "FIELDS", 1, "x")
+    except ResponseError:
+        return False
+    return True
+
+
+class EntryTtlTest(TestCase):
+    def test_expire(self):
+        for policy in POLICIES:
+            cache = RedisFuncCache(__name__, policy, client=redis_factory(), ttl=0, entry_ttl=0.2)
+            cache.policy.purge()
+            calls = Calls()
+
+            @cache
+            @calls.record
+            def echo(x):
+                return x
+
+            echo(1)
+            sleep(0.1)
+            echo(2)
+            echo(1)
+            self.assertListEqual([1, 2], calls, policy)
+            sleep(0.15)
+            echo(1)
+            echo(2)
+            self.assertListEqual([1, 2, 1], calls, policy)
+            sleep(0.25)
+            echo(2)
+            self.assertListEqual([1, 2, 1, 2], calls, policy)
+            cache.policy.purge()
+
+    def test_jitter(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), entry_ttl=0.2, ttl_jitter=0.5)
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return x
+
+        for i in range(10):
+            echo(i)
+        sleep(0.25)
+        for i in range(10):
+            echo(i)
+        self.assertEqual(20, len(calls))
+        cache.policy.purge()
+
+    @skipIf(_has_hexpire(), "hash fields are expired by Redis itself")
+    def test_evict_expired_first(self):
+        cache = RedisFuncCache(__name__, LfuPolicy, client=redis_factory(), maxsize=3, entry_ttl=0.2)
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return x
+
+        for _ in range(5):
+            echo(1)
+        sleep(0.25)
+        for i in (2, 3, 4):  # 4 evicts the expired 1, although it is the most frequently used
+            echo(i)
+        for i in (2, 3, 4):
+            echo(i)
+        self.assertListEqual([1, 2, 3, 4], calls)
+        self.assertEqual(3, cache.client.zcard(side_keys(cache.policy.calc_keys()[1])[0]))
+
+    @skipUnless(_has_hexpire(), "hash fields are not expired by Redis itself")
+    def test_evict_dead_members_first(self):
+        for policy in (LfuPolicy, RrPolicy):
+            cache = RedisFuncCache(__name__, policy, client=redis_factory(), maxsize=3, entry_ttl=0.2)
+            cache.policy.purge()
+            calls = Calls()
+
+            @cache
+            @calls.record
+            def echo(x):
+                return x
+
+            for _ in range(5):
+                for i in (1, 2, 3):
+                    echo(i)
+            sleep(0.25)
+            for i in (4, 5, 6):  # the members of the expired fields do not take the room of these
+                echo(i)
+            for i in (4, 5, 6):
+                echo(i)
+            self.assertListEqual([1, 2, 3, 4, 5, 6], calls, policy)
+            cache.policy.purge()
+
+    def test_purge(self):
+        for policy in POLICIES:
+            cache = RedisFuncCache(__name__, policy, client=redis_factory(), entry_ttl=10)
+            cache.policy.purge()
+
+            @cache
+            def echo(x):
+                return x
+
+            echo(1)
+            echo(2)
+            self.assertEqual(2, cache.policy.purge(), policy)  # the key pair only, not the keys beside it
+            keys = cache.client.keys(f"{cache.prefix}{cache.name}:*")
+            self.assertListEqual([], keys, policy)
+
+    def test_read_past_ttl(self):
+        # deduplicated values always have expiry scores, Redis does not expire their fields itself
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), ttl=1, entry_ttl=10, storage=StorageConfig(dedup=True)
+        )
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return x
+
+        echo(1)
+        expiry_key = side_keys(cache.policy.calc_keys()[1])[0]
+        self.assertGreater(cache.client.ttl(expiry_key), 0)
+        for _ in range(6):  # each read keeps the expiry scores as long as the key pair, past the ttl of the put
+            sleep(0.3)
+            self.assertEqual(1, echo(1))
+        self.assertListEqual([1], calls)
+        self.assertEqual(1, cache.client.zcard(expiry_key))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            RedisFuncCache(__name__, LruPolicy, client=redis_factory, entry_ttl=0)
+        with self.assertRaises(ValueError):
+            RedisFuncCache(__name__, LruPolicy, client=redis_factory, entry_ttl=1, ttl_jitter=1)
+        with self.assertRaises(ValueError):
+            RedisFuncCache(__name__, LruPolicy, client=redis_factory, ttl_jitter=0.1)
+
+
+class AsyncEntryTtlTest(IsolatedAsyncioTestCase):
+    async def test_expire(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory(), entry_ttl=0.1)
+        await cache.policy.apurge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        async def echo(x):
+            return x
+
+        await echo(1)
+        await echo(1)
+        await asyncio.sleep(0.15)
+        await echo(1)
+        self.assertListEqual([1, 1], calls)
+        await cache.policy.apurge()
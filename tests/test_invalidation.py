@@ -0,0 +1,65 @@
+from time import monotonic, sleep
+from unittest import TestCase
+
+from redis_func_cache import LocalCache, LruPolicy, RedisFuncCache
+
+from .conftest import redis_factory
+
+MAXSIZE = 8
+CHANNEL = f"{__name__}:invalidate"
+
+
+def _echo(x):
+    return x
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = monotonic() + timeout
+    while not predicate():
+        if monotonic() > deadline:
+            return False
+        sleep(0.01)
+    return True
+
+
+class InvalidationTest(TestCase):
+    def setUp(self):
+        self.caches = [
+            RedisFuncCache(
+                __name__,
+                LruPolicy,
+                client=redis_factory,
+                maxsize=MAXSIZE,
+                local_cache=LocalCache(ttl=0),
+                invalidation_channel=CHANNEL,
+            )
+            for _ in range(2)
+        ]
+        for cache in self.caches:
+            cache.policy.purge()
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+
+    def test_evicted(self):
+        cache_a, cache_b = self.caches
+
+        echo_a = cache_a(_echo)
+        echo_b = cache_b(_echo)
+
+        self.assertEqual(0, echo_a(0))
+        self.assertEqual(1, len(cache_a.local_cache))  # type: ignore[arg-type]
+        for i in range(1, MAXSIZE + 1):
+            echo_b(i)
+        self.assertTrue(_wait_for(lambda: len(cache_a.local_cache) == 0))  # type: ignore[arg-type]
+
+    def test_purged(self):
+        cache_a, cache_b = self.caches
+
+        echo = cache_a(_echo)
+        for i in range(MAXSIZE):
+            echo(i)
+        self.assertEqual(MAXSIZE, len(cache_a.local_cache))  # type: ignore[arg-type]
+        cache_b.policy.purge()
+        self.assertTrue(_wait_for(lambda: len(cache_a.local_cache) == 0))  # type: ignore[arg-type]
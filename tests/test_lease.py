@@ -0,0 +1,85 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from redis_func_cache import LeaseConfig, LfuPolicy, LruPolicy, LruTPolicy, RedisFuncCache, RrPolicy
+
+from .conftest import Calls, async_redis_factory, redis_factory
+
+LEASE_TIMEOUT = 5
+
+
+class LeaseTest(TestCase):
+    def test_single_flight(self):
+        for policy in (LruPolicy, LruTPolicy, LfuPolicy, RrPolicy):
+            # two cache objects on the same key pair, as in two processes
+            caches = [
+                RedisFuncCache(__name__, policy, client=redis_factory, lease=LeaseConfig(LEASE_TIMEOUT))
+                for _ in range(2)
+            ]
+            caches[0].policy.purge()
+            calls = Calls()
+
+            @calls.record
+            def slow(x):
+                sleep(0.2)
+                return x
+
+            with ThreadPoolExecutor(8) as executor:
+                results = list(executor.map(lambda f: f(1), [cache(slow) for cache in caches] * 4))
+            self.assertListEqual([1] * 8, results)
+            self.assertListEqual([1], calls)
+
+    def test_crashed_holder(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory, lease=LeaseConfig(0.3))
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        plan = echo.__call_plan__
+        hash = plan.calc_hash((1,), {})
+        lease_key = f"{plan.keys[1]}:lease:".encode() + (hash if isinstance(hash, bytes) else hash.encode())
+        cache.client.set(lease_key, 1, px=300)  # a holder that never puts
+        ts = monotonic()
+        self.assertEqual(1, echo(1))
+        self.assertGreater(monotonic() - ts, 0.2)
+        self.assertFalse(cache.client.exists(lease_key))
+
+    def test_release_on_error(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory, lease=LeaseConfig(LEASE_TIMEOUT))
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def fail(x):
+            if len(calls) == 1:
+                raise ValueError(x)
+            return x
+
+        with self.assertRaises(ValueError):
+            fail(1)
+        ts = monotonic()
+        self.assertEqual(1, fail(1))
+        self.assertLess(monotonic() - ts, 1)
+        self.assertListEqual([1, 1], calls)
+
+
+class AsyncLeaseTest(IsolatedAsyncioTestCase):
+    async def test_single_flight(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory, lease=LeaseConfig(LEASE_TIMEOUT))
+        await cache.policy.apurge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        async def slow(x):
+            await asyncio.sleep(0.2)
+            return x
+
+        results = await asyncio.gather(*(slow(1) for _ in range(8)))
+        self.assertListEqual([1] * 8, results)
+        self.assertListEqual([1], calls)
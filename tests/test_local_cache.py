@@ -0,0 +1,91 @@
+from time import sleep
+from unittest import TestCase
+from unittest.mock import patch
+
+from redis_func_cache import LocalCache, LruTPolicy, RedisFuncCache
+
+from .conftest import redis_factory
+
+MAXSIZE = 8
+
+
+class LocalCacheTest(TestCase):
+    def test_lru_eviction(self):
+        local = LocalCache(maxsize=2, ttl=0)
+        local.put("a", 1)
+        local.put("b", 2)
+        self.assertEqual(local.get("a"), 1)
+        local.put("c", 3)
+        self.assertIsNone(local.get("b"))
+        self.assertEqual(local.get("a"), 1)
+        self.assertEqual(local.get("c"), 3)
+
+    def test_maxbytes(self):
+        local = LocalCache(maxsize=0, maxbytes=10, ttl=0)
+        local.put("a", "a", 4)
+        local.put("b", "b", 4)
+        local.put("c", "c", 4)
+        self.assertEqual(len(local), 2)
+        self.assertEqual(local.nbytes, 8)
+        self.assertIsNone(local.get("a"))
+        local.put("d", "d", 11)
+        self.assertIsNone(local.get("d"))
+        self.assertEqual(len(local), 2)
+
+    def test_ttl(self):
+        local = LocalCache(ttl=0.01)
+        local.put("a", 1)
+        self.assertEqual(local.get("a"), 1)
+        sleep(0.02)
+        self.assertIsNone(local.get("a"))
+        self.assertEqual(len(local), 0)
+
+
+class NearCacheTest(TestCase):
+    def setUp(self):
+        self.cache = RedisFuncCache(
+            __name__, LruTPolicy, client=redis_factory, maxsize=MAXSIZE, local_cache=LocalCache(ttl=0)
+        )
+        self.cache.policy.purge()
+
+    def test_hit_skips_redis(self):
+        cache = self.cache
+
+        @cache
+        def echo(x):
+            return x
+
+        for i in range(MAXSIZE):
+            self.assertEqual(i, echo(i))
+        for i in range(MAXSIZE):
+            with patch.object(cache, "get") as mock_get:
+                with patch.object(echo.__call_plan__, "deserialize") as mock_deserialize:
+                    self.assertEqual(i, echo(i))
+                    mock_get.assert_not_called()
+                    mock_deserialize.assert_not_called()
+
+    def test_filled_on_redis_hit(self):
+        cache = self.cache
+
+        @cache
+        def echo(x):
+            return x
+
+        self.assertEqual(1, echo(1))
+        cache.local_cache.clear()  # type: ignore[union-attr]
+        self.assertEqual(1, echo(1))
+        with patch.object(cache, "get") as mock_get:
+            self.assertEqual(1, echo(1))
+            mock_get.assert_not_called()
+
+    def test_purge_clears_local(self):
+        cache = self.cache
+
+        @cache
+        def echo(x):
+            return x
+
+        echo(1)
+        self.assertEqual(len(cache.local_cache), 1)  # type: ignore[arg-type]
+        cache.policy.purge()
+        self.assertEqual(len(cache.local_cache), 0)  # type: ignore[arg-type]
@@ -0,0 +1,119 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import sleep
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import Mock, patch
+
+from redis_func_cache import LfuPolicy, LruPolicy, LruTMultiplePolicy, MruPolicy, RedisFuncCache
+
+from .conftest import Calls, async_redis_factory, redis_factory
+
+MAXSIZE = 64
+CACHE = RedisFuncCache(__name__, LruPolicy, client=redis_factory, maxsize=MAXSIZE)
+
+
+@CACHE
+def square(x):
+    return x * x
+
+
+class MapTest(TestCase):
+    def setUp(self):
+        CACHE.policy.purge()
+
+    def test_map(self):
+        for policy in (LruPolicy, MruPolicy, LfuPolicy, LruTMultiplePolicy):
+            cache = RedisFuncCache(__name__, policy, client=redis_factory, maxsize=MAXSIZE)
+            cache.policy.purge()
+            calls = Calls()
+
+            @cache
+            @calls.record
+            def add(x, y):
+                return x + y
+
+            self.assertEqual(3, add(1, 2))
+            args = [(i, i) for i in range(10)] + [(1, 2), (0, 0)]
+            self.assertListEqual([x + y for x, y in args], add.map(args))
+            self.assertEqual(11, len(calls))  # (1, 2) was cached, (0, 0) is computed once
+            with patch.object(cache, "get_many", wraps=cache.get_many) as mock_get_many:
+                self.assertListEqual([x + y for x, y in args], add.map(args))
+                mock_get_many.assert_called_once()
+            self.assertEqual(11, len(calls))
+            self.assertEqual(4, add(2, 2))
+            self.assertEqual(11, len(calls))
+
+    def test_eviction(self):
+        self.assertListEqual([i * i for i in range(2 * MAXSIZE)], square.map((i,) for i in range(2 * MAXSIZE)))
+        self.assertEqual(MAXSIZE, CACHE.client.hlen(square.__call_plan__.keys[1]))
+
+    def test_executors(self):
+        args = [(i,) for i in range(8)]
+        for executor_type in (ThreadPoolExecutor, ProcessPoolExecutor):
+            CACHE.policy.purge()
+            with executor_type(2) as executor:
+                self.assertListEqual([i * i for i in range(8)], square.map(args, executor=executor))
+            self.assertListEqual([i * i for i in range(8)], square.map(args))
+
+    def test_empty(self):
+        self.assertListEqual([], square.map([]))
+
+    def test_read_past_ttl(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory, ttl=1)
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return x
+
+        for _ in range(6):  # each bulk read keeps the key pair, past the ttl of the put
+            self.assertListEqual([1, 2], echo.map([(1,), (2,)]))
+            sleep(0.3)
+        self.assertListEqual([1, 2], calls)
+
+    def test_unloaded_scripts(self):
+        client = redis_factory()
+        cache = RedisFuncCache(__name__, LruPolicy, client=client, maxsize=MAXSIZE)
+        cache.policy.purge()
+
+        @cache
+        def cube(x):
+            return x**3
+
+        pipeline = client.pipeline
+        pipelines = []
+
+        def cluster_pipeline(transaction=True):  # which does not load the scripts it runs
+            pipelines.append(pipeline(transaction=transaction))
+            return Mock(wraps=pipelines[-1], spec=["evalsha", "execute"])
+
+        client.script_flush()
+        with patch.object(client, "pipeline", side_effect=cluster_pipeline):
+            self.assertListEqual([i**3 for i in range(8)], cube.map((i,) for i in range(8)))
+        # the gets and the puts are sent again once their script is loaded
+        self.assertEqual(4, len(pipelines))
+        self.assertListEqual([i**3 for i in range(8)], cube.map((i,) for i in range(8)))
+        self.assertEqual(8, cache.policy.size())
+
+
+class AsyncMapTest(IsolatedAsyncioTestCase):
+    async def test_amap(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory, maxsize=MAXSIZE)
+        await cache.policy.apurge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        async def double(x):
+            await asyncio.sleep(0)
+            return 2 * x
+
+        self.assertEqual(2, await double(1))
+        self.assertListEqual([0, 2, 4, 2], await double.amap([(0,), (1,), (2,), (1,)]))
+        self.assertListEqual([1, 0, 2], calls)
+        self.assertListEqual([0, 2, 4], await double.amap([(0,), (1,), (2,)]))
+        self.assertListEqual([1, 0, 2], calls)
+        with ThreadPoolExecutor(2) as executor:
+            self.assertListEqual([6, 8], await double.amap([(3,), (4,)], executor=executor))
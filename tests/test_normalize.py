@@ -0,0 +1,73 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from redis_func_cache import LruPolicy, RedisFuncCache
+
+from .conftest import redis_factory
+
+CACHE = RedisFuncCache(__name__, LruPolicy, client=redis_factory)
+
+
+def _add(a, b=2, *args, **kwargs):
+    return a + b + sum(args) + sum(kwargs.values())
+
+
+class NormalizeTest(TestCase):
+    def setUp(self):
+        CACHE.policy.purge()
+
+    def test_not_normalized(self):
+        plan = CACHE.make_plan(_add)
+        self.assertIsNone(plan.normalize_args)
+        self.assertNotEqual(plan.calc_hash((1, 2), {}), plan.calc_hash((1,), {"b": 2}))
+
+    def test_normalize(self):
+        plan = CACHE.make_plan(_add, normalize=True)
+        hashes = {
+            plan.calc_hash((1, 2), {}),
+            plan.calc_hash((1,), {"b": 2}),
+            plan.calc_hash((), {"a": 1, "b": 2}),
+            plan.calc_hash((), {"b": 2, "a": 1}),
+            plan.calc_hash((1,), {}),
+        }
+        self.assertEqual(1, len(hashes))
+        self.assertNotEqual(plan.calc_hash((1, 3), {}), plan.calc_hash((1,), {}))
+        self.assertEqual(plan.calc_hash((1,), {"x": 1, "y": 2}), plan.calc_hash((1,), {"y": 2, "x": 1}))
+        self.assertNotEqual(plan.calc_hash((1, 2, 3), {}), plan.calc_hash((1, 2), {}))
+        with self.assertRaises(TypeError):
+            plan.calc_hash((), {})
+
+    def test_ignore(self):
+        mock_add = MagicMock(side_effect=lambda a, b=2, session=None: a + b)
+
+        def add(a, b=2, session=None):
+            return mock_add(a, b, session=session)
+
+        add = CACHE(ignore=["session"])(add)  # type: ignore[assignment]
+        self.assertEqual(3, add(1, session=object()))
+        self.assertEqual(3, add(1, 2, session=object()))
+        self.assertEqual(3, add(a=1, b=2))
+        mock_add.assert_called_once()
+        self.assertEqual(4, add(1, b=3, session=object()))
+        self.assertEqual(2, mock_add.call_count)
+
+    def test_ignore_unknown(self):
+        with self.assertRaises(ValueError):
+            CACHE.make_plan(_add, ignore=["session"])
+
+    def test_key(self):
+        mock_get = MagicMock(side_effect=lambda request: request["user_id"])
+
+        @CACHE(key=lambda request: request["user_id"])
+        def get(request):
+            return mock_get(request)
+
+        self.assertEqual(1, get({"user_id": 1, "headers": {"x": "y"}}))
+        self.assertEqual(1, get({"user_id": 1, "headers": {}}))
+        mock_get.assert_called_once()
+        self.assertEqual(2, get({"user_id": 2}))
+        self.assertEqual(2, mock_get.call_count)
+
+    def test_key_with_ignore(self):
+        with self.assertRaises(ValueError):
+            CACHE.make_plan(_add, key=lambda a, b=2: a, ignore=["b"])
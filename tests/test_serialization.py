@@ -0,0 +1,157 @@
+import json
+import pickle
+from importlib.util import find_spec
+from unittest import TestCase, skipUnless
+
+from redis_func_cache import LruPolicy, RedisFuncCache, TaggedSerializer, fastest_serializer, register_serializer
+from redis_func_cache.serialization import SERIALIZERS
+
+from .conftest import redis_factory
+
+AVAILABLE_SERIALIZERS = ["json", "pickle", "pickle_buffers"] + [s for s in ("orjson", "msgpack") if find_spec(s)]
+HAS_NUMPY = find_spec("numpy") is not None
+SAMPLE = {"id": 1, "name": "user-1", "tags": ["a", "b"], "score": 0.5, "active": True, "parent": None}
+
+
+class TaggedSerializerTest(TestCase):
+    def test_round_trip(self):
+        for name in AVAILABLE_SERIALIZERS:
+            serializer = TaggedSerializer(name)
+            data = serializer.dumps(SAMPLE)
+            self.assertEqual(SERIALIZERS[name][0], data[0], name)
+            self.assertEqual(SAMPLE, serializer.loads(data), name)
+
+    def test_other_serializer(self):
+        data = TaggedSerializer("pickle").dumps(SAMPLE)
+        self.assertEqual(SAMPLE, TaggedSerializer("json").loads(data))
+
+    def test_without_tag(self):
+        serializer = TaggedSerializer("pickle")
+        for value in (SAMPLE, [1, 2], "text", 1, None):
+            self.assertEqual(value, serializer.loads(json.dumps(value).encode()))
+
+    def test_pickle_protocol(self):
+        data = TaggedSerializer("pickle").dumps(SAMPLE)
+        self.assertEqual(b"\x80\x05", data[1:3])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            TaggedSerializer("yaml")
+
+
+class ZeroCopyBuffer(bytearray):
+    """Rebuilt on the out-of-band buffer itself, like NumPy arrays."""
+
+    def __reduce_ex__(self, protocol):
+        return memoryview, (pickle.PickleBuffer(self),)
+
+
+class PickleBuffersTest(TestCase):
+    def test_bytes(self):
+        serializer = TaggedSerializer("pickle_buffers")
+        for value in (b"x" * 10000, bytearray(b"y" * 10000), b"small", {"nested": b"z" * 10000}):
+            data = bytes(serializer.dumps(value))
+            loaded = serializer.loads(data)
+            self.assertEqual(value, loaded)
+            self.assertIs(type(value), type(loaded))
+        self.assertLess(len(serializer.dumps(b"x" * 10000)), 10000 + 256)
+
+    def test_zero_copy(self):
+        serializer = TaggedSerializer("pickle_buffers")
+        data = serializer.dumps([ZeroCopyBuffer(b"a" * 100), ZeroCopyBuffer(b"b" * 200)])
+        self.assertIsInstance(data, bytearray)
+        data = bytes(data)  # as read from Redis
+        a, b = serializer.loads(data)
+        self.assertEqual(b"a" * 100, a)
+        self.assertEqual(b"b" * 200, b)
+        self.assertIs(data, a.obj)
+        self.assertIs(data, b.obj)
+        self.assertTrue(a.readonly)
+        for view in (a, b):  # aligned in the value read from Redis
+            self.assertEqual(0, data.index(view.tobytes()) % 64)
+
+    @skipUnless(HAS_NUMPY, "numpy is not installed")
+    def test_numpy(self):
+        import numpy as np  # type: ignore[import-not-found]
+
+        serializer = TaggedSerializer("pickle_buffers")
+        value = {"x": np.arange(100_000, dtype=np.float64), "y": np.eye(3, dtype=np.int32)[:, 1]}
+        data = bytes(serializer.dumps(value))
+        loaded = serializer.loads(data)
+        np.testing.assert_array_equal(value["x"], loaded["x"])
+        np.testing.assert_array_equal(value["y"], loaded["y"])  # not contiguous, pickled in-band
+        self.assertFalse(loaded["x"].flags.writeable)
+        self.assertFalse(loaded["x"].flags.owndata)
+
+    def test_register(self):
+        register_serializer("repr", 0x1F, lambda v: repr(v).encode(), lambda data: eval(bytes(data)))
+        try:
+            serializer = TaggedSerializer("repr")
+            self.assertEqual(b"\x1f[1, 2]", serializer.dumps([1, 2]))
+            self.assertEqual([1, 2], TaggedSerializer("json").loads(b"\x1f[1, 2]"))
+            with self.assertRaises(ValueError):
+                register_serializer("other", 0x1F, repr, eval)
+            with self.assertRaises(ValueError):
+                register_serializer("other", 0x11, repr, eval)
+        finally:
+            del SERIALIZERS["repr"]
+
+    def test_fastest(self):
+        self.assertIn(fastest_serializer(SAMPLE), AVAILABLE_SERIALIZERS)
+        # JSON turns the tuple into a list, and can not serialize the set
+        with self.assertLogs("redis_func_cache.serialization", "INFO") as logs:
+            self.assertEqual("pickle", fastest_serializer({(1, 2): {3}}, ["json", "pickle"]))
+        self.assertIn("json", logs.output[0])
+        with self.assertRaises(ValueError):
+            fastest_serializer(lambda: None, ["json"])
+
+
+class SerializerNameTest(TestCase):
+    def test_cache(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), serializer="pickle")
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def echo(x):
+            calls.append(x)
+            return {"x": x, "set": {x}}
+
+        for _ in range(3):
+            self.assertEqual({"x": 1, "set": {1}}, echo(1))
+        self.assertEqual([1], calls)
+        _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+        for value in cache.client.hvals(hmap):
+            self.assertEqual(SERIALIZERS["pickle"][0], value[0])
+
+    def test_pickle_buffers(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), serializer="pickle_buffers")
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def blob(n):
+            calls.append(n)
+            return bytes(range(256)) * n
+
+        for _ in range(3):
+            self.assertEqual(bytes(range(256)) * 100, blob(100))
+        self.assertEqual([100], calls)
+
+    def test_change_serializer(self):
+        calls = []
+
+        def echo(x):
+            calls.append(x)
+            return [x]
+
+        json_cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory())
+        json_cache.policy.purge()
+        self.assertEqual([1], json_cache(echo)(1))
+        pickle_cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), serializer="pickle")
+        pickle_echo = pickle_cache(echo)
+        self.assertEqual([1], pickle_echo(1))
+        self.assertEqual([2], pickle_echo(2))
+        self.assertEqual([1, 2], calls)
+        self.assertEqual([2], json_cache(echo)(2))
+        self.assertEqual([1, 2], calls)
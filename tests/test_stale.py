@@ -0,0 +1,179 @@
+import asyncio
+from threading import Event, Thread
+from time import sleep, time_ns
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from redis_func_cache import FifoTPolicy, LruPolicy, RedisFuncCache, StaleConfig
+
+from .conftest import Calls, async_redis_factory, redis_factory
+
+
+class StaleTest(TestCase):
+    def test_inline_refresh(self):
+        for policy in (LruPolicy, FifoTPolicy):
+            cache = RedisFuncCache(__name__, policy, client=redis_factory(), stale=StaleConfig(0.1))
+            cache.policy.purge()
+            calls = Calls()
+
+            @cache
+            @calls.record
+            def stamp(x):
+                return time_ns()
+
+            value = stamp(1)
+            self.assertEqual(value, stamp(1))
+            sleep(0.2)
+            refreshed = stamp(1)
+            self.assertGreater(refreshed, value)
+            self.assertEqual(refreshed, stamp(1))
+            self.assertListEqual([1, 1], calls, policy)
+
+    def test_one_refresher(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), stale=StaleConfig(0.1))
+        cache.policy.purge()
+        entered, release = Event(), Event()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def count(x):
+            if len(calls) > 1:
+                entered.set()
+                release.wait()
+            return len(calls)
+
+        self.assertEqual(1, count(1))
+        sleep(0.2)
+        results = []
+        refresher = Thread(target=lambda: results.append(count(1)))
+        refresher.start()
+        entered.wait()
+        for _ in range(3):
+            self.assertEqual(1, count(1))  # stale value, while the refresh runs
+        release.set()
+        refresher.join()
+        self.assertListEqual([2], results)
+        self.assertEqual(2, count(1))
+        self.assertEqual(2, len(calls))
+
+    def test_background_refresh(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), stale=StaleConfig(0.1, background_refresh=True)
+        )
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def count(x):
+            return len(calls)
+
+        self.assertEqual(1, count(1))
+        sleep(0.2)
+        self.assertEqual(1, count(1))
+        cache.close()
+        self.assertEqual(2, count(1))
+        self.assertEqual(2, len(calls))
+
+    def test_failed_refresh(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), stale=StaleConfig(0.1))
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def count(x):
+            if len(calls) == 2:
+                raise RuntimeError()
+            return len(calls)
+
+        self.assertEqual(1, count(1))
+        sleep(0.2)
+        with self.assertRaises(RuntimeError):
+            count(1)
+        self.assertEqual(3, count(1))  # the refresh lease is released
+
+    def test_hard_expiry(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), stale=StaleConfig(0.1, ttl=0.1))
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def count(x):
+            return len(calls)
+
+        self.assertEqual(1, count(1))
+        sleep(0.3)
+        self.assertEqual(2, count(1))
+
+    def test_read_past_ttl(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), ttl=1, stale=StaleConfig(60))
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return x
+
+        for _ in range(6):  # each read keeps the fresh value, past the ttl of the put
+            self.assertEqual(1, echo(1))
+            sleep(0.3)
+        self.assertListEqual([1], calls)
+
+    def test_bulk(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), stale=StaleConfig(0.1))
+        cache.policy.purge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        def echo(x):
+            return x
+
+        self.assertListEqual([1, 2], echo.map([(1,), (2,)]))
+        sleep(0.2)
+        self.assertListEqual([1, 2], echo.map([(1,), (2,)]))
+        self.assertListEqual([1, 2, 1, 2], calls)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            StaleConfig(0)
+        with self.assertRaises(ValueError):
+            StaleConfig(1, ttl=0)
+
+
+class AsyncStaleTest(IsolatedAsyncioTestCase):
+    async def test_background_refresh(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=async_redis_factory(), stale=StaleConfig(0.1, background_refresh=True)
+        )
+        await cache.policy.apurge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        async def count(x):
+            return len(calls)
+
+        self.assertEqual(1, await count(1))
+        await asyncio.sleep(0.2)
+        self.assertEqual(1, await count(1))
+        await cache.aclose()
+        self.assertEqual(2, await count(1))
+        self.assertEqual(2, len(calls))
+
+    async def test_inline_refresh(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory(), stale=StaleConfig(0.1))
+        await cache.policy.apurge()
+        calls = Calls()
+
+        @cache
+        @calls.record
+        async def count(x):
+            return len(calls)
+
+        self.assertEqual(1, await count(1))
+        await asyncio.sleep(0.2)
+        self.assertEqual(2, await count(1))
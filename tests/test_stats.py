@@ -0,0 +1,158 @@
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from redis_func_cache import CacheInfo, LocalCache, LruPolicy, LruTPolicy, RedisFuncCache, WriteBehind, prometheus_text
+
+from .conftest import async_redis_factory, redis_factory
+
+
+class StatsTest(TestCase):
+    def test_hits_misses_evictions(self):
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), maxsize=2)
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        for x in (1, 1, 2, 3, 3, 3):
+            self.assertEqual(echo(x), x)
+        info = echo.cache_info()
+        self.assertEqual(info.hits, 3)
+        self.assertEqual(info.misses, 3)
+        self.assertEqual(info.local_hits, 0)
+        self.assertEqual(info.puts, 3)
+        self.assertEqual(info.evictions, 1)
+        self.assertEqual(info.bytes_read, 3 * len(cache.serialize_return_value(1)))
+        self.assertEqual(info.bytes_written, 3 * len(cache.serialize_return_value(1)))
+        self.assertEqual(info.hit_ratio, 0.5)
+
+    def test_cache_totals(self):
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory())
+        cache.policy.purge()
+
+        @cache
+        def f(x):
+            return x
+
+        @cache
+        def g(x):
+            return -x
+
+        f(1), f(1), g(1), g(2)
+        self.assertEqual(cache.stats(), CacheInfo.total([f.cache_info(), g.cache_info()]))
+        self.assertEqual(cache.stats().hits, 1)
+        self.assertEqual(cache.stats().misses, 3)
+        self.assertSetEqual(set(cache.function_stats()), {f"{__name__}:{fn.__qualname__}" for fn in (f, g)})
+        cache.reset_stats()
+        self.assertEqual(cache.stats(), CacheInfo())
+        self.assertEqual(cache.stats().hit_ratio, 0.0)
+
+    def test_exec_shares_function_stats(self):
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory())
+        cache.policy.purge()
+
+        def echo(x):
+            return x
+
+        for _ in range(3):
+            cache.exec(echo, (1,), {})
+        self.assertEqual(cache.stats()[:2], (2, 1))
+
+    def test_local_hits(self):
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), local_cache=LocalCache())
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        echo(1), echo(1), echo(1)
+        info = echo.cache_info()
+        self.assertEqual((info.hits, info.local_hits, info.misses, info.bytes_read), (2, 2, 1, 0))
+
+    def test_map(self):
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), maxsize=3)
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        echo(0)
+        echo.map([(i,) for i in range(5)])
+        info = echo.cache_info()
+        self.assertEqual((info.hits, info.misses, info.puts), (1, 5, 5))
+        self.assertEqual(info.evictions, 2)
+
+    def test_batch(self):
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory())
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        echo(1)
+        with cache.batch():
+            echo(1), echo(2)
+        info = echo.cache_info()
+        self.assertEqual((info.hits, info.misses, info.puts), (1, 2, 2))
+
+    def test_write_behind(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), maxsize=2, write_behind=WriteBehind())
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        for i in range(4):
+            echo(i)
+        cache.close()
+        info = echo.cache_info()
+        self.assertEqual((info.misses, info.puts, info.evictions), (4, 4, 2))
+
+    def test_prometheus_text(self):
+        cache = RedisFuncCache('quoted "name"', LruTPolicy, client=redis_factory())
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        echo(1), echo(1)
+        text = prometheus_text(cache)
+        labels = f'cache="quoted \\"name\\"",function="{__name__}:{echo.__qualname__}"'
+        self.assertIn("# TYPE redis_func_cache_hits_total counter\n", text)
+        self.assertIn(f"redis_func_cache_hits_total{{{labels}}} 1\n", text)
+        self.assertIn(f"redis_func_cache_misses_total{{{labels}}} 1\n", text)
+        self.assertIn(f"redis_func_cache_evictions_total{{{labels}}} 0\n", text)
+        self.assertIn("# HELP app_puts_total ", prometheus_text(cache, namespace="app"))
+
+
+class AsyncStatsTest(IsolatedAsyncioTestCase):
+    async def test_hits_misses_evictions(self):
+        cache = RedisFuncCache(__name__, LruTPolicy, client=async_redis_factory(), maxsize=2)
+        await cache.policy.apurge()
+
+        @cache
+        async def echo(x):
+            return x
+
+        for x in (1, 1, 2, 3):
+            self.assertEqual(await echo(x), x)
+        info = echo.cache_info()
+        self.assertEqual((info.hits, info.misses, info.puts, info.evictions), (1, 3, 3, 1))
+
+    async def test_amap(self):
+        cache = RedisFuncCache(__name__, LruTPolicy, client=async_redis_factory())
+        await cache.policy.apurge()
+
+        @cache
+        async def echo(x):
+            return x
+
+        await echo.amap([(1,), (2,)])
+        await echo.amap([(1,), (2,), (3,)])
+        info = echo.cache_info()
+        self.assertEqual((info.hits, info.misses, info.puts), (2, 3, 3))
@@ -0,0 +1,197 @@
+from importlib.util import find_spec
+from time import sleep
+from typing import List
+from unittest import IsolatedAsyncioTestCase, TestCase, skipUnless
+
+from redis_func_cache import (
+    CallTrace,
+    LocalCache,
+    LruTPolicy,
+    OpenTelemetryTracer,
+    RedisFuncCache,
+    SlowCallLogger,
+    Tracer,
+)
+from redis_func_cache import cache as cache_module
+
+from .conftest import async_redis_factory, redis_factory
+
+HAS_OPENTELEMETRY_SDK = find_spec("opentelemetry") is not None and find_spec("opentelemetry.sdk") is not None
+
+
+class RecordingTracer(Tracer):
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__(sample_rate)
+        self.traces: List[CallTrace] = []
+
+    def on_call(self, trace: CallTrace):
+        self.traces.append(trace)
+
+
+class TracingTest(TestCase):
+    def test_stages(self):
+        tracer = RecordingTracer()
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), tracer=tracer)
+        cache.policy.purge()
+        self.assertIs(cache.tracer, tracer)
+
+        @cache
+        def echo(x):
+            return x
+
+        echo(1), echo(1)
+        miss, hit = tracer.traces
+        self.assertEqual(miss.outcome, "miss")
+        self.assertEqual(list(miss.stages), ["hash", "keys", "get", "function", "serialize", "put"])
+        self.assertEqual(hit.outcome, "hit")
+        self.assertEqual(list(hit.stages), ["hash", "keys", "get", "deserialize"])
+        for trace in tracer.traces:
+            self.assertIs(trace.function, echo.__wrapped__)
+            self.assertEqual(trace.cache, __name__)
+            self.assertIsNone(trace.error)
+            self.assertGreaterEqual(trace.duration, sum(trace.stages.values()))
+            self.assertLessEqual(trace.epoch_ns(trace.started), trace.epoch_ns(trace.finished))
+
+    def test_local_hit(self):
+        tracer = RecordingTracer()
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), local_cache=LocalCache(), tracer=tracer)
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        echo(1), echo(1)
+        self.assertEqual(tracer.traces[-1].outcome, "local_hit")
+        self.assertEqual(list(tracer.traces[-1].stages), ["hash"])
+
+    def test_error(self):
+        tracer = RecordingTracer()
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), tracer=tracer)
+        cache.policy.purge()
+
+        @cache
+        def fail(x):
+            raise ZeroDivisionError(x)
+
+        with self.assertRaises(ZeroDivisionError):
+            fail(1)
+        (trace,) = tracer.traces
+        self.assertIsInstance(trace.error, ZeroDivisionError)
+        self.assertNotIn("function", trace.stages)
+
+    def test_failing_tracer(self):
+        class FailingTracer(Tracer):
+            def on_call(self, trace: CallTrace):
+                raise RuntimeError()
+
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), tracer=FailingTracer())
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        with self.assertLogs(cache_module.__name__, "ERROR") as logs:
+            self.assertEqual(1, echo(1))
+            self.assertEqual(1, echo(1))
+        self.assertEqual(2, len(logs.output))
+        self.assertIn(f"{__name__}:{echo.__qualname__}", logs.output[0])
+
+    def test_sampling(self):
+        never, always = RecordingTracer(0), RecordingTracer(1)
+        for tracer in (never, always):
+            cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), tracer=tracer)
+            cache.policy.purge()
+
+            @cache
+            def echo(x):
+                return x
+
+            for i in range(10):
+                echo(i % 2)
+        self.assertEqual(len(never.traces), 0)
+        self.assertEqual(len(always.traces), 10)
+        with self.assertRaises(ValueError):
+            RecordingTracer(1.5)
+
+    def test_not_traced(self):
+        tracer = RecordingTracer()
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), tracer=tracer)
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        echo.map([(1,), (2,)])
+        with cache.batch():
+            echo(3)
+        self.assertEqual(tracer.traces, [])
+
+    def test_slow_call_logger(self):
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), tracer=SlowCallLogger(0.05))
+        cache.policy.purge()
+
+        @cache
+        def slow(x):
+            sleep(x)
+            return x
+
+        with self.assertLogs("redis_func_cache.tracing", "WARNING") as logs:
+            slow(0), slow(0.1), slow(0.1)
+        (message,) = logs.output
+        self.assertIn(f"{__name__}:{slow.__qualname__}", message)
+        self.assertIn("miss", message)
+        self.assertIn("function ", message)
+
+    @skipUnless(HAS_OPENTELEMETRY_SDK, "opentelemetry-sdk is not installed")
+    def test_opentelemetry(self):
+        from opentelemetry.sdk.trace import TracerProvider  # type: ignore[import-not-found]
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # type: ignore[import-not-found]
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # type: ignore[import-not-found]
+        from opentelemetry.trace import StatusCode  # type: ignore[import-not-found]
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        tracer = OpenTelemetryTracer(provider.get_tracer(__name__))
+        cache = RedisFuncCache(__name__, LruTPolicy, client=redis_factory(), tracer=tracer)
+        cache.policy.purge()
+
+        @cache
+        def inverse(x):
+            return 1 / x
+
+        inverse(2)
+        with self.assertRaises(ZeroDivisionError):
+            inverse(0)
+        spans = exporter.get_finished_spans()
+        calls = [span for span in spans if span.parent is None]
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0].name, f"{__name__}:{inverse.__qualname__}")
+        self.assertEqual(calls[0].attributes["redis_func_cache.outcome"], "miss")
+        self.assertEqual(calls[1].status.status_code, StatusCode.ERROR)
+        stages = [span for span in spans if span.parent is not None and span.parent.span_id == calls[0].context.span_id]
+        self.assertEqual([span.name for span in stages], ["hash", "keys", "get", "function", "serialize", "put"])
+        for span in stages:
+            self.assertLessEqual(calls[0].start_time, span.start_time)
+            self.assertLessEqual(span.end_time, calls[0].end_time)
+
+
+class AsyncTracingTest(IsolatedAsyncioTestCase):
+    async def test_stages(self):
+        tracer = RecordingTracer()
+        cache = RedisFuncCache(__name__, LruTPolicy, client=async_redis_factory(), tracer=tracer)
+        await cache.policy.apurge()
+
+        @cache
+        async def echo(x):
+            return x
+
+        await echo(1), await echo(1)
+        miss, hit = tracer.traces
+        self.assertEqual(miss.outcome, "miss")
+        self.assertEqual(list(miss.stages), ["hash", "keys", "get", "function", "serialize", "put"])
+        self.assertEqual(hit.outcome, "hit")
+        self.assertEqual(list(hit.stages), ["hash", "keys", "get", "deserialize"])
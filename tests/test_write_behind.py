@@ -0,0 +1,296 @@
+import asyncio
+from threading import Event
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from redis_func_cache import LocalCache, LruPolicy, RedisFuncCache, StorageConfig, WriteBehind
+from redis_func_cache import write_behind as write_behind_module
+from redis_func_cache.chunking import chunks_key
+
+from .conftest import async_redis_factory, redis_factory
+
+
+class WriteBehindTest(TestCase):
+    def test_put_in_background(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), write_behind=WriteBehind())
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def echo(x):
+            calls.append(x)
+            return x
+
+        for i in range(100):
+            self.assertEqual(i, echo(i))
+        cache.close()
+        self.assertEqual(100, cache.policy.size())
+        for i in range(100):
+            self.assertEqual(i, echo(i))
+        self.assertListEqual(list(range(100)), calls)
+
+    def test_batches(self):
+        write_behind = WriteBehind(batch_size=8)
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), write_behind=write_behind)
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        release = Event()
+        run_script_calls = write_behind_module.run_script_calls
+        sizes = []
+
+        def wait_and_run(calls, raise_on_error=True):
+            release.wait()
+            sizes.append(len(calls))
+            return run_script_calls(calls, raise_on_error)
+
+        with patch.object(write_behind_module, "run_script_calls", side_effect=wait_and_run):
+            for i in range(20):
+                echo(i)
+            release.set()
+            write_behind.flush()
+        self.assertEqual(20, sum(sizes))
+        self.assertLess(len(sizes), 20)
+        self.assertLessEqual(max(sizes), 8)
+        self.assertEqual(20, cache.policy.size())
+        cache.close()
+
+    def test_drop(self):
+        write_behind = WriteBehind(maxsize=2, block=False)
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), write_behind=write_behind)
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        release = Event()
+        run_script_calls = write_behind_module.run_script_calls
+
+        def wait_and_run(calls, raise_on_error=True):
+            release.wait()
+            return run_script_calls(calls, raise_on_error)
+
+        with patch.object(write_behind_module, "run_script_calls", side_effect=wait_and_run):
+            for i in range(10):
+                self.assertEqual(i, echo(i))
+            release.set()
+            cache.close()
+        self.assertGreater(write_behind.dropped, 0)
+        self.assertEqual(10 - write_behind.dropped, cache.policy.size())
+
+    def test_dropped_chunks(self):
+        write_behind = WriteBehind(maxsize=2, block=False)
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), storage=StorageConfig(chunk_size=16), write_behind=write_behind
+        )
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return f"{x:02d}" * 40
+
+        release = Event()
+        run_script_calls = write_behind_module.run_script_calls
+
+        def wait_and_run(calls, raise_on_error=True):
+            release.wait()
+            return run_script_calls(calls, raise_on_error)
+
+        with patch.object(write_behind_module, "run_script_calls", side_effect=wait_and_run):
+            for i in range(10):
+                echo(i)
+            release.set()
+            cache.close()
+        self.assertGreater(write_behind.dropped, 0)
+        _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+        # 6 chunks of the 82 bytes JSON string, and the index, of each put written
+        self.assertEqual(7 * (10 - write_behind.dropped), cache.client.hlen(chunks_key(hmap)))
+
+    def test_failed_chunks(self):
+        write_behind = WriteBehind(on_error=lambda _: None)
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), storage=StorageConfig(chunk_size=16), write_behind=write_behind
+        )
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return f"{x:02d}" * 40
+
+        def fail(calls, raise_on_error=True):
+            return [ConnectionError()] * len(calls)
+
+        with patch.object(write_behind_module, "run_script_calls", side_effect=fail):
+            echo(1)
+            write_behind.flush()
+        self.assertEqual(1, write_behind.errors)
+        _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+        self.assertEqual(0, cache.client.hlen(chunks_key(hmap)))
+        cache.close()
+
+    def test_errors(self):
+        errors = []
+        write_behind = WriteBehind(on_error=errors.append)
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), write_behind=write_behind)
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        with patch.object(write_behind_module, "run_script_calls", side_effect=ConnectionError()):
+            self.assertEqual(1, echo(1))
+            write_behind.flush()
+        self.assertEqual(1, write_behind.errors)
+        self.assertIsInstance(errors[0], ConnectionError)
+        self.assertEqual(2, echo(2))
+        cache.close()
+        self.assertEqual(1, cache.policy.size())
+
+    def test_failing_callbacks(self):
+        def fail(*_):
+            raise RuntimeError()
+
+        write_behind = WriteBehind(on_error=fail)
+        cache = RedisFuncCache(__name__, LruPolicy, client=redis_factory(), write_behind=write_behind)
+        cache.policy.purge()
+
+        @cache
+        def echo(x):
+            return x
+
+        with self.assertLogs(write_behind_module.__name__, "ERROR") as logs:
+            with patch.object(write_behind_module, "run_script_calls", side_effect=ConnectionError()):
+                echo(1)
+                write_behind.flush()
+            with patch.object(write_behind_module, "run_script_calls", return_value=[0]):
+                write_behind.submit(None, (), (), callback=fail)  # type: ignore[arg-type]
+                write_behind.flush()
+        self.assertEqual(2, len(logs.output))
+        self.assertEqual(2, echo(2))  # the background thread is still writing
+        write_behind.flush()
+        self.assertEqual(1, cache.policy.size())
+        cache.close()
+
+    def test_closed_loops(self):
+        write_behind = WriteBehind()
+        clients = []
+
+        def factory():
+            client = async_redis_factory()
+            clients.append((client, asyncio.get_running_loop()))
+            return client
+
+        cache = RedisFuncCache(__name__, LruPolicy, client=factory, write_behind=write_behind)
+
+        @cache
+        async def echo(x):
+            return x
+
+        async def main():
+            await cache.policy.apurge()
+            result = await echo(1)
+            registered = [loop for client, loop in clients if client is cache.policy.lua_scripts[1].registered_client]
+            self.assertListEqual([asyncio.get_running_loop()], registered)
+            return result
+
+        for _ in range(3):
+            self.assertEqual(1, asyncio.run(main()))
+        self.assertDictEqual({}, write_behind._aqueues)
+        self.assertDictEqual({}, write_behind._atasks)
+
+    def test_local_cache(self):
+        cache = RedisFuncCache(
+            __name__, LruPolicy, client=redis_factory(), local_cache=LocalCache(), write_behind=WriteBehind()
+        )
+        cache.policy.purge()
+        calls = []
+
+        @cache
+        def echo(x):
+            calls.append(x)
+            return x
+
+        self.assertEqual(1, echo(1))
+        self.assertEqual(1, echo(1))
+        self.assertListEqual([1], calls)
+        cache.close()
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            WriteBehind(batch_size=0)
+
+
+class AsyncWriteBehindTest(IsolatedAsyncioTestCase):
+    async def test_put_in_background(self):
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory(), write_behind=WriteBehind())
+        await cache.policy.apurge()
+        calls = []
+
+        @cache
+        async def echo(x):
+            calls.append(x)
+            return x
+
+        for i in range(100):
+            self.assertEqual(i, await echo(i))
+        await cache.aclose()
+        self.assertEqual(100, await cache.policy.asize())
+        for i in range(100):
+            self.assertEqual(i, await echo(i))
+        self.assertListEqual(list(range(100)), calls)
+        await cache.aclose()
+
+    async def test_drop(self):
+        write_behind = WriteBehind(maxsize=2, block=False)
+        cache = RedisFuncCache(__name__, LruPolicy, client=async_redis_factory(), write_behind=write_behind)
+        await cache.policy.apurge()
+
+        @cache
+        async def echo(x):
+            return x
+
+        release = asyncio.Event()
+        arun_script_calls = write_behind_module.arun_script_calls
+
+        async def wait_and_run(calls, raise_on_error=True):
+            await release.wait()
+            return await arun_script_calls(calls, raise_on_error)
+
+        with patch.object(write_behind_module, "arun_script_calls", side_effect=wait_and_run):
+            for i in range(10):
+                self.assertEqual(i, await echo(i))
+            release.set()
+            await cache.aclose()
+        self.assertGreater(write_behind.dropped, 0)
+        self.assertEqual(10 - write_behind.dropped, await cache.policy.asize())
+
+    async def test_failed_chunks(self):
+        write_behind = WriteBehind(on_error=lambda _: None)
+        cache = RedisFuncCache(
+            __name__,
+            LruPolicy,
+            client=async_redis_factory(),
+            storage=StorageConfig(chunk_size=16),
+            write_behind=write_behind,
+        )
+        await cache.policy.apurge()
+
+        @cache
+        async def echo(x):
+            return f"{x:02d}" * 40
+
+        async def fail(calls, raise_on_error=True):
+            return [ConnectionError()] * len(calls)
+
+        with patch.object(write_behind_module, "arun_script_calls", side_effect=fail):
+            await echo(1)
+            await write_behind.aflush()
+        self.assertEqual(1, write_behind.errors)
+        _, hmap = cache.policy.calc_keys(echo.__wrapped__)
+        self.assertEqual(0, await cache.client.hlen(chunks_key(hmap)))
+        await cache.aclose()